@@ -1,3 +1,8 @@
 """AegisX AI Engine - Production-ready FastAPI backend."""
 
+import time
+
 __version__ = "0.1.0"
+
+# Taken before any submodule loads; main.py reports the import time from it.
+IMPORT_STARTED = time.perf_counter()
@@ -0,0 +1,176 @@
+"""Admin-only profiling endpoints.
+
+Mounted only when PROFILING_ENABLED is set; every request must present
+PROFILING_ADMIN_TOKEN in the X-Admin-Token header.
+"""
+
+import asyncio
+import logging
+import secrets
+import tracemalloc
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+
+from ..core.config import settings
+from ..models.schemas import (
+    ProfileCaptureSummary,
+    ProfilingConfigRequest,
+    ProfilingStatusResponse,
+    TracemallocSnapshotResponse,
+)
+from ..utils.profiling import (
+    StackSampler,
+    request_profiler,
+    start_tracemalloc,
+    stop_tracemalloc,
+    tracemalloc_top,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """Reject requests without the configured admin token."""
+    expected = settings.PROFILING_ADMIN_TOKEN
+    if not expected or not x_admin_token or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def _status() -> ProfilingStatusResponse:
+    return ProfilingStatusResponse(
+        sample_rate=request_profiler.sample_rate,
+        path_prefix=request_profiler.path_prefix,
+        tracemalloc_active=tracemalloc.is_tracing(),
+        captures=[
+            ProfileCaptureSummary(
+                capture_id=capture.capture_id,
+                path=capture.path,
+                duration_ms=capture.duration_ms,
+                captured_at=capture.captured_at,
+                top=capture.top,
+            )
+            for capture in request_profiler.captures
+        ],
+    )
+
+
+@router.get("", response_model=ProfilingStatusResponse)
+async def profiling_status() -> ProfilingStatusResponse:
+    """
+    Report profiling configuration and recent request captures.
+
+    Returns:
+        ProfilingStatusResponse: Current profiling state
+    """
+    return _status()
+
+
+@router.put("/requests", response_model=ProfilingStatusResponse)
+async def configure_request_profiling(config: ProfilingConfigRequest) -> ProfilingStatusResponse:
+    """
+    Set the fraction of matching requests captured with cProfile.
+
+    Captures run one at a time; other coroutines that run on the event loop
+    while a profiled request awaits are included in its profile.
+
+    Args:
+        config: Sample rate and optional path prefix
+
+    Returns:
+        ProfilingStatusResponse: Updated profiling state
+    """
+    request_profiler.configure(config.sample_rate, config.path_prefix)
+    logger.info(
+        "Request profiling configured",
+        extra={"sample_rate": config.sample_rate, "path_prefix": request_profiler.path_prefix},
+    )
+    return _status()
+
+
+@router.get("/requests/{capture_id}")
+async def download_request_profile(capture_id: str) -> Response:
+    """
+    Download a request capture in pstats format.
+
+    Args:
+        capture_id: Capture identifier
+
+    Returns:
+        Response: Marshalled pstats data, loadable with ``pstats.Stats(path)``
+    """
+    capture = request_profiler.get(capture_id)
+    if capture is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Capture not found")
+    return Response(
+        content=capture.raw,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{capture_id}.prof"'},
+    )
+
+
+@router.post("/sampler")
+async def run_stack_sampler(
+    seconds: float = Query(default=10.0, gt=0.0, le=120.0),
+    interval_ms: float = Query(default=5.0, ge=1.0, le=1000.0),
+) -> Response:
+    """
+    Sample all thread stacks for a time window.
+
+    Args:
+        seconds: Sampling window
+        interval_ms: Milliseconds between samples
+
+    Returns:
+        Response: Collapsed stacks for flamegraph.pl or speedscope
+    """
+    sampler = StackSampler(interval=interval_ms / 1000.0)
+    collapsed = await asyncio.to_thread(sampler.run, seconds)
+    return Response(
+        content=collapsed,
+        media_type="text/plain",
+        headers={"Content-Disposition": 'attachment; filename="stacks.collapsed"'},
+    )
+
+
+@router.post("/tracemalloc/start", status_code=status.HTTP_204_NO_CONTENT)
+async def tracemalloc_start(frames: int = Query(default=1, ge=1, le=64)) -> None:
+    """
+    Start allocation tracing.
+
+    Args:
+        frames: Traceback depth recorded per allocation
+    """
+    start_tracemalloc(frames)
+
+
+@router.post("/tracemalloc/stop", status_code=status.HTTP_204_NO_CONTENT)
+async def tracemalloc_stop() -> None:
+    """Stop allocation tracing."""
+    stop_tracemalloc()
+
+
+@router.get("/tracemalloc/snapshot", response_model=TracemallocSnapshotResponse)
+async def tracemalloc_snapshot(
+    limit: int = Query(default=20, ge=1, le=200),
+    group_by: str = Query(default="lineno", pattern="^(lineno|filename|traceback)$"),
+) -> TracemallocSnapshotResponse:
+    """
+    Report the top allocation sites.
+
+    Args:
+        limit: Number of sites to return
+        group_by: Grouping key for allocation statistics
+
+    Returns:
+        TracemallocSnapshotResponse: Traced memory and top allocation sites
+    """
+    if not tracemalloc.is_tracing():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="tracemalloc is not running",
+        )
+    return TracemallocSnapshotResponse(**tracemalloc_top(limit, group_by))
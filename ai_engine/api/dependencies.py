@@ -0,0 +1,90 @@
+"""Shared request dependencies."""
+
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+from fastapi import Header, HTTPException, Query, WebSocketException, status
+
+from ..core.config import settings
+from ..db.sharding import TENANT_ID_PATTERN
+
+MAX_WINDOW_DAYS = 366
+
+
+async def get_tenant_id(
+    x_tenant_id: Optional[str] = Header(default=None),
+    x_api_key: Optional[str] = Header(default=None),
+) -> str:
+    """
+    Resolve the tenant for a request.
+
+    An API key listed in TENANT_API_KEYS takes precedence over the
+    X-Tenant-ID header; requests with neither use DEFAULT_TENANT.
+
+    Returns:
+        Tenant identifier
+
+    Raises:
+        HTTPException: If the API key is unknown or the tenant id is invalid
+    """
+    if x_api_key is not None:
+        tenant_id = settings.TENANT_API_KEYS.get(x_api_key)
+        if tenant_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid API key",
+            )
+    else:
+        tenant_id = x_tenant_id or settings.DEFAULT_TENANT
+
+    if not TENANT_ID_PATTERN.match(tenant_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid tenant id",
+        )
+    return tenant_id
+
+
+async def get_ws_tenant_id(
+    x_tenant_id: Optional[str] = Header(default=None),
+    x_api_key: Optional[str] = Header(default=None),
+) -> str:
+    """
+    Resolve the tenant for a WebSocket connection.
+
+    Same rules as ``get_tenant_id``; failures close the handshake with a
+    policy violation instead of an HTTP error response.
+
+    Returns:
+        Tenant identifier
+
+    Raises:
+        WebSocketException: If the API key is unknown or the tenant id is invalid
+    """
+    try:
+        return await get_tenant_id(x_tenant_id, x_api_key)
+    except HTTPException as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail) from e
+
+
+async def get_window(
+    start: Optional[date] = Query(default=None, description="First day, defaults to today"),
+    end: Optional[date] = Query(default=None, description="Last day, defaults to start + 6 days"),
+) -> Tuple[date, date]:
+    """
+    Resolve the date window of a query.
+
+    Returns:
+        First and last day, inclusive
+
+    Raises:
+        HTTPException: If the window is reversed or longer than MAX_WINDOW_DAYS
+    """
+    start = start or date.today()
+    end = end or start + timedelta(days=6)
+    if end < start or (end - start).days >= MAX_WINDOW_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Window must be 1-{MAX_WINDOW_DAYS} days with end on or after start",
+        )
+    return start, end
@@ -3,10 +3,11 @@
 import logging
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 
+from ..core.startup import startup_state
 from ..db.database import check_db_connection
-from ..models.schemas import HealthResponse
+from ..models.schemas import HealthResponse, ReadinessResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -37,3 +38,23 @@ async def health_check() -> HealthResponse:
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Service health check failed",
         )
+
+
+@router.get("/ready", response_model=ReadinessResponse, status_code=status.HTTP_200_OK)
+async def readiness_check(response: Response) -> ReadinessResponse:
+    """
+    Report whether this worker has finished starting up and can take traffic.
+
+    Unlike /health, which only says the process is alive, this returns 503
+    until every startup phase has completed, when the database is
+    unreachable, and once shutdown has begun.
+
+    Returns:
+        ReadinessResponse: Readiness and startup timings
+    """
+    state = startup_state.stats()
+    db_status = "connected" if check_db_connection() else "disconnected"
+    ready = state.pop("ready") and db_status == "connected"
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(ready=ready, database=db_status, **state)
@@ -0,0 +1,44 @@
+"""Async job status endpoints."""
+
+import logging
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from ..core.jobs import job_queue
+from ..models.schemas import JobStatusResponse
+from .dependencies import get_tenant_id
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, tenant_id: str = Depends(get_tenant_id)) -> JobStatusResponse:
+    """
+    Report the status of an async planning job.
+
+    Args:
+        job_id: Job identifier
+        tenant_id: Tenant that queued the job
+
+    Returns:
+        JobStatusResponse: Job status, with the plan once it has succeeded
+
+    Raises:
+        HTTPException: If the tenant has no job with this id
+    """
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None or job["tenant_id"] != tenant_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        attempts=job["attempts"],
+        result=job["result"],
+        error=job["error"],
+        created_at=datetime.utcfromtimestamp(job["created_at"]),
+        updated_at=datetime.utcfromtimestamp(job["updated_at"]),
+    )
@@ -1,30 +1,173 @@
 """Planning endpoints for week and day planning."""
 
 import logging
-from datetime import datetime
+from datetime import date, datetime
+from typing import Optional, Tuple
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
 
-from ..core.planner_service import PlannerService
-from ..models.schemas import PlanRequest, PlanResponse
+from ..core.idempotency import idempotency_store, request_fingerprint
+from ..core.jobs import job_queue, job_workers
+from ..core.planner_service import get_planner_service
+from ..core.pubsub import event_hub
+from ..db.recurrences import list_occurrences
+from ..db.repository import (
+    clear_task_recurrence,
+    get_plan,
+    save_plan,
+    set_task_recurrence,
+    update_occurrence_status,
+    update_task_status,
+)
+from ..db.sharding import shard_router
+from ..models.schemas import (
+    GoalMemoStatsResponse,
+    JobAcceptedResponse,
+    JobStatus,
+    ModelStatsResponse,
+    OccurrenceListResponse,
+    PlanEvent,
+    PlanEventType,
+    PlanRequest,
+    PlanResponse,
+    RecurrenceRule,
+    Task,
+    TaskOccurrence,
+    TaskStatusUpdate,
+)
 from ..utils.error_handler import handle_service_error
+from ..utils.tracing import traced, tracer
+from .dependencies import get_tenant_id, get_window
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-planner_service = PlannerService()
 
 
-@router.post("/week", response_model=PlanResponse, status_code=status.HTTP_201_CREATED)
-async def plan_week(request: PlanRequest) -> PlanResponse:
+def _persist_plan(tenant_id: str, plan_type: str, context: str, plan: PlanResponse) -> None:
+    """Store a generated plan in the tenant's shard."""
+    with shard_router.connection(tenant_id) as conn:
+        save_plan(conn, tenant_id, plan_type, context, plan)
+
+
+async def _create_plan(plan_type: str, request: PlanRequest, tenant_id: str) -> PlanResponse:
+    """
+    Generate and store a plan.
+
+    Args:
+        plan_type: "weekly" or "daily"
+        request: Planning request with context, goals, and constraints
+        tenant_id: Tenant the plan is stored for
+
+    Returns:
+        The generated plan
+    """
+    if plan_type == "weekly":
+        prefix, label = "plan_week", "weekly planning"
+    else:
+        prefix, label = "plan_today", "today's planning"
+
+    generated = await get_planner_service().plan(
+        plan_type,
+        context=request.context,
+        goals=request.goals,
+        constraints=request.constraints or [],
+    )
+    tasks = generated.tasks
+
+    plan_id = f"{prefix}_{datetime.utcnow().strftime('%Y%m%d')}_{uuid4().hex[:8]}"
+
+    logger.info(
+        f"{plan_type.capitalize()} plan generated successfully",
+        extra={"plan_id": plan_id, "tasks_count": len(tasks), "source": generated.source.value},
+    )
+
+    plan = PlanResponse(
+        plan_id=plan_id,
+        tasks=tasks,
+        summary=f"Generated {len(tasks)} tasks for {label}",
+        source=generated.source,
+        created_at=datetime.utcnow(),
+    )
+    await run_in_threadpool(_persist_plan, tenant_id, plan_type, request.context, plan)
+    event_hub.publish_event(
+        tenant_id, PlanEvent(type=PlanEventType.TASKS_CREATED, plan_id=plan_id, tasks=tasks)
+    )
+    return plan
+
+
+async def _run_plan_job(tenant_id: str, payload: dict) -> dict:
+    """Job handler generating a plan queued with ?async=true."""
+    request = PlanRequest.model_validate(payload["request"])
+    plan = await _create_plan(payload["plan_type"], request, tenant_id)
+    return plan.model_dump(mode="json")
+
+
+job_workers.register("plan", _run_plan_job)
+
+
+async def _enqueue_plan(plan_type: str, request: PlanRequest, tenant_id: str) -> Response:
+    """Queue a plan for background generation and return 202 Accepted."""
+    job_id = await run_in_threadpool(
+        job_queue.enqueue,
+        tenant_id,
+        "plan",
+        {"plan_type": plan_type, "request": request.model_dump(mode="json")},
+    )
+    job_workers.notify()
+
+    logger.info("Plan job queued", extra={"job_id": job_id, "plan_type": plan_type})
+
+    accepted = JobAcceptedResponse(
+        job_id=job_id,
+        status=JobStatus.QUEUED,
+        status_url=f"/jobs/{job_id}",
+    )
+    return Response(
+        content=accepted.model_dump_json(),
+        media_type="application/json",
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": accepted.status_url},
+    )
+
+
+def _serialize_plan(plan: PlanResponse) -> Response:
+    """Serialize a plan response inside its own span."""
+    with tracer.span("plan.serialize", tasks_count=len(plan.tasks)):
+        return Response(
+            content=plan.model_dump_json(),
+            media_type="application/json",
+            status_code=status.HTTP_201_CREATED,
+            headers={"X-Plan-Source": plan.source.value},
+        )
+
+
+@router.post(
+    "/week",
+    response_model=PlanResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobAcceptedResponse}},
+)
+@traced("api.plan_week")
+async def plan_week(
+    request: PlanRequest,
+    tenant_id: str = Depends(get_tenant_id),
+    idempotency_key: Optional[str] = Header(default=None),
+    run_async: bool = Query(default=False, alias="async"),
+) -> Response:
     """
     Generate a weekly plan based on provided context and goals.
 
     Args:
         request: Planning request with context, goals, and constraints
+        tenant_id: Tenant the plan is stored for
+        idempotency_key: Optional key making retries replay the first response
+        run_async: Queue the plan and return 202 with a job id instead
 
     Returns:
-        PlanResponse: Generated weekly plan with tasks
+        PlanResponse: Generated weekly plan with tasks, or
+        JobAcceptedResponse when run_async is set
 
     Raises:
         HTTPException: If plan generation fails
@@ -35,27 +178,22 @@ async def plan_week(request: PlanRequest) -> PlanResponse:
             extra={
                 "goals_count": len(request.goals),
                 "has_constraints": request.constraints is not None,
+                "async": run_async,
             },
         )
 
-        tasks = await planner_service.generate_weekly_plan(
-            context=request.context,
-            goals=request.goals,
-            constraints=request.constraints or [],
-        )
-
-        plan_id = f"plan_week_{datetime.utcnow().strftime('%Y%m%d')}_{uuid4().hex[:8]}"
-
-        logger.info(
-            "Weekly plan generated successfully",
-            extra={"plan_id": plan_id, "tasks_count": len(tasks)},
-        )
+        async def generate() -> Response:
+            if run_async:
+                return await _enqueue_plan("weekly", request, tenant_id)
+            return _serialize_plan(await _create_plan("weekly", request, tenant_id))
 
-        return PlanResponse(
-            plan_id=plan_id,
-            tasks=tasks,
-            summary=f"Generated {len(tasks)} tasks for weekly planning",
-            created_at=datetime.utcnow(),
+        if idempotency_key is None:
+            return await generate()
+        return await idempotency_store.run(
+            tenant_id,
+            idempotency_key,
+            request_fingerprint("weekly:async" if run_async else "weekly", request),
+            generate,
         )
 
     except ValueError as e:
@@ -69,16 +207,31 @@ async def plan_week(request: PlanRequest) -> PlanResponse:
         handle_service_error(e, "weekly plan generation")
 
 
-@router.post("/today", response_model=PlanResponse, status_code=status.HTTP_201_CREATED)
-async def plan_today(request: PlanRequest) -> PlanResponse:
+@router.post(
+    "/today",
+    response_model=PlanResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobAcceptedResponse}},
+)
+@traced("api.plan_today")
+async def plan_today(
+    request: PlanRequest,
+    tenant_id: str = Depends(get_tenant_id),
+    idempotency_key: Optional[str] = Header(default=None),
+    run_async: bool = Query(default=False, alias="async"),
+) -> Response:
     """
     Generate a daily plan based on provided context and goals.
 
     Args:
         request: Planning request with context, goals, and constraints
+        tenant_id: Tenant the plan is stored for
+        idempotency_key: Optional key making retries replay the first response
+        run_async: Queue the plan and return 202 with a job id instead
 
     Returns:
-        PlanResponse: Generated daily plan with tasks
+        PlanResponse: Generated daily plan with tasks, or
+        JobAcceptedResponse when run_async is set
 
     Raises:
         HTTPException: If plan generation fails
@@ -89,27 +242,22 @@ async def plan_today(request: PlanRequest) -> PlanResponse:
             extra={
                 "goals_count": len(request.goals),
                 "has_constraints": request.constraints is not None,
+                "async": run_async,
             },
         )
 
-        tasks = await planner_service.generate_daily_plan(
-            context=request.context,
-            goals=request.goals,
-            constraints=request.constraints or [],
-        )
-
-        plan_id = f"plan_today_{datetime.utcnow().strftime('%Y%m%d')}_{uuid4().hex[:8]}"
-
-        logger.info(
-            "Daily plan generated successfully",
-            extra={"plan_id": plan_id, "tasks_count": len(tasks)},
-        )
+        async def generate() -> Response:
+            if run_async:
+                return await _enqueue_plan("daily", request, tenant_id)
+            return _serialize_plan(await _create_plan("daily", request, tenant_id))
 
-        return PlanResponse(
-            plan_id=plan_id,
-            tasks=tasks,
-            summary=f"Generated {len(tasks)} tasks for today's planning",
-            created_at=datetime.utcnow(),
+        if idempotency_key is None:
+            return await generate()
+        return await idempotency_store.run(
+            tenant_id,
+            idempotency_key,
+            request_fingerprint("daily:async" if run_async else "daily", request),
+            generate,
         )
 
     except ValueError as e:
@@ -121,3 +269,265 @@ async def plan_today(request: PlanRequest) -> PlanResponse:
     except Exception as e:
         logger.error(f"Failed to generate daily plan: {str(e)}", exc_info=True)
         handle_service_error(e, "daily plan generation")
+
+
+@router.get("/memo/stats", response_model=GoalMemoStatsResponse)
+async def goal_memo_stats() -> GoalMemoStatsResponse:
+    """
+    Report goal memo hit rates and the generation time they saved.
+
+    Returns:
+        GoalMemoStatsResponse: Memo statistics for this worker
+    """
+    memo = get_planner_service().memo
+    if memo is None:
+        return GoalMemoStatsResponse(enabled=False)
+    return GoalMemoStatsResponse(enabled=True, **memo.stats())
+
+
+@router.get("/model/stats", response_model=ModelStatsResponse)
+async def model_stats() -> ModelStatsResponse:
+    """
+    Report model backend hedging and circuit breaker state.
+
+    Returns:
+        ModelStatsResponse: Call counters for this worker
+    """
+    service = get_planner_service()
+    if service.backend is None:
+        return ModelStatsResponse(enabled=False)
+    return ModelStatsResponse(enabled=True, **service.caller.stats())
+
+
+@router.get("/occurrences", response_model=OccurrenceListResponse)
+@traced("api.list_occurrences")
+async def occurrences(
+    window: Tuple[date, date] = Depends(get_window),
+    tenant_id: str = Depends(get_tenant_id),
+) -> OccurrenceListResponse:
+    """
+    List occurrences of the tenant's recurring tasks within a window.
+
+    Args:
+        window: First and last day of the window, inclusive
+        tenant_id: Tenant owning the tasks
+
+    Returns:
+        OccurrenceListResponse: Occurrences ordered by date
+
+    Raises:
+        HTTPException: If the window is invalid or the read fails
+    """
+    start, end = window
+
+    def load():
+        with shard_router.connection(tenant_id) as conn:
+            return list(list_occurrences(conn, tenant_id, start, end))
+
+    try:
+        items = await run_in_threadpool(load)
+    except Exception as e:
+        logger.error(f"Failed to list occurrences: {str(e)}", exc_info=True)
+        handle_service_error(e, "occurrence listing")
+
+    return OccurrenceListResponse(start=start, end=end, occurrences=items)
+
+
+@router.get("/{plan_id}", response_model=PlanResponse)
+async def get_stored_plan(
+    plan_id: str,
+    window: Tuple[date, date] = Depends(get_window),
+    tenant_id: str = Depends(get_tenant_id),
+) -> PlanResponse:
+    """
+    Retrieve a previously generated plan.
+
+    Args:
+        plan_id: Plan identifier
+        window: Days to list occurrences of recurring tasks for
+        tenant_id: Tenant owning the plan
+
+    Returns:
+        PlanResponse: The stored plan
+
+    Raises:
+        HTTPException: If the tenant has no plan with this id
+    """
+
+    def load() -> PlanResponse:
+        with shard_router.connection(tenant_id) as conn:
+            plan = get_plan(conn, tenant_id, plan_id)
+            if plan is not None and any(task.recurrence for task in plan.tasks):
+                plan.occurrences = list(list_occurrences(conn, tenant_id, *window, plan_id=plan_id))
+            return plan
+
+    plan = await run_in_threadpool(load)
+    if plan is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
+    return plan
+
+
+@router.patch("/{plan_id}/tasks/{task_id}", response_model=Task)
+@traced("api.update_task_status")
+async def update_task(
+    plan_id: str,
+    task_id: int,
+    update: TaskStatusUpdate,
+    tenant_id: str = Depends(get_tenant_id),
+) -> Task:
+    """
+    Change the status of a task in a stored plan.
+
+    Args:
+        plan_id: Plan identifier
+        task_id: Task id within the plan
+        update: New status
+        tenant_id: Tenant owning the plan
+
+    Returns:
+        Task: The updated task
+
+    Raises:
+        HTTPException: If the tenant has no such task
+    """
+
+    def apply() -> Optional[Task]:
+        with shard_router.connection(tenant_id) as conn:
+            return update_task_status(conn, tenant_id, plan_id, task_id, update.status)
+
+    try:
+        task = await run_in_threadpool(apply)
+    except Exception as e:
+        logger.error(f"Failed to update task: {str(e)}", exc_info=True)
+        handle_service_error(e, "task update")
+
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+    logger.info(
+        "Task status updated",
+        extra={"plan_id": plan_id, "task_id": task_id, "status": update.status.value},
+    )
+    event_hub.publish_event(
+        tenant_id, PlanEvent(type=PlanEventType.TASK_UPDATED, plan_id=plan_id, tasks=[task])
+    )
+    return task
+
+
+@router.put("/{plan_id}/tasks/{task_id}/recurrence", response_model=Task)
+@traced("api.set_task_recurrence")
+async def set_recurrence(
+    plan_id: str,
+    task_id: int,
+    rule: RecurrenceRule,
+    tenant_id: str = Depends(get_tenant_id),
+) -> Task:
+    """
+    Make a stored task recurring, replacing any previous rule.
+
+    Args:
+        plan_id: Plan identifier
+        task_id: Task id within the plan
+        rule: Recurrence rule; starts_on defaults to the task's due date
+        tenant_id: Tenant owning the plan
+
+    Returns:
+        Task: The task with its resolved rule
+
+    Raises:
+        HTTPException: If the tenant has no such task
+    """
+
+    def apply() -> Optional[Task]:
+        with shard_router.connection(tenant_id) as conn:
+            return set_task_recurrence(conn, tenant_id, plan_id, task_id, rule)
+
+    try:
+        task = await run_in_threadpool(apply)
+    except Exception as e:
+        logger.error(f"Failed to set recurrence: {str(e)}", exc_info=True)
+        handle_service_error(e, "recurrence update")
+
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+
+    logger.info(
+        "Task recurrence set",
+        extra={"plan_id": plan_id, "task_id": task_id, "frequency": rule.frequency.value},
+    )
+    return task
+
+
+@router.delete("/{plan_id}/tasks/{task_id}/recurrence", status_code=status.HTTP_204_NO_CONTENT)
+@traced("api.clear_task_recurrence")
+async def clear_recurrence(
+    plan_id: str,
+    task_id: int,
+    tenant_id: str = Depends(get_tenant_id),
+) -> Response:
+    """
+    Stop a task recurring.
+
+    Args:
+        plan_id: Plan identifier
+        task_id: Task id within the plan
+        tenant_id: Tenant owning the plan
+
+    Raises:
+        HTTPException: If the task has no recurrence rule
+    """
+
+    def apply() -> bool:
+        with shard_router.connection(tenant_id) as conn:
+            return clear_task_recurrence(conn, tenant_id, plan_id, task_id)
+
+    try:
+        cleared = await run_in_threadpool(apply)
+    except Exception as e:
+        logger.error(f"Failed to clear recurrence: {str(e)}", exc_info=True)
+        handle_service_error(e, "recurrence update")
+
+    if not cleared:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task is not recurring")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.patch("/{plan_id}/tasks/{task_id}/occurrences/{day}", response_model=TaskOccurrence)
+@traced("api.update_occurrence_status")
+async def update_occurrence(
+    plan_id: str,
+    task_id: int,
+    day: date,
+    update: TaskStatusUpdate,
+    tenant_id: str = Depends(get_tenant_id),
+) -> TaskOccurrence:
+    """
+    Change the status of one occurrence of a recurring task.
+
+    Args:
+        plan_id: Plan identifier
+        task_id: Task id within the plan
+        day: Occurrence date
+        update: New status
+        tenant_id: Tenant owning the plan
+
+    Returns:
+        TaskOccurrence: The updated occurrence
+
+    Raises:
+        HTTPException: If the task does not recur on that day
+    """
+
+    def apply() -> Optional[TaskOccurrence]:
+        with shard_router.connection(tenant_id) as conn:
+            return update_occurrence_status(conn, tenant_id, plan_id, task_id, day, update.status)
+
+    try:
+        occurrence = await run_in_threadpool(apply)
+    except Exception as e:
+        logger.error(f"Failed to update occurrence: {str(e)}", exc_info=True)
+        handle_service_error(e, "occurrence update")
+
+    if occurrence is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Occurrence not found")
+    return occurrence
@@ -0,0 +1,87 @@
+"""Workload statistics endpoints served from incrementally maintained summaries."""
+
+import logging
+from datetime import date
+from typing import Tuple
+
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+
+from ..db.recurrences import unmaterialized_occurrences
+from ..db.sharding import shard_router
+from ..db.summaries import workload_by_day, workload_by_status
+from ..models.schemas import WorkloadBucket, WorkloadDay, WorkloadStatsResponse
+from ..utils.error_handler import handle_service_error
+from ..utils.tracing import traced
+from .dependencies import get_tenant_id, get_window
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("/workload", response_model=WorkloadStatsResponse)
+@traced("api.workload_stats")
+async def workload_stats(
+    window: Tuple[date, date] = Depends(get_window),
+    tenant_id: str = Depends(get_tenant_id),
+) -> WorkloadStatsResponse:
+    """
+    Report open workload per due day and task counts per status.
+
+    Days include occurrences of recurring tasks: stored occurrences are
+    already in the summaries, the rest of the window is expanded lazily.
+
+    Args:
+        window: First and last day of the window, inclusive
+        tenant_id: Tenant to report on
+
+    Returns:
+        WorkloadStatsResponse: Workload per day and priority, and per status
+
+    Raises:
+        HTTPException: If the window is invalid or the read fails
+    """
+    start, end = window
+
+    def load():
+        with shard_router.connection(tenant_id) as conn:
+            day_rows = workload_by_day(conn, tenant_id, start, end)
+            for occurrence in unmaterialized_occurrences(conn, tenant_id, start, end):
+                day_rows.append(
+                    {
+                        "day": occurrence.occurs_on.isoformat(),
+                        "priority": occurrence.priority.value,
+                        "task_count": 1,
+                        "estimated_hours": occurrence.estimated_hours or 0.0,
+                    }
+                )
+            return day_rows, workload_by_status(conn, tenant_id)
+
+    try:
+        day_rows, status_rows = await run_in_threadpool(load)
+    except Exception as e:
+        logger.error(f"Failed to read workload stats: {str(e)}", exc_info=True)
+        handle_service_error(e, "workload statistics")
+
+    days = {}
+    for row in day_rows:
+        day = days.setdefault(
+            row["day"], WorkloadDay(day=row["day"], total=WorkloadBucket(), by_priority={})
+        )
+        bucket = day.by_priority.setdefault(row["priority"], WorkloadBucket())
+        bucket.task_count += row["task_count"]
+        bucket.estimated_hours += row["estimated_hours"]
+        day.total.task_count += row["task_count"]
+        day.total.estimated_hours += row["estimated_hours"]
+
+    return WorkloadStatsResponse(
+        start=start,
+        end=end,
+        days=[days[key] for key in sorted(days)],
+        by_status={
+            row["status"]: WorkloadBucket(
+                task_count=row["task_count"], estimated_hours=row["estimated_hours"]
+            )
+            for row in status_rows
+        },
+    )
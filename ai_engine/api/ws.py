@@ -0,0 +1,118 @@
+"""WebSocket feeds pushing plan and task updates."""
+
+import asyncio
+import logging
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketException, status
+from fastapi.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketDisconnect
+
+from ..core.pubsub import SLOW_CONSUMER, Subscription, event_hub, plan_topic, tenant_topic
+from ..db.repository import plan_exists
+from ..db.sharding import shard_router
+from .dependencies import get_ws_tenant_id
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+async def _forward(websocket: WebSocket, subscription: Subscription) -> None:
+    """Send buffered events until the subscription closes."""
+    while True:
+        message = await subscription.get()
+        if message is None:
+            return
+        await websocket.send_text(message)
+
+
+async def _wait_disconnect(websocket: WebSocket) -> None:
+    """Read and ignore client messages until the client disconnects."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+async def _serve(websocket: WebSocket, topic: str) -> None:
+    """
+    Stream a topic's events to a client until either side closes.
+
+    Args:
+        websocket: Connection that has not been accepted yet
+        topic: Topic to subscribe to
+
+    Raises:
+        WebSocketException: If the worker has no room for another subscriber
+    """
+    subscription = event_hub.subscribe(topic)
+    if subscription is None:
+        raise WebSocketException(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too many subscribers")
+
+    await websocket.accept()
+    sender = asyncio.ensure_future(_forward(websocket, subscription))
+    receiver = asyncio.ensure_future(_wait_disconnect(websocket))
+    try:
+        done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in (sender, receiver):
+            task.cancel()
+        await asyncio.gather(sender, receiver, return_exceptions=True)
+        event_hub.unsubscribe(subscription)
+
+    if sender in done and sender.exception() is None:
+        # The hub closed the subscription while the client was still connected.
+        if subscription.reason == SLOW_CONSUMER:
+            logger.info("Closing slow WebSocket consumer", extra={"topic": topic})
+            code = status.WS_1013_TRY_AGAIN_LATER
+        else:
+            code = status.WS_1001_GOING_AWAY
+        try:
+            await websocket.close(code=code, reason=subscription.reason)
+        except (RuntimeError, WebSocketDisconnect):
+            pass
+
+
+@router.websocket("/plans/{plan_id}")
+async def plan_feed(
+    websocket: WebSocket,
+    plan_id: str,
+    tenant_id: str = Depends(get_ws_tenant_id),
+) -> None:
+    """
+    Push task status changes of one plan as they happen.
+
+    Each message is a JSON ``PlanEvent``.
+
+    Args:
+        websocket: Client connection
+        plan_id: Plan identifier
+        tenant_id: Tenant owning the plan
+
+    Raises:
+        WebSocketException: If the tenant has no plan with this id
+    """
+
+    def exists() -> bool:
+        with shard_router.connection(tenant_id) as conn:
+            return plan_exists(conn, tenant_id, plan_id)
+
+    if not await run_in_threadpool(exists):
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Plan not found")
+    await _serve(websocket, plan_topic(tenant_id, plan_id))
+
+
+@router.websocket("/tenant")
+async def tenant_feed(
+    websocket: WebSocket,
+    tenant_id: str = Depends(get_ws_tenant_id),
+) -> None:
+    """
+    Push newly generated tasks and task status changes across a tenant's plans.
+
+    Each message is a JSON ``PlanEvent``.
+
+    Args:
+        websocket: Client connection
+        tenant_id: Tenant whose plans are followed
+    """
+    await _serve(websocket, tenant_topic(tenant_id))
@@ -1,6 +1,6 @@
 """Application configuration management."""
 
-from typing import List
+from typing import Dict, List
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -23,9 +23,63 @@ class Settings(BaseSettings):
 
     DATABASE_PATH: str = Field(default="../data/aegisx.db")
 
+    SHARD_MODE: str = Field(default="single")
+    SHARD_DIR: str = Field(default="../data/shards")
+    SHARD_COUNT: int = Field(default=8)
+    MAX_OPEN_SHARDS: int = Field(default=64)
+    SHARD_POOL_SIZE: int = Field(default=4)
+    SHARD_POOL_TIMEOUT: float = Field(default=30.0)
+
+    DEFAULT_TENANT: str = Field(default="default")
+    TENANT_API_KEYS: Dict[str, str] = Field(default={})
+
+    IDEMPOTENCY_TTL_SECONDS: int = Field(default=86400)
+    IDEMPOTENCY_CACHE_SIZE: int = Field(default=10_000)
+    IDEMPOTENCY_LEASE_SECONDS: float = Field(default=60.0)
+
+    JOB_WORKERS: int = Field(default=4)
+    JOB_LEASE_SECONDS: float = Field(default=60.0)
+    JOB_MAX_ATTEMPTS: int = Field(default=3)
+    JOB_RETRY_BACKOFF: float = Field(default=2.0)
+    JOB_POLL_INTERVAL: float = Field(default=0.5)
+
+    WS_BUFFER_SIZE: int = Field(default=256)
+    WS_MAX_SUBSCRIBERS: int = Field(default=20_000)
+
+    RECURRENCE_HORIZON_DAYS: int = Field(default=14)
+
     ALLOWED_ORIGINS: List[str] = Field(default=["*"])
 
     PROMPTS_DIR: str = Field(default="../prompts")
 
+    MODEL_ENDPOINT: str = Field(default="")
+    MODEL_TIMEOUT_SECONDS: float = Field(default=30.0)
+    MODEL_DEADLINE_SECONDS: float = Field(default=10.0)
+    MODEL_HEDGE_ENABLED: bool = Field(default=True)
+    MODEL_HEDGE_INITIAL_DELAY: float = Field(default=2.0)
+    MODEL_HEDGE_MIN_DELAY: float = Field(default=0.05)
+    BREAKER_FAILURE_RATIO: float = Field(default=0.5)
+    BREAKER_LATENCY_THRESHOLD: float = Field(default=8.0)
+    BREAKER_WINDOW: int = Field(default=20)
+    BREAKER_MIN_CALLS: int = Field(default=5)
+    BREAKER_OPEN_SECONDS: float = Field(default=30.0)
+
+    PLAN_FANOUT_LIMIT: int = Field(default=8)
+    DECOMPOSE_PROCESSES: int = Field(default=0)
+
+    GOAL_MEMO_ENABLED: bool = Field(default=True)
+    GOAL_MEMO_THRESHOLD: float = Field(default=0.6)
+    GOAL_MEMO_MAX_ENTRIES: int = Field(default=100_000)
+    GOAL_MEMO_BUCKET_SIZE: int = Field(default=16)
+
+    TRACING_ENABLED: bool = Field(default=False)
+    TRACE_SAMPLE_RATE: float = Field(default=0.1)
+    TRACE_EXPORTER: str = Field(default="file")
+    TRACE_FILE_PATH: str = Field(default="../data/traces.jsonl")
+    TRACE_OTLP_ENDPOINT: str = Field(default="http://localhost:4318/v1/traces")
+
+    PROFILING_ENABLED: bool = Field(default=False)
+    PROFILING_ADMIN_TOKEN: str = Field(default="")
+
 
 settings = Settings()
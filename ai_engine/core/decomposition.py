@@ -0,0 +1,190 @@
+"""Per-goal decomposition into subtasks, fan-out and deterministic merge.
+
+Each goal is broken down independently (one scheduler pass or one model
+call per goal), so goals are expanded concurrently with ``fan_out`` and a
+plan takes about as long as its slowest goal. CPU-bound scheduler passes can
+be moved off the event loop into a process pool (DECOMPOSE_PROCESSES).
+
+``merge_subtasks`` then combines the per-goal results in goal order,
+collapses subtasks whose normalized titles match and numbers the result, so
+the same goals always yield the same ids no matter which goal finished first.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from ..models.schemas import PriorityLevel, Task
+from .config import settings
+from .goal_memo import normalize_goal
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+MAX_TITLE_LENGTH = 200
+
+_PRIORITY_RANK = {
+    PriorityLevel.LOW: 0,
+    PriorityLevel.MEDIUM: 1,
+    PriorityLevel.HIGH: 2,
+    PriorityLevel.CRITICAL: 3,
+}
+
+
+@dataclass(frozen=True)
+class SubtaskSpec:
+    """Date- and context-independent part of a generated task.
+
+    ``title`` is a template; ``{goal}`` is replaced by the caller's goal text,
+    so memoized breakdowns keep the wording of the goal they are reused for.
+    """
+
+    estimated_hours: float
+    title: Optional[str] = None
+    day_offset: int = 0
+
+    def render_title(self, goal: str) -> str:
+        """Title for this subtask of the given goal."""
+        title = self.title.format(goal=goal) if self.title else goal
+        return title[:MAX_TITLE_LENGTH]
+
+
+# Weekly goals are planned, done and reviewed on consecutive days.
+_WEEKLY_PHASES = (
+    SubtaskSpec(estimated_hours=1.5, title="Plan: {goal}", day_offset=0),
+    SubtaskSpec(estimated_hours=5.0, title="{goal}", day_offset=1),
+    SubtaskSpec(estimated_hours=1.5, title="Review: {goal}", day_offset=2),
+)
+_DAILY_PHASES = (SubtaskSpec(estimated_hours=2.0),)
+
+
+def decompose_goal(goal: str, plan_type: str) -> Tuple[SubtaskSpec, ...]:
+    """
+    Break a goal down into subtasks with the deterministic scheduler.
+
+    Module-level so it can run in a worker process.
+
+    Args:
+        goal: Goal text
+        plan_type: "weekly" or "daily"
+
+    Returns:
+        Subtask specs with dates expressed as offsets from the goal's slot
+    """
+    return _WEEKLY_PHASES if plan_type == "weekly" else _DAILY_PHASES
+
+
+async def fan_out(items: Sequence[T], fn: Callable[[T], Awaitable[R]], limit: int) -> List[R]:
+    """
+    Run ``fn`` over items concurrently, at most ``limit`` at a time.
+
+    Args:
+        items: Inputs, e.g. goals
+        fn: Coroutine function applied to each input
+        limit: Maximum number of concurrent calls
+
+    Returns:
+        Results in input order
+
+    Raises:
+        Exception: The first failure; remaining calls are cancelled
+    """
+    semaphore = asyncio.Semaphore(max(limit, 1))
+
+    async def bounded(item: T) -> R:
+        async with semaphore:
+            return await fn(item)
+
+    tasks = [asyncio.ensure_future(bounded(item)) for item in items]
+    if not tasks:
+        return []
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def merge_subtasks(per_goal: Sequence[Sequence[Task]]) -> List[Task]:
+    """
+    Merge per-goal subtasks into one deduplicated, stably numbered list.
+
+    Subtasks are taken in goal order, then subtask order. A subtask whose
+    normalized title matches an earlier one is folded into it: the merged
+    task keeps the earlier wording and description, the higher priority, the
+    larger estimate and the earlier due date.
+
+    Args:
+        per_goal: Subtasks of each goal, in goal order
+
+    Returns:
+        Merged tasks with ids 1..n
+    """
+    merged: Dict[str, Task] = {}
+    for subtasks in per_goal:
+        for task in subtasks:
+            key = normalize_goal(task.title) or task.title.lower()
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = task.model_copy()
+                continue
+
+            if _PRIORITY_RANK[task.priority] > _PRIORITY_RANK[existing.priority]:
+                existing.priority = task.priority
+            if task.estimated_hours is not None and (
+                existing.estimated_hours is None or task.estimated_hours > existing.estimated_hours
+            ):
+                existing.estimated_hours = task.estimated_hours
+            if task.due_date is not None and (
+                existing.due_date is None or task.due_date < existing.due_date
+            ):
+                existing.due_date = task.due_date
+
+    tasks = list(merged.values())
+    for index, task in enumerate(tasks, start=1):
+        task.id = index
+    return tasks
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+async def run_decomposition(goal: str, plan_type: str) -> Tuple[SubtaskSpec, ...]:
+    """
+    Run the scheduler pass for a goal, in the process pool if one is configured.
+
+    Args:
+        goal: Goal text
+        plan_type: "weekly" or "daily"
+
+    Returns:
+        Subtask specs for the goal
+    """
+    global _process_pool
+    if settings.DECOMPOSE_PROCESSES <= 0:
+        return decompose_goal(goal, plan_type)
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.DECOMPOSE_PROCESSES)
+        logger.info(
+            "Decomposition process pool started", extra={"workers": settings.DECOMPOSE_PROCESSES}
+        )
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_process_pool, decompose_goal, goal, plan_type)
+
+
+def shutdown_process_pool() -> None:
+    """Stop the decomposition process pool, if it was started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
@@ -0,0 +1,353 @@
+"""Idempotency-Key support for plan creation.
+
+The first request with a given key records the key and a fingerprint of the
+request in the tenant's database, runs the handler and stores its response.
+Retries with the same key replay the stored response without running the
+handler again. A concurrent duplicate in the same worker waits on the first
+request's future; one in another worker polls the stored row until the first
+request finishes. Keys expire after IDEMPOTENCY_TTL_SECONDS.
+
+The owner of an in-progress key holds a lease of IDEMPOTENCY_LEASE_SECONDS
+and renews it while its handler runs. If the owner's worker dies, the lease
+runs out and the next request with the key takes the row over instead of
+getting 409 until the key expires.
+
+Completed responses are also kept in a bounded in-process LRU, so replays in
+the common case do not touch the database at all.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from ..db.sharding import ShardRouter, shard_router
+from ..utils.error_handler import IdempotencyError
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+_StoredResponse = Tuple[str, int, bytes, float]
+
+
+def request_fingerprint(operation: str, request: BaseModel) -> str:
+    """
+    Fingerprint a request so key reuse with a different body can be detected.
+
+    Args:
+        operation: Name of the operation, e.g. the plan type
+        request: Validated request body
+
+    Returns:
+        Hex digest identifying the operation and request contents
+    """
+    payload = json.dumps(request.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{operation}:{payload}".encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Coordinates idempotent execution of handlers keyed by Idempotency-Key."""
+
+    def __init__(
+        self,
+        router: ShardRouter,
+        ttl_seconds: float = 86400.0,
+        cache_size: int = 10_000,
+        wait_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+        lease_seconds: float = 60.0,
+    ):
+        """
+        Initialize store.
+
+        Args:
+            router: Shard router resolving each tenant's database
+            ttl_seconds: Lifetime of a stored key
+            cache_size: Completed responses kept in memory
+            wait_timeout: Seconds a duplicate waits for an in-progress request
+            poll_interval: Seconds between checks of a row owned by another worker
+            lease_seconds: Seconds an in-progress claim stays valid without renewal
+        """
+        self.router = router
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = cache_size
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+
+        self._cache: "OrderedDict[Tuple[str, str], _StoredResponse]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._last_purge = 0.0
+
+    def _cache_get(self, cache_key: Tuple[str, str]) -> Optional[_StoredResponse]:
+        stored = self._cache.get(cache_key)
+        if stored is None:
+            return None
+        if stored[3] <= time.time():
+            del self._cache[cache_key]
+            return None
+        self._cache.move_to_end(cache_key)
+        return stored
+
+    def _cache_put(self, cache_key: Tuple[str, str], stored: _StoredResponse) -> None:
+        self._cache[cache_key] = stored
+        self._cache.move_to_end(cache_key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _claim(self, tenant_id: str, key: str, fingerprint: str) -> Optional[sqlite3.Row]:
+        """
+        Insert an in-progress row for the key, or take over one whose lease ran out.
+
+        Returns:
+            None if this call now owns the key, otherwise the existing row
+        """
+        now = time.time()
+        with self.router.connection(tenant_id) as conn:
+            with conn:
+                if now - self._last_purge > 60:
+                    self._last_purge = now
+                    conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+                else:
+                    conn.execute(
+                        "DELETE FROM idempotency_keys "
+                        "WHERE tenant_id = ? AND idempotency_key = ? AND expires_at <= ?",
+                        (tenant_id, key, now),
+                    )
+                cursor = conn.execute(
+                    """
+                    INSERT INTO idempotency_keys (
+                        tenant_id, idempotency_key, fingerprint, status, created_at, expires_at,
+                        lease_expires_at
+                    )
+                    VALUES (?, ?, ?, 'in_progress', ?, ?, ?)
+                    ON CONFLICT(tenant_id, idempotency_key) DO UPDATE SET
+                        fingerprint = excluded.fingerprint,
+                        created_at = excluded.created_at,
+                        expires_at = excluded.expires_at,
+                        lease_expires_at = excluded.lease_expires_at
+                    WHERE status = 'in_progress' AND lease_expires_at <= excluded.created_at
+                    """,
+                    (
+                        tenant_id,
+                        key,
+                        fingerprint,
+                        now,
+                        now + self.ttl_seconds,
+                        now + self.lease_seconds,
+                    ),
+                )
+                if cursor.rowcount == 1:
+                    return None
+            return self._load(conn, tenant_id, key)
+
+    def _renew(self, tenant_id: str, key: str) -> None:
+        with self.router.connection(tenant_id) as conn:
+            with conn:
+                conn.execute(
+                    "UPDATE idempotency_keys SET lease_expires_at = ? "
+                    "WHERE tenant_id = ? AND idempotency_key = ? AND status = 'in_progress'",
+                    (time.time() + self.lease_seconds, tenant_id, key),
+                )
+
+    async def _keep_lease(self, tenant_id: str, key: str) -> None:
+        """Renew the claim on a key until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await run_in_threadpool(self._renew, tenant_id, key)
+            except Exception as e:
+                logger.warning(
+                    f"Failed to renew idempotency lease: {str(e)}",
+                    extra={"tenant_id": tenant_id},
+                )
+
+    def _load(self, conn: sqlite3.Connection, tenant_id: str, key: str) -> Optional[sqlite3.Row]:
+        return conn.execute(
+            """
+            SELECT fingerprint, status, status_code, response_body, expires_at, lease_expires_at
+            FROM idempotency_keys
+            WHERE tenant_id = ? AND idempotency_key = ?
+            """,
+            (tenant_id, key),
+        ).fetchone()
+
+    def _fetch(self, tenant_id: str, key: str) -> Optional[sqlite3.Row]:
+        with self.router.connection(tenant_id) as conn:
+            return self._load(conn, tenant_id, key)
+
+    def _complete(self, tenant_id: str, key: str, status_code: int, body: bytes) -> None:
+        with self.router.connection(tenant_id) as conn:
+            with conn:
+                conn.execute(
+                    """
+                    UPDATE idempotency_keys
+                    SET status = 'completed', status_code = ?, response_body = ?
+                    WHERE tenant_id = ? AND idempotency_key = ?
+                    """,
+                    (status_code, body, tenant_id, key),
+                )
+
+    def _release(self, tenant_id: str, key: str) -> None:
+        with self.router.connection(tenant_id) as conn:
+            with conn:
+                conn.execute(
+                    "DELETE FROM idempotency_keys "
+                    "WHERE tenant_id = ? AND idempotency_key = ? AND status = 'in_progress'",
+                    (tenant_id, key),
+                )
+
+    @staticmethod
+    def _check_fingerprint(stored_fingerprint: str, fingerprint: str) -> None:
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyError(
+                "Idempotency-Key was already used with a different request",
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+
+    def _replay(self, stored: _StoredResponse, fingerprint: str) -> Response:
+        stored_fingerprint, status_code, body, _ = stored
+        self._check_fingerprint(stored_fingerprint, fingerprint)
+        return Response(
+            content=body,
+            status_code=status_code,
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    async def run(
+        self,
+        tenant_id: str,
+        key: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """
+        Run a handler at most once per key, replaying its response on retries.
+
+        Args:
+            tenant_id: Tenant owning the key
+            key: Client-supplied Idempotency-Key
+            fingerprint: Fingerprint of the request
+            handler: Produces the response for the first request
+
+        Returns:
+            The handler's response, or the stored response for a retry
+
+        Raises:
+            IdempotencyError: If the key is invalid, reused with a different
+                request, or still in progress after wait_timeout
+        """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyError(
+                f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters",
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        cache_key = (tenant_id, key)
+        deadline = time.monotonic() + self.wait_timeout
+
+        while True:
+            stored = self._cache_get(cache_key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+
+            waiter = self._inflight.get(cache_key)
+            if waiter is not None:
+                remaining = deadline - time.monotonic()
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter), timeout=max(remaining, 0))
+                except asyncio.TimeoutError as e:
+                    raise IdempotencyError(
+                        "A request with this Idempotency-Key is still in progress",
+                        status.HTTP_409_CONFLICT,
+                    ) from e
+                continue
+
+            future: asyncio.Future = asyncio.get_running_loop().create_future()
+            self._inflight[cache_key] = future
+            try:
+                row = await run_in_threadpool(self._claim, tenant_id, key, fingerprint)
+                if row is None:
+                    return await self._execute(tenant_id, key, fingerprint, handler)
+            finally:
+                del self._inflight[cache_key]
+                future.set_result(None)
+
+            if row["status"] == "completed":
+                stored = (
+                    row["fingerprint"],
+                    row["status_code"],
+                    row["response_body"],
+                    row["expires_at"],
+                )
+                self._cache_put(cache_key, stored)
+                return self._replay(stored, fingerprint)
+
+            self._check_fingerprint(row["fingerprint"], fingerprint)
+
+            # Another worker owns the key; poll until it finishes, gives up or
+            # lets its lease run out, then claim again.
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                row = await run_in_threadpool(self._fetch, tenant_id, key)
+                if (
+                    row is None
+                    or row["status"] == "completed"
+                    or row["lease_expires_at"] <= time.time()
+                ):
+                    break
+            else:
+                raise IdempotencyError(
+                    "A request with this Idempotency-Key is still in progress",
+                    status.HTTP_409_CONFLICT,
+                )
+
+    async def _execute(
+        self,
+        tenant_id: str,
+        key: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        renewer = asyncio.create_task(self._keep_lease(tenant_id, key))
+        try:
+            response = await handler()
+        except BaseException:
+            await run_in_threadpool(self._release, tenant_id, key)
+            raise
+        finally:
+            renewer.cancel()
+
+        if response.status_code >= 500:
+            await run_in_threadpool(self._release, tenant_id, key)
+            return response
+
+        await run_in_threadpool(self._complete, tenant_id, key, response.status_code, response.body)
+        self._cache_put(
+            (tenant_id, key),
+            (fingerprint, response.status_code, response.body, time.time() + self.ttl_seconds),
+        )
+        return response
+
+    def clear_cache(self) -> None:
+        """Drop cached responses; stored keys remain in the database."""
+        self._cache.clear()
+
+
+idempotency_store = IdempotencyStore(
+    shard_router,
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    cache_size=settings.IDEMPOTENCY_CACHE_SIZE,
+    lease_seconds=settings.IDEMPOTENCY_LEASE_SECONDS,
+)
@@ -0,0 +1,185 @@
+"""In-process worker pool executing jobs from the durable job queue."""
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..db.job_queue import Job, JobQueue
+from ..db.sharding import shard_router
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobWorkerPool:
+    """
+    Leases jobs in batches and runs them on a bounded set of workers.
+
+    Jobs are leased only for idle workers, so none wait locally while their
+    lease runs down, and a running job's lease is renewed until it finishes.
+    """
+
+    def __init__(self, queue: JobQueue, workers: int = 4, poll_interval: float = 0.5):
+        """
+        Initialize pool.
+
+        Args:
+            queue: Durable job queue
+            workers: Number of concurrent worker tasks
+            poll_interval: Seconds between queue polls when idle
+        """
+        self.queue = queue
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{uuid4().hex[:8]}"
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._ready: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._busy = 0
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """
+        Register the coroutine that runs jobs of a kind.
+
+        Args:
+            kind: Job kind
+            handler: Called with the tenant id and payload; returns the result
+        """
+        self._handlers[kind] = handler
+
+    def notify(self) -> None:
+        """Wake the dispatcher after a local enqueue."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        """Start the dispatcher and worker tasks."""
+        if self._tasks:
+            return
+        self._ready = asyncio.Queue(maxsize=self.workers)
+        self._wakeup = asyncio.Event()
+        self._busy = 0
+        self._tasks = [asyncio.create_task(self._dispatch(), name="job-dispatcher")]
+        self._tasks += [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)
+        ]
+        logger.info("Job workers started", extra={"workers": self.workers, "owner": self.owner})
+
+    async def stop(self) -> None:
+        """Cancel workers; leased but unfinished jobs are requeued when their lease expires."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Job workers stopped")
+
+    async def _dispatch(self) -> None:
+        assert self._ready is not None and self._wakeup is not None
+        last_reap = 0.0
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                if loop.time() - last_reap >= self.queue.lease_seconds / 2:
+                    last_reap = loop.time()
+                    requeued = await run_in_threadpool(self.queue.requeue_expired)
+                    if requeued:
+                        logger.warning(
+                            "Requeued jobs with expired leases", extra={"jobs": requeued}
+                        )
+
+                idle = self.workers - self._busy - self._ready.qsize()
+                jobs = (
+                    await run_in_threadpool(self.queue.lease, self.owner, idle) if idle > 0 else []
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job dispatch failed: {str(e)}", exc_info=True)
+                jobs = []
+
+            for job in jobs:
+                await self._ready.put(job)
+
+            if not jobs:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _work(self) -> None:
+        assert self._ready is not None
+        while True:
+            job = await self._ready.get()
+            self._busy += 1
+            try:
+                await self.run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The job stays leased and is requeued once its lease expires.
+                logger.error(
+                    f"Failed to record job outcome: {str(e)}",
+                    exc_info=True,
+                    extra={"job_id": job.job_id},
+                )
+            finally:
+                self._busy -= 1
+                self._wakeup.set()
+
+    async def _keep_lease(self, job: Job) -> None:
+        """Renew a job's lease until cancelled or the lease is lost."""
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            try:
+                if not await run_in_threadpool(self.queue.renew, job, self.owner):
+                    logger.warning("Job lease lost", extra={"job_id": job.job_id})
+                    return
+            except Exception as e:
+                logger.warning(f"Failed to renew job lease: {str(e)}", extra={"job_id": job.job_id})
+
+    async def run_job(self, job: Job) -> None:
+        """Execute a leased job and record its outcome."""
+        handler = self._handlers.get(job.kind)
+        renewer = asyncio.create_task(self._keep_lease(job))
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind {job.kind!r}")
+            result = await handler(job.tenant_id, job.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            retry = await run_in_threadpool(self.queue.fail, job, self.owner, str(e))
+            logger.warning(
+                f"Job failed: {str(e)}",
+                extra={"job_id": job.job_id, "attempts": job.attempts, "retry": retry},
+            )
+            return
+        finally:
+            renewer.cancel()
+
+        await run_in_threadpool(self.queue.complete, job, self.owner, result)
+        logger.info("Job completed", extra={"job_id": job.job_id, "kind": job.kind})
+
+
+job_queue = JobQueue(
+    shard_router,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF,
+)
+
+job_workers = JobWorkerPool(
+    job_queue,
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+)
@@ -0,0 +1,87 @@
+"""Language model backends producing streamed plan output."""
+
+import codecs
+import json
+import logging
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..utils.error_handler import ModelBackendError
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ModelBackend(ABC):
+    """Base class for model backends."""
+
+    name = "model"
+
+    @abstractmethod
+    def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Generate output for a prompt.
+
+        Args:
+            prompt: Rendered planning prompt
+
+        Returns:
+            Async iterator of JSON text chunks describing the tasks
+        """
+
+
+class HTTPModelBackend(ModelBackend):
+    """Posts the prompt to an HTTP endpoint and streams the response body."""
+
+    name = "http"
+
+    def __init__(self, endpoint: str, timeout: float = 30.0, chunk_size: int = 4096):
+        """
+        Initialize backend.
+
+        Args:
+            endpoint: URL accepting ``{"prompt": ...}`` and streaming JSON text back
+            timeout: Socket timeout in seconds
+            chunk_size: Maximum bytes read per chunk
+        """
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+    def _open(self, prompt: str):
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps({"prompt": prompt}).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except OSError as e:
+            raise ModelBackendError(f"Model request failed: {str(e)}") from e
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the endpoint's response body as text chunks."""
+        response = await run_in_threadpool(self._open, prompt)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            while True:
+                try:
+                    data = await run_in_threadpool(response.read1, self.chunk_size)
+                except OSError as e:
+                    raise ModelBackendError(f"Model stream failed: {str(e)}") from e
+                if not data:
+                    break
+                yield decoder.decode(data)
+        finally:
+            response.close()
+
+
+def build_backend() -> Optional[ModelBackend]:
+    """Create the configured backend, or None when no model is configured."""
+    if not settings.MODEL_ENDPOINT:
+        return None
+    return HTTPModelBackend(settings.MODEL_ENDPOINT, timeout=settings.MODEL_TIMEOUT_SECONDS)
@@ -1,22 +1,59 @@
 """Core planning service with AI integration."""
 
 import logging
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List
+from typing import AsyncIterable, AsyncIterator, Callable, List, Optional, Tuple
 
+from ..models.schemas import PlanSource, PriorityLevel, Task, TaskStatus
+from ..utils.error_handler import ModelBackendError
+from ..utils.tracing import traced
 from .config import settings
-from ..models.schemas import PriorityLevel, Task, TaskStatus
+from .decomposition import SubtaskSpec, fan_out, merge_subtasks, run_decomposition
+from .goal_memo import GoalMemo, goal_memo
+from .model_backend import ModelBackend, build_backend
+from .resilience import CallResult, ResilientCaller, build_caller
+from .task_stream import aparse_tasks
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class GeneratedPlan:
+    """Tasks for a plan and the path that produced them."""
+
+    tasks: List[Task]
+    source: PlanSource
+
+
 class PlannerService:
     """Service for generating weekly and daily plans."""
 
-    def __init__(self):
-        """Initialize planner service with prompt templates."""
+    def __init__(
+        self,
+        memo: Optional[GoalMemo] = None,
+        backend: Optional[ModelBackend] = None,
+        caller: Optional[ResilientCaller] = None,
+    ):
+        """
+        Initialize planner service with prompt templates.
+
+        Args:
+            memo: Goal memo used to reuse breakdowns of near-duplicate goals;
+                defaults to the shared memo when GOAL_MEMO_ENABLED is set
+            backend: Model backend; defaults to the one configured by
+                MODEL_ENDPOINT, if any
+            caller: Hedging and circuit-breaking wrapper for backend calls
+        """
         self.prompts_dir = Path(settings.PROMPTS_DIR)
+        self.memo = (
+            memo if memo is not None else (goal_memo if settings.GOAL_MEMO_ENABLED else None)
+        )
+        self.backend = backend if backend is not None else build_backend()
+        self.caller = caller if caller is not None else build_caller()
         self._load_templates()
 
     def _load_templates(self) -> None:
@@ -41,6 +78,101 @@ class PlannerService:
             logger.error(f"Failed to load templates: {str(e)}", exc_info=True)
             raise
 
+    @traced("PlannerService.plan")
+    async def plan(
+        self,
+        plan_type: str,
+        context: str,
+        goals: List[str],
+        constraints: List[str],
+    ) -> GeneratedPlan:
+        """
+        Generate a plan with the model, falling back to the deterministic planner.
+
+        Each goal is sent to the model as its own call, at most
+        PLAN_FANOUT_LIMIT at a time, unless the goal memo holds the model's
+        breakdown of the same or a near-duplicate goal. The model is skipped
+        while its circuit breaker is open, and the whole plan falls back when
+        any goal's call fails or misses MODEL_DEADLINE_SECONDS.
+
+        Args:
+            plan_type: "weekly" or "daily"
+            context: Planning context
+            goals: List of goals to achieve
+            constraints: Planning constraints
+
+        Returns:
+            The generated tasks and the path that served them
+        """
+        if self.backend is not None:
+            namespace = f"model:{plan_type}"
+
+            async def expand(goal: str) -> CallResult[List[Task]]:
+                if self.memo is not None:
+                    hit = self.memo.lookup(goal, namespace=namespace)
+                    if hit is not None:
+                        return CallResult(self._reuse_tasks(hit.value), hedged=False, latency=0.0)
+
+                prompt = self._render_prompt(plan_type, context, [goal], constraints)
+                result = await self.caller.call(lambda: self._model_tasks(prompt))
+                if self.memo is not None:
+                    self.memo.store(
+                        goal, result.value, namespace=namespace, cost_seconds=result.latency
+                    )
+                return result
+
+            try:
+                results = await fan_out(goals, expand, settings.PLAN_FANOUT_LIMIT)
+            except ModelBackendError as e:
+                logger.warning(
+                    f"Falling back to deterministic planner: {e.message}",
+                    extra={"plan_type": plan_type, "breaker_state": self.caller.breaker.state},
+                )
+            else:
+                hedged = any(result.hedged for result in results)
+                return GeneratedPlan(
+                    tasks=merge_subtasks([result.value for result in results]),
+                    source=PlanSource.MODEL_HEDGE if hedged else PlanSource.MODEL,
+                )
+
+        if plan_type == "weekly":
+            tasks = await self.generate_weekly_plan(context, goals, constraints)
+        else:
+            tasks = await self.generate_daily_plan(context, goals, constraints)
+        source = PlanSource.DETERMINISTIC if self.backend is None else PlanSource.FALLBACK
+        return GeneratedPlan(tasks=tasks, source=source)
+
+    def _render_prompt(
+        self, plan_type: str, context: str, goals: List[str], constraints: List[str]
+    ) -> str:
+        """Fill the plan type's prompt template."""
+        template = self.weekly_template if plan_type == "weekly" else self.daily_template
+        return template.format(
+            context=context,
+            goals="\n".join(f"- {goal}" for goal in goals),
+            constraints="\n".join(f"- {constraint}" for constraint in constraints) or "None",
+        )
+
+    def _reuse_tasks(self, tasks: List[Task]) -> List[Task]:
+        """Copy memoized model tasks, moving their dates forward to now."""
+        now = datetime.utcnow()
+        reused = []
+        for task in tasks:
+            shift = now - task.created_at
+            due_date = task.due_date + shift if task.due_date is not None else None
+            reused.append(
+                task.model_copy(update={"created_at": now, "updated_at": now, "due_date": due_date})
+            )
+        return reused
+
+    async def _model_tasks(self, prompt: str) -> List[Task]:
+        """Run one model attempt and collect its tasks."""
+        tasks = [task async for task in self.stream_tasks(self.backend.stream(prompt))]
+        if not tasks:
+            raise ModelBackendError("Model returned no usable tasks")
+        return tasks
+
+    @traced("PlannerService.generate_weekly_plan")
     async def generate_weekly_plan(
         self,
         context: str,
@@ -60,26 +192,19 @@ class PlannerService:
         """
         logger.info("Generating weekly plan", extra={"goals_count": len(goals)})
 
-        tasks = []
         base_date = datetime.utcnow()
-
-        for idx, goal in enumerate(goals):
-            task = Task(
-                id=idx + 1,
-                title=goal,
-                description=f"Weekly task: {goal}\nContext: {context[:100]}...",
-                priority=self._determine_priority(idx, len(goals)),
-                status=TaskStatus.PENDING,
-                estimated_hours=8.0,
-                due_date=base_date + timedelta(days=(idx % 7)),
-                created_at=base_date,
-                updated_at=base_date,
-            )
-            tasks.append(task)
+        tasks = await self._expand_goals(
+            "weekly",
+            context,
+            goals,
+            base_date,
+            lambda idx, spec: base_date + timedelta(days=min(idx % 7 + spec.day_offset, 6)),
+        )
 
         logger.info(f"Generated {len(tasks)} tasks for weekly plan")
         return tasks
 
+    @traced("PlannerService.generate_daily_plan")
     async def generate_daily_plan(
         self,
         context: str,
@@ -99,27 +224,110 @@ class PlannerService:
         """
         logger.info("Generating daily plan", extra={"goals_count": len(goals)})
 
-        tasks = []
         base_date = datetime.utcnow()
         today_end = base_date.replace(hour=23, minute=59, second=59)
-
-        for idx, goal in enumerate(goals):
-            task = Task(
-                id=idx + 1,
-                title=goal,
-                description=f"Daily task: {goal}\nContext: {context[:100]}...",
-                priority=self._determine_priority(idx, len(goals)),
-                status=TaskStatus.PENDING,
-                estimated_hours=2.0,
-                due_date=today_end,
-                created_at=base_date,
-                updated_at=base_date,
-            )
-            tasks.append(task)
+        tasks = await self._expand_goals(
+            "daily", context, goals, base_date, lambda idx, spec: today_end
+        )
 
         logger.info(f"Generated {len(tasks)} tasks for daily plan")
         return tasks
 
+    async def _expand_goals(
+        self,
+        plan_type: str,
+        context: str,
+        goals: List[str],
+        base_date: datetime,
+        due_date: Callable[[int, SubtaskSpec], datetime],
+    ) -> List[Task]:
+        """
+        Break every goal down concurrently and merge the subtasks.
+
+        Args:
+            plan_type: "weekly" or "daily"
+            context: Planning context
+            goals: List of goals to achieve
+            base_date: Creation time of the tasks
+            due_date: Due date of a subtask given its goal's index
+
+        Returns:
+            Merged, deduplicated tasks numbered in goal order
+        """
+        label = "Weekly" if plan_type == "weekly" else "Daily"
+
+        async def expand(indexed: Tuple[int, str]) -> List[Task]:
+            idx, goal = indexed
+            subtasks = []
+            for spec in await self._get_breakdown(goal, plan_type):
+                title = spec.render_title(goal)
+                subtasks.append(
+                    Task(
+                        title=title,
+                        description=f"{label} task: {title}\nContext: {context[:100]}...",
+                        priority=self._determine_priority(idx, len(goals)),
+                        status=TaskStatus.PENDING,
+                        estimated_hours=spec.estimated_hours,
+                        due_date=due_date(idx, spec),
+                        created_at=base_date,
+                        updated_at=base_date,
+                    )
+                )
+            return subtasks
+
+        per_goal = await fan_out(list(enumerate(goals)), expand, settings.PLAN_FANOUT_LIMIT)
+        return merge_subtasks(per_goal)
+
+    async def stream_tasks(self, chunks: AsyncIterable[str]) -> AsyncIterator[Task]:
+        """
+        Turn streamed model output into tasks as each one completes.
+
+        Args:
+            chunks: JSON text chunks as returned by the model
+
+        Yields:
+            Validated tasks, numbered in arrival order
+        """
+        count = 0
+        async for task in aparse_tasks(chunks):
+            count += 1
+            task.id = count
+            yield task
+        logger.info(f"Streamed {count} tasks from model output")
+
+    @traced("PlannerService.get_breakdown")
+    async def _get_breakdown(self, goal: str, plan_type: str) -> Tuple[SubtaskSpec, ...]:
+        """
+        Return the breakdown for a goal, reusing a memoized near-duplicate if any.
+
+        Args:
+            goal: Goal text
+            plan_type: "weekly" or "daily"
+
+        Returns:
+            Subtask specs with dates expressed as offsets from the goal's slot
+        """
+        if self.memo is not None:
+            hit = self.memo.lookup(goal, namespace=plan_type)
+            if hit is not None:
+                logger.debug(
+                    "Goal memo hit",
+                    extra={"plan_type": plan_type, "similarity": hit.similarity},
+                )
+                return hit.value
+
+        started = time.perf_counter()
+        breakdown = await run_decomposition(goal, plan_type)
+
+        if self.memo is not None:
+            self.memo.store(
+                goal,
+                breakdown,
+                namespace=plan_type,
+                cost_seconds=time.perf_counter() - started,
+            )
+        return breakdown
+
     def _determine_priority(self, index: int, total: int) -> PriorityLevel:
         """Determine task priority based on position."""
         if index == 0:
@@ -128,3 +336,25 @@ class PlannerService:
             return PriorityLevel.MEDIUM
         else:
             return PriorityLevel.LOW
+
+
+_planner_service: Optional[PlannerService] = None
+_planner_service_lock = threading.Lock()
+
+
+def get_planner_service() -> PlannerService:
+    """
+    Return the shared planner service, building it on first use.
+
+    Building reads the prompt templates and sets up the model backend, so it
+    is kept out of import time; the startup pipeline calls this to warm it.
+
+    Returns:
+        The process-wide PlannerService
+    """
+    global _planner_service
+    if _planner_service is None:
+        with _planner_service_lock:
+            if _planner_service is None:
+                _planner_service = PlannerService()
+    return _planner_service
@@ -0,0 +1,243 @@
+"""In-process publish/subscribe hub for plan and task update events.
+
+Each WebSocket connection owns a ``Subscription`` to a single topic. Publishing
+serializes an event once and appends the text to every subscriber's bounded
+buffer without awaiting, so a publisher never waits on a client. A subscriber
+whose buffer is full has fallen behind: it is dropped instead of slowing the
+others down or growing without bound, and its connection is closed so the
+client can reconnect and re-fetch.
+
+The hub lives in one worker process and must only be used from that worker's
+event loop. With several workers, a client only sees updates made through the
+worker it is connected to.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Dict, Optional
+
+from ..models.schemas import PlanEvent
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SLOW_CONSUMER = "slow consumer"
+HUB_CLOSED = "hub closed"
+
+
+def plan_topic(tenant_id: str, plan_id: str) -> str:
+    """Topic carrying events for one plan."""
+    return f"plan:{tenant_id}:{plan_id}"
+
+
+def tenant_topic(tenant_id: str) -> str:
+    """Topic carrying events for every plan of a tenant."""
+    return f"tenant:{tenant_id}"
+
+
+class Subscription:
+    """A subscriber's bounded buffer of serialized events."""
+
+    __slots__ = ("topic", "reason", "_buffer", "_limit", "_waiter")
+
+    def __init__(self, topic: str, buffer_size: int):
+        """
+        Initialize subscription.
+
+        Args:
+            topic: Topic subscribed to
+            buffer_size: Undelivered messages held before the subscriber is dropped
+        """
+        self.topic = topic
+        self.reason: Optional[str] = None
+        self._buffer: deque = deque()
+        self._limit = buffer_size
+        self._waiter: Optional[asyncio.Future] = None
+
+    @property
+    def closed(self) -> bool:
+        """Whether the subscription was closed or dropped."""
+        return self.reason is not None
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered, undelivered messages."""
+        return len(self._buffer)
+
+    def _offer(self, message: str) -> bool:
+        """Buffer a message; False if the buffer is full."""
+        if len(self._buffer) >= self._limit:
+            return False
+        self._buffer.append(message)
+        self._wake()
+        return True
+
+    def _close(self, reason: str) -> None:
+        if self.reason is None:
+            self.reason = reason
+            self._buffer.clear()
+            self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def get(self) -> Optional[str]:
+        """
+        Wait for the next message.
+
+        Returns:
+            The next serialized event, or None once the subscription is closed
+        """
+        while not self._buffer:
+            if self.reason is not None:
+                return None
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        if self.reason is not None:
+            return None
+        return self._buffer.popleft()
+
+
+class PubSubHub:
+    """Topic-based fan-out to bounded subscriber buffers."""
+
+    def __init__(self, buffer_size: int = 256, max_subscribers: int = 20_000):
+        """
+        Initialize hub.
+
+        Args:
+            buffer_size: Per-subscriber buffer length before it is dropped
+            max_subscribers: Subscriptions allowed at once; 0 for no limit
+        """
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._topics: Dict[str, Dict[Subscription, None]] = {}
+        self._count = 0
+
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        """Number of open subscriptions."""
+        return self._count
+
+    def subscribe(self, topic: str) -> Optional[Subscription]:
+        """
+        Subscribe to a topic.
+
+        Args:
+            topic: Topic from ``plan_topic`` or ``tenant_topic``
+
+        Returns:
+            The subscription, or None if the hub is at max_subscribers
+        """
+        if self.max_subscribers and self._count >= self.max_subscribers:
+            logger.warning("Subscriber limit reached", extra={"limit": self.max_subscribers})
+            return None
+        subscription = Subscription(topic, self.buffer_size)
+        self._topics.setdefault(topic, {})[subscription] = None
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription, reason: str = "unsubscribed") -> None:
+        """
+        Remove a subscription and wake its reader.
+
+        Args:
+            subscription: Subscription to remove
+            reason: Recorded as the subscription's close reason
+        """
+        subscribers = self._topics.get(subscription.topic)
+        if subscribers is not None and subscription in subscribers:
+            del subscribers[subscription]
+            self._count -= 1
+            if not subscribers:
+                del self._topics[subscription.topic]
+        subscription._close(reason)
+
+    def has_subscribers(self, topic: str) -> bool:
+        """Whether anyone is subscribed to a topic."""
+        return topic in self._topics
+
+    def publish(self, topic: str, message: str) -> int:
+        """
+        Append a message to every subscriber buffer of a topic.
+
+        Subscribers whose buffer is full are dropped.
+
+        Args:
+            topic: Topic to publish to
+            message: Serialized event
+
+        Returns:
+            Number of subscribers the message was buffered for
+        """
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return 0
+
+        self.published += 1
+        delivered = 0
+        slow = []
+        for subscription in subscribers:
+            if subscription._offer(message):
+                delivered += 1
+            else:
+                slow.append(subscription)
+
+        for subscription in slow:
+            self.unsubscribe(subscription, SLOW_CONSUMER)
+        if slow:
+            self.dropped += len(slow)
+            logger.warning("Dropped slow subscribers", extra={"topic": topic, "dropped": len(slow)})
+        self.delivered += delivered
+        return delivered
+
+    def publish_event(self, tenant_id: str, event: PlanEvent) -> int:
+        """
+        Publish a plan event to the plan's topic and the tenant feed.
+
+        The event is serialized once, and not at all when nobody listens.
+
+        Args:
+            tenant_id: Tenant owning the plan
+            event: Event to publish
+
+        Returns:
+            Number of subscribers the event was buffered for
+        """
+        topics = [plan_topic(tenant_id, event.plan_id), tenant_topic(tenant_id)]
+        topics = [topic for topic in topics if topic in self._topics]
+        if not topics:
+            return 0
+        message = event.model_dump_json()
+        return sum(self.publish(topic, message) for topic in topics)
+
+    def close(self) -> None:
+        """Close every subscription, e.g. on shutdown."""
+        for subscribers in list(self._topics.values()):
+            for subscription in list(subscribers):
+                self.unsubscribe(subscription, HUB_CLOSED)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report subscriber and message counters."""
+        return {
+            "subscribers": self._count,
+            "topics": len(self._topics),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+event_hub = PubSubHub(
+    buffer_size=settings.WS_BUFFER_SIZE,
+    max_subscribers=settings.WS_MAX_SUBSCRIBERS,
+)
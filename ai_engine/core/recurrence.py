@@ -0,0 +1,83 @@
+"""Lazy expansion of recurrence rules into occurrence dates.
+
+Rules are stored once and never expanded from their start: ``occurrence_dates``
+jumps arithmetically to the first period that can fall inside the requested
+window and yields dates from there, so the cost of a query depends on the size
+of the window, not on how long ago the rule started.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
+
+from ..models.schemas import RecurrenceFrequency, RecurrenceRule
+
+_WEEK = timedelta(days=7)
+
+
+def resolve_rule(rule: RecurrenceRule, due_date: Optional[datetime]) -> RecurrenceRule:
+    """
+    Fill in a rule's defaults from the task it is attached to.
+
+    Args:
+        rule: Rule as submitted
+        due_date: The task's due date, if any
+
+    Returns:
+        Rule with starts_on set and, for weekly rules, weekdays set
+    """
+    starts_on = rule.starts_on or (due_date.date() if due_date else date.today())
+    weekdays = rule.weekdays
+    if rule.frequency == RecurrenceFrequency.WEEKLY and weekdays is None:
+        weekdays = [starts_on.weekday()]
+    return rule.model_copy(update={"starts_on": starts_on, "weekdays": weekdays})
+
+
+def occurrence_dates(
+    rule: RecurrenceRule,
+    start: date,
+    end: date,
+    skip: Optional[date] = None,
+) -> Iterator[date]:
+    """
+    Yield the dates a resolved rule occurs on within a window, in order.
+
+    Args:
+        rule: Rule with starts_on (and weekdays, if weekly) set
+        start: First day of the window, inclusive
+        end: Last day of the window, inclusive
+        skip: Date to leave out, e.g. the stored task's own due date
+
+    Yields:
+        Occurrence dates
+    """
+    first = rule.starts_on
+    low = max(start, first)
+    high = min(end, rule.until) if rule.until else end
+    if low > high:
+        return
+
+    if rule.frequency == RecurrenceFrequency.DAILY:
+        step = timedelta(days=rule.interval)
+        periods = -(-(low - first).days // rule.interval)
+        day = first + periods * step
+        while day <= high:
+            if day != skip:
+                yield day
+            day += step
+        return
+
+    step = _WEEK * rule.interval
+    first_monday = first - timedelta(days=first.weekday())
+    weeks = ((low - timedelta(days=low.weekday())) - first_monday).days // 7
+    monday = first_monday + (weeks // rule.interval) * step
+    while monday <= high:
+        for weekday in rule.weekdays:
+            day = monday + timedelta(days=weekday)
+            if low <= day <= high and day != skip:
+                yield day
+        monday += step
+
+
+def occurs_on(rule: RecurrenceRule, day: date, skip: Optional[date] = None) -> bool:
+    """Whether a resolved rule has an occurrence on a given day."""
+    return next(occurrence_dates(rule, day, day, skip), None) is not None
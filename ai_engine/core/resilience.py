@@ -0,0 +1,318 @@
+"""Hedged requests and circuit breaking around the model backend.
+
+``ResilientCaller.call`` runs one logical model call:
+
+* If the circuit breaker is open, the call is refused immediately so the
+  caller can fall back.
+* Otherwise the first attempt starts. If it has not finished after the
+  p95 latency of recent successful attempts, a second (hedged) attempt
+  starts and whichever succeeds first wins; the other is cancelled. A
+  failed attempt also starts the hedge straight away.
+* If no attempt succeeds before the deadline, the call fails.
+
+Outcomes feed the breaker, which opens when too many recent calls failed or
+were slower than the latency threshold, stays open for ``open_seconds`` and
+then lets a single probe call through to decide whether to close again.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+from ..utils.error_handler import ModelBackendError
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class LatencyTracker:
+    """Rolling window of successful attempt latencies."""
+
+    def __init__(self, window: int = 200, min_samples: int = 10):
+        """
+        Initialize tracker.
+
+        Args:
+            window: Number of recent latencies kept
+            min_samples: Samples needed before percentiles are reported
+        """
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of a successful attempt."""
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Return the q-th quantile of recent latencies.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Latency in seconds, or None until min_samples have been recorded
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class CircuitBreaker:
+    """Failure- and latency-based circuit breaker."""
+
+    def __init__(
+        self,
+        failure_ratio: float = 0.5,
+        latency_threshold: float = 8.0,
+        window: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize breaker.
+
+        Args:
+            failure_ratio: Share of bad calls in the window that opens the breaker
+            latency_threshold: Calls slower than this many seconds count as bad
+            window: Number of recent calls considered
+            min_calls: Calls needed in the window before the breaker can open
+            open_seconds: How long the breaker stays open before probing
+            clock: Monotonic time source
+        """
+        self.failure_ratio = failure_ratio
+        self.latency_threshold = latency_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.clock = clock
+
+        self.state = CLOSED
+        self._outcomes: deque = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend now."""
+        if self.state == OPEN:
+            if self.clock() - self._opened_at < self.open_seconds:
+                return False
+            self.state = HALF_OPEN
+            self._probing = False
+            logger.info("Circuit breaker half-open, probing model backend")
+
+        if self.state == HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        """
+        Record the outcome of an allowed call.
+
+        Args:
+            ok: Whether the call succeeded
+            latency: Duration of a successful call in seconds
+        """
+        good = ok and (latency is None or latency <= self.latency_threshold)
+
+        if self.state == HALF_OPEN:
+            self._probing = False
+            if good:
+                self.state = CLOSED
+                self._outcomes.clear()
+                logger.info("Circuit breaker closed")
+            else:
+                self._trip()
+            return
+
+        self._outcomes.append(good)
+        bad = self._outcomes.count(False)
+        if (
+            len(self._outcomes) >= self.min_calls
+            and bad / len(self._outcomes) >= self.failure_ratio
+        ):
+            self._trip()
+
+    def abandon(self) -> None:
+        """Forget an allowed call that was cancelled before it finished."""
+        self._probing = False
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+        logger.warning("Circuit breaker opened", extra={"open_seconds": self.open_seconds})
+
+
+class CallResult(Generic[T]):
+    """Result of a resilient call."""
+
+    __slots__ = ("value", "hedged", "latency")
+
+    def __init__(self, value: T, hedged: bool, latency: float):
+        self.value = value
+        self.hedged = hedged
+        self.latency = latency
+
+
+class ResilientCaller:
+    """Runs backend calls with hedging, a deadline and a circuit breaker."""
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        latency: Optional[LatencyTracker] = None,
+        deadline: float = 10.0,
+        hedge_enabled: bool = True,
+        hedge_initial_delay: float = 2.0,
+        hedge_min_delay: float = 0.05,
+    ):
+        """
+        Initialize caller.
+
+        Args:
+            breaker: Circuit breaker guarding the backend
+            latency: Tracker of successful attempt latencies
+            deadline: Seconds a call may take before it is abandoned
+            hedge_enabled: Whether to send a hedged second attempt
+            hedge_initial_delay: Hedge delay used until enough latencies are known
+            hedge_min_delay: Lower bound on the hedge delay
+        """
+        self.breaker = breaker
+        self.latency = latency or LatencyTracker()
+        self.deadline = deadline
+        self.hedge_enabled = hedge_enabled
+        self.hedge_initial_delay = hedge_initial_delay
+        self.hedge_min_delay = hedge_min_delay
+
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.rejected = 0
+        self.failures = 0
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait before sending the hedged attempt."""
+        p95 = self.latency.percentile(0.95)
+        return max(self.hedge_min_delay, self.hedge_initial_delay if p95 is None else p95)
+
+    async def call(self, attempt: Callable[[], Awaitable[T]]) -> CallResult[T]:
+        """
+        Run a backend call.
+
+        Args:
+            attempt: Starts one attempt; called again for the hedge
+
+        Returns:
+            The first successful attempt's value
+
+        Raises:
+            ModelBackendError: If the breaker is open or no attempt succeeded
+                in time
+        """
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise ModelBackendError("Model circuit breaker is open")
+
+        self.calls += 1
+        started = time.perf_counter()
+        try:
+            value, index = await self._race(attempt)
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except Exception:
+            self.failures += 1
+            self.breaker.record(False)
+            raise
+
+        elapsed = time.perf_counter() - started
+        self.breaker.record(True, elapsed)
+        if index == 1:
+            self.hedge_wins += 1
+        return CallResult(value, hedged=index == 1, latency=elapsed)
+
+    async def _timed(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        started = time.perf_counter()
+        value = await attempt()
+        self.latency.record(time.perf_counter() - started)
+        return value
+
+    async def _race(self, attempt: Callable[[], Awaitable[T]]):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        tasks: List[asyncio.Task] = [asyncio.ensure_future(self._timed(attempt))]
+        hedge_at = loop.time() + self.hedge_delay() if self.hedge_enabled else None
+        error: Optional[BaseException] = None
+
+        try:
+            while True:
+                pending = [task for task in tasks if not task.done()]
+                if not pending and (hedge_at is None or len(tasks) > 1):
+                    raise ModelBackendError(f"Model call failed: {error}") from error
+
+                now = loop.time()
+                if now >= deadline:
+                    raise ModelBackendError(f"Model call missed the {self.deadline}s deadline")
+
+                wake = deadline
+                if hedge_at is not None and len(tasks) == 1:
+                    if now >= hedge_at or not pending:
+                        tasks.append(asyncio.ensure_future(self._timed(attempt)))
+                        self.hedges += 1
+                        continue
+                    wake = min(wake, hedge_at)
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=wake - now, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), tasks.index(task)
+                    error = task.exception()
+                    logger.warning(f"Model attempt failed: {str(error)}")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report call, hedge and breaker counters."""
+        return {
+            "breaker_state": self.breaker.state,
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "hedge_delay_seconds": self.hedge_delay(),
+        }
+
+
+def build_caller() -> ResilientCaller:
+    """Create a caller from settings."""
+    return ResilientCaller(
+        CircuitBreaker(
+            failure_ratio=settings.BREAKER_FAILURE_RATIO,
+            latency_threshold=settings.BREAKER_LATENCY_THRESHOLD,
+            window=settings.BREAKER_WINDOW,
+            min_calls=settings.BREAKER_MIN_CALLS,
+            open_seconds=settings.BREAKER_OPEN_SECONDS,
+        ),
+        deadline=settings.MODEL_DEADLINE_SECONDS,
+        hedge_enabled=settings.MODEL_HEDGE_ENABLED,
+        hedge_initial_delay=settings.MODEL_HEDGE_INITIAL_DELAY,
+        hedge_min_delay=settings.MODEL_HEDGE_MIN_DELAY,
+    )
@@ -0,0 +1,107 @@
+"""Startup pipeline: timed, parallel warm-up phases and the readiness gate.
+
+Nothing expensive runs at import time. Services are built lazily on first
+use, and the lifespan warms them in parallel threads, each as a named phase.
+The worker reports ready only after every phase has finished, so a load
+balancer polling ``/ready`` sends no traffic to an instance that is still
+migrating its database or loading templates. ``/health`` keeps answering
+throughout as the liveness check.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupState:
+    """Import and startup timings of this worker, and whether it is ready."""
+
+    def __init__(self):
+        """Initialize state; the worker starts out not ready."""
+        self.import_seconds: Optional[float] = None
+        self.startup_seconds: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.ready = False
+        self.error: Optional[str] = None
+        self._started: Optional[float] = None
+
+    def record_import(self, seconds: float) -> None:
+        """Record how long importing the application took."""
+        self.import_seconds = seconds
+
+    def begin(self) -> None:
+        """Start timing a startup; clears the phases of any previous one."""
+        self._started = time.perf_counter()
+        self.startup_seconds = None
+        self.phases = {}
+        self.ready = False
+        self.error = None
+
+    async def run_phases(self, phases: Dict[str, Callable[[], Any]]) -> None:
+        """
+        Run blocking phases concurrently in threads, timing each.
+
+        Args:
+            phases: Blocking callables by phase name
+
+        Raises:
+            Exception: The first phase failure, after every phase has finished
+        """
+
+        async def timed(name: str, fn: Callable[[], Any]) -> None:
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(fn)
+            finally:
+                self.phases[name] = time.perf_counter() - started
+
+        results = await asyncio.gather(
+            *(timed(name, fn) for name, fn in phases.items()), return_exceptions=True
+        )
+        for name, result in zip(phases, results, strict=True):
+            if isinstance(result, BaseException):
+                self.error = f"{name}: {result}"
+                logger.error(
+                    f"Startup phase failed: {name}",
+                    exc_info=result,
+                    extra={"phase": name},
+                )
+                raise result
+
+    def mark_ready(self) -> None:
+        """Finish the startup and open the readiness gate."""
+        if self._started is not None:
+            self.startup_seconds = time.perf_counter() - self._started
+        self.ready = True
+        logger.info(
+            "Startup complete",
+            extra={
+                "import_ms": round((self.import_seconds or 0) * 1000, 1),
+                "startup_ms": round((self.startup_seconds or 0) * 1000, 1),
+                **{f"{name}_ms": round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            },
+        )
+
+    def mark_stopping(self) -> None:
+        """Close the readiness gate so traffic drains before shutdown."""
+        self.ready = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return readiness and timings in milliseconds."""
+        return {
+            "ready": self.ready,
+            "import_ms": _ms(self.import_seconds),
+            "startup_ms": _ms(self.startup_seconds),
+            "phases_ms": {name: _ms(seconds) for name, seconds in self.phases.items()},
+            "error": self.error,
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+startup_state = StartupState()
@@ -0,0 +1,309 @@
+"""Incremental parsing of streamed model output into validated tasks.
+
+Language models return plans as a stream of JSON text. ``TaskStreamParser``
+consumes that text chunk by chunk and emits each task as soon as its closing
+brace arrives, instead of waiting for the whole body and calling
+``json.loads`` on it. Only the text of the object currently being received is
+buffered, so peak memory stays at roughly one task regardless of plan size.
+
+Task objects are the elements of a top-level array, or of an array directly
+inside a top-level object (for example ``{"tasks": [...]}``). Text outside
+those arrays, such as prose or Markdown fences around the JSON, is ignored.
+Malformed entries are repaired where possible (trailing commas, Python
+literals, mis-cased enum values, out-of-range numbers, over-long strings,
+a truncated final object) and skipped otherwise.
+"""
+
+import json
+import logging
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+from pydantic import ValidationError
+
+from ..models.schemas import Task
+
+logger = logging.getLogger(__name__)
+
+# A bracket or a whole (possibly unterminated) string; group 1 is the closing
+# quote. _STRING_REST continues a string split across chunks.
+_TOKEN = re.compile(r'[{}\[\]]|"[^"\\]*(?:\\.[^"\\]*)*(")?')
+_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*(")?')
+
+# Next character that changes state, outside and inside a string.
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_PYTHON_LITERALS = re.compile(r"\b(True|False|None)\b")
+_PYTHON_TO_JSON = {"True": "true", "False": "false", "None": "null"}
+
+_MAX_LENGTHS = {"title": 200, "description": 1000}
+_BOUNDS = {"estimated_hours": (0.0, 168.0)}
+_ENUM_FIELDS = ("priority", "status")
+_MAX_SALVAGE_ATTEMPTS = 8
+
+
+class TaskStreamParser:
+    """Push parser turning chunks of JSON text into validated tasks."""
+
+    def __init__(self) -> None:
+        """Initialize parser state and counters."""
+        self.emitted = 0
+        self.repaired = 0
+        self.skipped = 0
+
+        self._buffer = ""
+        self._pos = 0
+        self._in_string = False
+        self._stack: List[str] = []
+        self._object_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Task]:
+        """
+        Consume a chunk of model output.
+
+        Args:
+            chunk: Next piece of the streamed text
+
+        Returns:
+            Tasks whose objects were completed by this chunk
+        """
+        self._buffer += chunk
+        tasks: List[Task] = []
+        buffer = self._buffer
+        pos = self._pos
+        stack = self._stack
+
+        if self._in_string:
+            # Resume a string split across chunks.
+            match = _STRING_REST.match(buffer, pos)
+            pos = match.end()
+            self._in_string = match.group(1) is None
+
+        while not self._in_string:
+            match = _TOKEN.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char = match.group()[0]
+
+            if char == '"':
+                if not stack:
+                    # Quotes in surrounding prose are not JSON strings.
+                    pos = match.start() + 1
+                    continue
+                pos = match.end()
+                self._in_string = match.group(1) is None
+                continue
+
+            pos = match.end()
+            if char in "{[":
+                if char == "{" and self._is_task_position():
+                    self._object_start = match.start()
+                stack.append(char)
+                continue
+
+            if not stack:
+                continue
+            stack.pop()
+            if char == "}" and self._object_start is not None and self._is_task_position():
+                task = self._build(buffer[self._object_start : pos])
+                self._object_start = None
+                if task is not None:
+                    tasks.append(task)
+
+        self._compact(pos)
+        return tasks
+
+    def close(self) -> List[Task]:
+        """
+        Finish the stream, salvaging a truncated final task if possible.
+
+        Returns:
+            The final task, if the stream ended inside one that could be repaired
+        """
+        tasks: List[Task] = []
+        if self._object_start is not None:
+            task = self._salvage(self._buffer[self._object_start :])
+            if task is not None:
+                tasks.append(task)
+
+        self._buffer = ""
+        self._pos = 0
+        self._in_string = False
+        self._stack = []
+        self._object_start = None
+        return tasks
+
+    def _is_task_position(self) -> bool:
+        """Whether the innermost container is an array holding task objects."""
+        return self._stack in (["["], ["{", "["])
+
+    def _compact(self, pos: int) -> None:
+        """Drop text that no longer needs to be kept."""
+        if self._object_start is not None:
+            keep_from = self._object_start
+            self._object_start = 0
+        else:
+            keep_from = pos
+        if keep_from:
+            self._buffer = self._buffer[keep_from:]
+            pos -= keep_from
+        self._pos = pos
+
+    def _salvage(self, text: str) -> Optional[Task]:
+        """Close a truncated task object, dropping its incomplete last member if needed."""
+        for _ in range(_MAX_SALVAGE_ATTEMPTS):
+            candidate = _repair_json(text + _closing_suffix(text))
+            try:
+                json.loads(candidate)
+            except json.JSONDecodeError:
+                cut = text.rfind(",")
+                if cut <= 0:
+                    break
+                text = text[:cut]
+                continue
+            return self._build(candidate, truncated=True)
+        return self._skip("truncated", text)
+
+    def _build(self, text: str, truncated: bool = False) -> Optional[Task]:
+        """Decode, repair and validate one task object."""
+        repaired = truncated
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                data = json.loads(_repair_json(text))
+            except json.JSONDecodeError as e:
+                return self._skip(f"invalid JSON: {e.msg}", text)
+            repaired = True
+
+        if not isinstance(data, dict):
+            return self._skip("not an object", text)
+
+        try:
+            task = Task.model_validate(data)
+        except ValidationError as e:
+            data = _repair_fields(data, e)
+            if data is None:
+                return self._skip("missing or invalid title", text)
+            try:
+                task = Task.model_validate(data)
+            except ValidationError as e:
+                return self._skip(f"validation failed: {e.error_count()} errors", text)
+            repaired = True
+
+        if repaired:
+            self.repaired += 1
+        self.emitted += 1
+        return task
+
+    def _skip(self, reason: str, text: str) -> None:
+        self.skipped += 1
+        logger.warning(
+            "Skipped malformed task in model output",
+            extra={"reason": reason, "snippet": text[:200]},
+        )
+        return None
+
+
+def _closing_suffix(text: str) -> str:
+    """Characters that close every string and container left open in text."""
+    stack: List[str] = []
+    in_string = False
+    pos = 0
+
+    while True:
+        pattern = _STRING_SPECIAL if in_string else _STRUCTURAL
+        match = pattern.search(text, pos)
+        if match is None:
+            break
+        char = match.group()
+        pos = match.end()
+
+        if char == "\\":
+            pos += 1
+        elif char == '"':
+            in_string = not in_string
+        elif char in "{[":
+            stack.append(char)
+        elif stack:
+            stack.pop()
+
+    closers = "".join("}" if c == "{" else "]" for c in reversed(stack))
+    return ('"' if in_string else "") + closers
+
+
+def _repair_json(text: str) -> str:
+    """Fix common non-JSON output: trailing commas and Python literals."""
+    text = _TRAILING_COMMA.sub(r"\1", text)
+    return _PYTHON_LITERALS.sub(lambda m: _PYTHON_TO_JSON[m.group()], text)
+
+
+def _repair_fields(data: Dict[str, Any], error: ValidationError) -> Optional[Dict[str, Any]]:
+    """
+    Repair or drop the fields that failed validation.
+
+    Returns:
+        The repaired data, or None if the task has no usable title
+    """
+    data = dict(data)
+    for field in {err["loc"][0] for err in error.errors() if err["loc"]}:
+        value = data.get(field)
+
+        if field in _MAX_LENGTHS and isinstance(value, str) and value.strip():
+            data[field] = value[: _MAX_LENGTHS[field]]
+        elif field in _BOUNDS and isinstance(value, int | float):
+            low, high = _BOUNDS[field]
+            data[field] = min(max(value, low), high)
+        elif field in _ENUM_FIELDS and isinstance(value, str):
+            data[field] = value.strip().lower().replace(" ", "_").replace("-", "_")
+        elif field == "title":
+            return None
+        else:
+            data.pop(field, None)
+
+    try:
+        Task.model_validate(data)
+    except ValidationError as e:
+        # Fields that are still invalid after repair fall back to their defaults.
+        for field in {err["loc"][0] for err in e.errors() if err["loc"]}:
+            if field == "title":
+                return None
+            data.pop(field, None)
+    return data
+
+
+def parse_tasks(chunks: Iterable[str]) -> Iterator[Task]:
+    """
+    Parse tasks from an iterable of text chunks.
+
+    Args:
+        chunks: Streamed model output
+
+    Yields:
+        Each task as soon as it is complete
+    """
+    parser = TaskStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aparse_tasks(chunks: AsyncIterable[str]) -> AsyncIterator[Task]:
+    """
+    Parse tasks from an async stream of text chunks.
+
+    Args:
+        chunks: Streamed model output
+
+    Yields:
+        Each task as soon as it is complete
+    """
+    parser = TaskStreamParser()
+    async for chunk in chunks:
+        for task in parser.feed(chunk):
+            yield task
+    for task in parser.close():
+        yield task
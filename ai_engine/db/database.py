@@ -6,10 +6,12 @@ from pathlib import Path
 from typing import Optional
 
 from ..core.config import settings
+from ..utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 
+@traced("db.connect")
 def get_db_connection() -> sqlite3.Connection:
     """
     Get a database connection.
@@ -25,65 +27,406 @@ def get_db_connection() -> sqlite3.Connection:
     return conn
 
 
-def init_db() -> None:
-    """Initialize database with required tables."""
+SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS plans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        plan_id TEXT UNIQUE NOT NULL,
+        tenant_id TEXT NOT NULL DEFAULT 'default',
+        plan_type TEXT NOT NULL,
+        context TEXT NOT NULL,
+        summary TEXT,
+        source TEXT NOT NULL DEFAULT 'deterministic',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        plan_id TEXT NOT NULL,
+        tenant_id TEXT NOT NULL DEFAULT 'default',
+        task_index INTEGER,
+        title TEXT NOT NULL,
+        description TEXT,
+        priority TEXT NOT NULL,
+        status TEXT NOT NULL,
+        estimated_hours REAL,
+        due_date TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (plan_id) REFERENCES plans (plan_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tenant_placements (
+        tenant_id TEXT PRIMARY KEY,
+        shard INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS idempotency_keys (
+        tenant_id TEXT NOT NULL,
+        idempotency_key TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        status TEXT NOT NULL,
+        status_code INTEGER,
+        response_body BLOB,
+        created_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        lease_expires_at REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (tenant_id, idempotency_key)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS task_recurrences (
+        tenant_id TEXT NOT NULL,
+        plan_id TEXT NOT NULL,
+        task_index INTEGER NOT NULL,
+        rule TEXT NOT NULL,
+        starts_on TEXT NOT NULL,
+        until TEXT,
+        materialized_from TEXT,
+        materialized_through TEXT,
+        PRIMARY KEY (tenant_id, plan_id, task_index)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS task_occurrences (
+        tenant_id TEXT NOT NULL,
+        plan_id TEXT NOT NULL,
+        task_index INTEGER NOT NULL,
+        occurs_on TEXT NOT NULL,
+        priority TEXT NOT NULL,
+        status TEXT NOT NULL,
+        estimated_hours REAL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (tenant_id, plan_id, task_index, occurs_on)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        tenant_id TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        available_at REAL NOT NULL,
+        lease_owner TEXT,
+        lease_expires_at REAL,
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_plans_plan_id
+    ON plans(plan_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_tasks_plan_id
+    ON tasks(plan_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_tasks_status
+    ON tasks(status)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_plans_tenant_id
+    ON plans(tenant_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_tasks_tenant_id
+    ON tasks(tenant_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at
+    ON idempotency_keys(expires_at)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_task_recurrences_window
+    ON task_recurrences(tenant_id, starts_on)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_task_occurrences_day
+    ON task_occurrences(tenant_id, occurs_on)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_jobs_ready
+    ON jobs(status, available_at)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_jobs_lease
+    ON jobs(status, lease_expires_at)
+    """,
+]
+
+# Workload summaries maintained by triggers on tasks and materialized task
+# occurrences. workload_by_day holds open (not completed) tasks with a due date
+# and open occurrences; workload_by_status holds all stored tasks.
+SUMMARY_SCHEMA_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS workload_by_day (
+        tenant_id TEXT NOT NULL,
+        day TEXT NOT NULL,
+        priority TEXT NOT NULL,
+        task_count INTEGER NOT NULL DEFAULT 0,
+        estimated_hours REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (tenant_id, day, priority)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS workload_by_status (
+        tenant_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        task_count INTEGER NOT NULL DEFAULT 0,
+        estimated_hours REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (tenant_id, status)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_summary_insert
+    AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO workload_by_day (tenant_id, day, priority, task_count, estimated_hours)
+        SELECT NEW.tenant_id, date(NEW.due_date), NEW.priority, 1, COALESCE(NEW.estimated_hours, 0)
+        WHERE NEW.due_date IS NOT NULL AND NEW.status != 'completed'
+        ON CONFLICT (tenant_id, day, priority) DO UPDATE SET
+            task_count = task_count + 1,
+            estimated_hours = estimated_hours + excluded.estimated_hours;
+
+        INSERT INTO workload_by_status (tenant_id, status, task_count, estimated_hours)
+        VALUES (NEW.tenant_id, NEW.status, 1, COALESCE(NEW.estimated_hours, 0))
+        ON CONFLICT (tenant_id, status) DO UPDATE SET
+            task_count = task_count + 1,
+            estimated_hours = estimated_hours + excluded.estimated_hours;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_summary_delete
+    AFTER DELETE ON tasks
+    BEGIN
+        UPDATE workload_by_day SET
+            task_count = task_count - 1,
+            estimated_hours = estimated_hours - COALESCE(OLD.estimated_hours, 0)
+        WHERE OLD.due_date IS NOT NULL AND OLD.status != 'completed'
+            AND tenant_id = OLD.tenant_id AND day = date(OLD.due_date)
+            AND priority = OLD.priority;
+
+        UPDATE workload_by_status SET
+            task_count = task_count - 1,
+            estimated_hours = estimated_hours - COALESCE(OLD.estimated_hours, 0)
+        WHERE tenant_id = OLD.tenant_id AND status = OLD.status;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_tasks_summary_update
+    AFTER UPDATE OF tenant_id, status, priority, due_date, estimated_hours ON tasks
+    BEGIN
+        UPDATE workload_by_day SET
+            task_count = task_count - 1,
+            estimated_hours = estimated_hours - COALESCE(OLD.estimated_hours, 0)
+        WHERE OLD.due_date IS NOT NULL AND OLD.status != 'completed'
+            AND tenant_id = OLD.tenant_id AND day = date(OLD.due_date)
+            AND priority = OLD.priority;
+
+        INSERT INTO workload_by_day (tenant_id, day, priority, task_count, estimated_hours)
+        SELECT NEW.tenant_id, date(NEW.due_date), NEW.priority, 1, COALESCE(NEW.estimated_hours, 0)
+        WHERE NEW.due_date IS NOT NULL AND NEW.status != 'completed'
+        ON CONFLICT (tenant_id, day, priority) DO UPDATE SET
+            task_count = task_count + 1,
+            estimated_hours = estimated_hours + excluded.estimated_hours;
+
+        UPDATE workload_by_status SET
+            task_count = task_count - 1,
+            estimated_hours = estimated_hours - COALESCE(OLD.estimated_hours, 0)
+        WHERE tenant_id = OLD.tenant_id AND status = OLD.status;
+
+        INSERT INTO workload_by_status (tenant_id, status, task_count, estimated_hours)
+        VALUES (NEW.tenant_id, NEW.status, 1, COALESCE(NEW.estimated_hours, 0))
+        ON CONFLICT (tenant_id, status) DO UPDATE SET
+            task_count = task_count + 1,
+            estimated_hours = estimated_hours + excluded.estimated_hours;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_occurrences_summary_insert
+    AFTER INSERT ON task_occurrences
+    WHEN NEW.status != 'completed'
+    BEGIN
+        INSERT INTO workload_by_day (tenant_id, day, priority, task_count, estimated_hours)
+        VALUES (NEW.tenant_id, NEW.occurs_on, NEW.priority, 1, COALESCE(NEW.estimated_hours, 0))
+        ON CONFLICT (tenant_id, day, priority) DO UPDATE SET
+            task_count = task_count + 1,
+            estimated_hours = estimated_hours + excluded.estimated_hours;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_occurrences_summary_delete
+    AFTER DELETE ON task_occurrences
+    WHEN OLD.status != 'completed'
+    BEGIN
+        UPDATE workload_by_day SET
+            task_count = task_count - 1,
+            estimated_hours = estimated_hours - COALESCE(OLD.estimated_hours, 0)
+        WHERE tenant_id = OLD.tenant_id AND day = OLD.occurs_on AND priority = OLD.priority;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_task_occurrences_summary_update
+    AFTER UPDATE OF status, priority, estimated_hours ON task_occurrences
+    BEGIN
+        UPDATE workload_by_day SET
+            task_count = task_count - 1,
+            estimated_hours = estimated_hours - COALESCE(OLD.estimated_hours, 0)
+        WHERE OLD.status != 'completed'
+            AND tenant_id = OLD.tenant_id AND day = OLD.occurs_on AND priority = OLD.priority;
+
+        INSERT INTO workload_by_day (tenant_id, day, priority, task_count, estimated_hours)
+        SELECT NEW.tenant_id, NEW.occurs_on, NEW.priority, 1, COALESCE(NEW.estimated_hours, 0)
+        WHERE NEW.status != 'completed'
+        ON CONFLICT (tenant_id, day, priority) DO UPDATE SET
+            task_count = task_count + 1,
+            estimated_hours = estimated_hours + excluded.estimated_hours;
+    END
+    """,
+]
+
+# Recompute summaries from the raw tasks table; parameter is a tenant id or
+# NULL for every tenant in the database.
+SUMMARY_REBUILD_STATEMENTS = [
+    "DELETE FROM workload_by_day WHERE :tenant_id IS NULL OR tenant_id = :tenant_id",
+    "DELETE FROM workload_by_status WHERE :tenant_id IS NULL OR tenant_id = :tenant_id",
+    """
+    INSERT INTO workload_by_day (tenant_id, day, priority, task_count, estimated_hours)
+    SELECT tenant_id, day, priority, COUNT(*), COALESCE(SUM(estimated_hours), 0)
+    FROM (
+        SELECT tenant_id, date(due_date) AS day, priority, estimated_hours
+        FROM tasks
+        WHERE due_date IS NOT NULL AND status != 'completed'
+        UNION ALL
+        SELECT tenant_id, occurs_on, priority, estimated_hours
+        FROM task_occurrences
+        WHERE status != 'completed'
+    )
+    WHERE :tenant_id IS NULL OR tenant_id = :tenant_id
+    GROUP BY tenant_id, day, priority
+    """,
+    """
+    INSERT INTO workload_by_status (tenant_id, status, task_count, estimated_hours)
+    SELECT tenant_id, status, COUNT(*), COALESCE(SUM(estimated_hours), 0)
+    FROM tasks
+    WHERE :tenant_id IS NULL OR tenant_id = :tenant_id
+    GROUP BY tenant_id, status
+    """,
+]
+
+# Stored in PRAGMA user_version once the schema is applied. Bump it whenever the
+# statements above or the added columns below change, so existing databases
+# pick the change up on their next boot.
+SCHEMA_VERSION = 3
+
+# Columns added after the initial schema, applied to pre-existing databases.
+_ADDED_COLUMNS = [
+    ("plans", "tenant_id", "TEXT NOT NULL DEFAULT 'default'"),
+    ("tasks", "tenant_id", "TEXT NOT NULL DEFAULT 'default'"),
+    ("tasks", "task_index", "INTEGER"),
+    ("plans", "source", "TEXT NOT NULL DEFAULT 'deterministic'"),
+    ("idempotency_keys", "lease_expires_at", "REAL NOT NULL DEFAULT 0"),
+]
+
+
+def apply_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create tables and indexes, adding columns missing from older databases.
+
+    Args:
+        conn: Open connection to the database to initialize
+    """
+    cursor = conn.cursor()
+
+    for table, column, definition in _ADDED_COLUMNS:
+        existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        if existing and column not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    for statement in SCHEMA_STATEMENTS:
+        cursor.execute(statement)
+
+    has_summaries = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'workload_by_day'"
+    ).fetchone()
+    for statement in SUMMARY_SCHEMA_STATEMENTS:
+        cursor.execute(statement)
+    if not has_summaries:
+        # Databases created before the summary tables need a one-off backfill.
+        for statement in SUMMARY_REBUILD_STATEMENTS:
+            cursor.execute(statement, {"tenant_id": None})
+
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+
+
+def ensure_schema(conn: sqlite3.Connection) -> bool:
+    """
+    Apply the schema unless the database already records the current version.
+
+    A matching ``PRAGMA user_version`` is a single header read, so boots and
+    new pool connections skip the DDL. A database written by a newer release
+    is left alone.
+
+    Args:
+        conn: Open connection to the database
+
+    Returns:
+        True if the schema was applied, False if it was already current
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version == SCHEMA_VERSION:
+        return False
+    if version > SCHEMA_VERSION:
+        logger.warning(
+            "Database schema is newer than this release",
+            extra={"schema_version": version, "expected_version": SCHEMA_VERSION},
+        )
+        return False
+
+    apply_schema(conn)
+    logger.info(
+        "Database schema applied",
+        extra={"previous_version": version, "schema_version": SCHEMA_VERSION},
+    )
+    return True
+
+
+@traced("db.init")
+def init_db() -> bool:
+    """
+    Initialize database with required tables.
+
+    Returns:
+        True if the schema was applied, False if it was already current
+    """
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS plans (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                plan_id TEXT UNIQUE NOT NULL,
-                plan_type TEXT NOT NULL,
-                context TEXT NOT NULL,
-                summary TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                plan_id TEXT NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT,
-                priority TEXT NOT NULL,
-                status TEXT NOT NULL,
-                estimated_hours REAL,
-                due_date TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (plan_id) REFERENCES plans (plan_id)
-            )
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_plans_plan_id
-            ON plans(plan_id)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tasks_plan_id
-            ON tasks(plan_id)
-        """)
-
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tasks_status
-            ON tasks(status)
-        """)
-
-        conn.commit()
-        conn.close()
+        try:
+            applied = ensure_schema(conn)
+        finally:
+            conn.close()
 
-        logger.info("Database initialized successfully")
+        logger.info("Database initialized successfully", extra={"schema_applied": applied})
+        return applied
 
     except Exception as e:
         logger.error(f"Database initialization failed: {str(e)}", exc_info=True)
         raise
 
 
+@traced("db.check_connection")
 def check_db_connection() -> bool:
     """
     Check if database connection is healthy.
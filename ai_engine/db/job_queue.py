@@ -0,0 +1,284 @@
+"""Durable SQLite-backed job queue with leasing and retries.
+
+Jobs live in the main database (DATABASE_PATH) so they survive restarts.
+Workers lease jobs in batches inside a ``BEGIN IMMEDIATE`` transaction, which
+makes leasing safe across processes. A lease that is not completed before it
+expires (for example because the worker died) is returned to the queue by
+``requeue_expired``; live workers ``renew`` their leases while a job runs.
+Failed jobs are retried with exponential backoff until ``max_attempts`` is
+reached.
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from ..core.config import settings
+from ..utils.error_handler import DatabaseError
+from ..utils.tracing import traced
+from .sharding import ShardRouter
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Job:
+    """A leased job."""
+
+    __slots__ = ("job_id", "tenant_id", "kind", "payload", "attempts", "max_attempts")
+
+    def __init__(
+        self,
+        job_id: str,
+        tenant_id: str,
+        kind: str,
+        payload: Dict[str, Any],
+        attempts: int,
+        max_attempts: int,
+    ):
+        self.job_id = job_id
+        self.tenant_id = tenant_id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+
+
+class JobQueue:
+    """Persistent queue of jobs in the main database."""
+
+    def __init__(
+        self,
+        router: ShardRouter,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        retry_backoff: float = 2.0,
+    ):
+        """
+        Initialize queue.
+
+        Args:
+            router: Router providing pooled connections to DATABASE_PATH
+            lease_seconds: How long a leased job is reserved for its worker
+            max_attempts: Attempts before a job is marked failed
+            retry_backoff: Base seconds for exponential retry backoff
+        """
+        self.router = router
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    def _connection(self):
+        # The jobs table is part of the main schema, applied by ensure_schema.
+        return self.router.connect(Path(settings.DATABASE_PATH))
+
+    @traced("jobs.enqueue")
+    def enqueue(self, tenant_id: str, kind: str, payload: Dict[str, Any]) -> str:
+        """
+        Add a job to the queue.
+
+        Args:
+            tenant_id: Tenant the job runs for
+            kind: Handler name
+            payload: JSON-serializable job arguments
+
+        Returns:
+            The new job id
+        """
+        job_id = f"job_{uuid4().hex}"
+        now = time.time()
+        with self._connection() as conn:
+            with conn:
+                conn.execute(
+                    """
+                    INSERT INTO jobs (
+                        id, tenant_id, kind, payload, status, max_attempts,
+                        available_at, created_at, updated_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        job_id,
+                        tenant_id,
+                        kind,
+                        json.dumps(payload),
+                        QUEUED,
+                        self.max_attempts,
+                        now,
+                        now,
+                        now,
+                    ),
+                )
+        return job_id
+
+    def lease(self, owner: str, limit: int) -> List[Job]:
+        """
+        Lease up to ``limit`` ready jobs for a worker.
+
+        Args:
+            owner: Identifier of the leasing worker
+            limit: Maximum number of jobs to lease
+
+        Returns:
+            Leased jobs, oldest first
+        """
+        now = time.time()
+        with self._connection() as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                rows = conn.execute(
+                    """
+                    SELECT id, tenant_id, kind, payload, attempts, max_attempts
+                    FROM jobs
+                    WHERE status = ? AND available_at <= ?
+                    ORDER BY available_at
+                    LIMIT ?
+                    """,
+                    (QUEUED, now, limit),
+                ).fetchall()
+                if rows:
+                    conn.executemany(
+                        """
+                        UPDATE jobs
+                        SET status = ?, lease_owner = ?, lease_expires_at = ?,
+                            attempts = attempts + 1, updated_at = ?
+                        WHERE id = ?
+                        """,
+                        [
+                            (RUNNING, owner, now + self.lease_seconds, now, row["id"])
+                            for row in rows
+                        ],
+                    )
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                raise DatabaseError(f"Failed to lease jobs: {str(e)}") from e
+
+        return [
+            Job(
+                row["id"],
+                row["tenant_id"],
+                row["kind"],
+                json.loads(row["payload"]),
+                row["attempts"] + 1,
+                row["max_attempts"],
+            )
+            for row in rows
+        ]
+
+    def renew(self, job: Job, owner: str) -> bool:
+        """
+        Extend the lease of a running job.
+
+        Returns:
+            False if the job is no longer leased by this owner
+        """
+        now = time.time()
+        with self._connection() as conn:
+            with conn:
+                cursor = conn.execute(
+                    """
+                    UPDATE jobs
+                    SET lease_expires_at = ?, updated_at = ?
+                    WHERE id = ? AND lease_owner = ? AND status = ?
+                    """,
+                    (now + self.lease_seconds, now, job.job_id, owner, RUNNING),
+                )
+        return cursor.rowcount == 1
+
+    def complete(self, job: Job, owner: str, result: Dict[str, Any]) -> None:
+        """Mark a leased job as succeeded and store its result."""
+        with self._connection() as conn:
+            with conn:
+                conn.execute(
+                    """
+                    UPDATE jobs
+                    SET status = ?, result = ?, error = NULL, lease_owner = NULL,
+                        lease_expires_at = NULL, updated_at = ?
+                    WHERE id = ? AND lease_owner = ?
+                    """,
+                    (SUCCEEDED, json.dumps(result), time.time(), job.job_id, owner),
+                )
+
+    def fail(self, job: Job, owner: str, error: str) -> bool:
+        """
+        Record a failed attempt, scheduling a retry if attempts remain.
+
+        Returns:
+            True if the job will be retried
+        """
+        now = time.time()
+        retry = job.attempts < job.max_attempts
+        with self._connection() as conn:
+            with conn:
+                conn.execute(
+                    """
+                    UPDATE jobs
+                    SET status = ?, error = ?, available_at = ?, lease_owner = NULL,
+                        lease_expires_at = NULL, updated_at = ?
+                    WHERE id = ? AND lease_owner = ?
+                    """,
+                    (
+                        QUEUED if retry else FAILED,
+                        error,
+                        now + self.retry_backoff * 2 ** (job.attempts - 1),
+                        now,
+                        job.job_id,
+                        owner,
+                    ),
+                )
+        return retry
+
+    def requeue_expired(self) -> int:
+        """
+        Return jobs whose lease expired to the queue.
+
+        Returns:
+            Number of requeued jobs
+        """
+        now = time.time()
+        with self._connection() as conn:
+            with conn:
+                cursor = conn.execute(
+                    """
+                    UPDATE jobs
+                    SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END,
+                        error = COALESCE(error, 'Lease expired'),
+                        available_at = ?, lease_owner = NULL, lease_expires_at = NULL,
+                        updated_at = ?
+                    WHERE status = ? AND lease_expires_at <= ?
+                    """,
+                    (QUEUED, FAILED, now, now, RUNNING, now),
+                )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a job's status and result.
+
+        Returns:
+            Job fields, or None if the job does not exist
+        """
+        with self._connection() as conn:
+            row = conn.execute(
+                """
+                SELECT id, tenant_id, kind, status, attempts, result, error,
+                       created_at, updated_at
+                FROM jobs
+                WHERE id = ?
+                """,
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
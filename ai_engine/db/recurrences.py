@@ -0,0 +1,338 @@
+"""Windowed materialization and lazy listing of recurring task occurrences.
+
+A recurring task is stored once, with its rule in ``task_recurrences``.
+Occurrences are only written to ``task_occurrences`` for a rolling horizon
+(the next RECURRENCE_HORIZON_DAYS days) and when a single occurrence's
+status is changed. Stored occurrences feed the workload summaries through
+triggers, so the near-term stats window is served without any expansion.
+
+Reads outside the horizon expand rules lazily with generators over the
+requested window only, so storage and query cost depend on the window, not on
+how long a rule has existed. The stored task itself is the occurrence on its
+own due date and is never repeated as an occurrence.
+
+Roll the horizon forward daily, e.g. from cron::
+
+    python -m ai_engine.db.recurrences materialize [--tenant TENANT] [--days N]
+"""
+
+import argparse
+import heapq
+import logging
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from ..core.config import settings
+from ..core.recurrence import occurrence_dates
+from ..models.schemas import RecurrenceRule, TaskOccurrence, TaskStatus
+from ..utils.tracing import traced
+from .sharding import shard_router
+
+logger = logging.getLogger(__name__)
+
+_RULE_COLUMNS = """
+    r.plan_id, r.task_index, r.rule, r.materialized_from, r.materialized_through,
+    t.title, t.priority, t.estimated_hours, t.due_date
+"""
+
+_RULE_JOIN = """
+    FROM task_recurrences r
+    JOIN tasks t
+        ON t.tenant_id = r.tenant_id AND t.plan_id = r.plan_id AND t.task_index = r.task_index
+"""
+
+
+def _due_day(value: Optional[str]) -> Optional[date]:
+    return datetime.fromisoformat(value).date() if value else None
+
+
+def _covers(row: sqlite3.Row, start: date, end: date) -> bool:
+    """Whether a rule's stored occurrences cover the whole window."""
+    return (
+        row["materialized_from"] is not None
+        and row["materialized_from"] <= start.isoformat()
+        and end.isoformat() <= row["materialized_through"]
+    )
+
+
+def materialize_rules(
+    conn: sqlite3.Connection,
+    horizon_days: int,
+    tenant_id: Optional[str] = None,
+    plan_id: Optional[str] = None,
+    task_index: Optional[int] = None,
+    today: Optional[date] = None,
+) -> int:
+    """
+    Store occurrences of rules for the next ``horizon_days`` days.
+
+    Runs inside the caller's transaction. Only days past a rule's previous
+    horizon are expanded; occurrences that already have a row keep it.
+
+    Args:
+        conn: Database connection
+        horizon_days: Days to materialize, starting today
+        tenant_id: Limit to one tenant, or None for every tenant in the database
+        plan_id: Limit to one plan
+        task_index: Limit to one task of the plan
+        today: First day of the horizon, defaults to today
+
+    Returns:
+        Number of occurrence rows inserted
+    """
+    today = today or date.today()
+    through = today + timedelta(days=max(horizon_days, 1) - 1)
+    rows = conn.execute(
+        f"""
+        SELECT r.tenant_id, {_RULE_COLUMNS}
+        {_RULE_JOIN}
+        WHERE (:tenant_id IS NULL OR r.tenant_id = :tenant_id)
+            AND (:plan_id IS NULL OR r.plan_id = :plan_id)
+            AND (:task_index IS NULL OR r.task_index = :task_index)
+            AND r.starts_on <= :through
+            AND (r.until IS NULL OR r.until >= :today)
+        """,
+        {
+            "tenant_id": tenant_id,
+            "plan_id": plan_id,
+            "task_index": task_index,
+            "today": today.isoformat(),
+            "through": through.isoformat(),
+        },
+    ).fetchall()
+
+    inserted = 0
+    for row in rows:
+        previous = row["materialized_through"]
+        begin = today
+        if previous is not None and row["materialized_from"] <= today.isoformat() <= previous:
+            begin = date.fromisoformat(previous) + timedelta(days=1)
+
+        rule = RecurrenceRule.model_validate_json(row["rule"])
+        cursor = conn.executemany(
+            """
+            INSERT OR IGNORE INTO task_occurrences (
+                tenant_id, plan_id, task_index, occurs_on, priority, status, estimated_hours
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    row["tenant_id"],
+                    row["plan_id"],
+                    row["task_index"],
+                    day.isoformat(),
+                    row["priority"],
+                    TaskStatus.PENDING.value,
+                    row["estimated_hours"],
+                )
+                for day in occurrence_dates(rule, begin, through, skip=_due_day(row["due_date"]))
+            ],
+        )
+        inserted += max(cursor.rowcount, 0)
+        conn.execute(
+            """
+            UPDATE task_recurrences
+            SET materialized_from = :today,
+                materialized_through = MAX(:through, COALESCE(materialized_through, ''))
+            WHERE tenant_id = :tenant_id AND plan_id = :plan_id AND task_index = :task_index
+            """,
+            {
+                "today": today.isoformat(),
+                "through": through.isoformat(),
+                "tenant_id": row["tenant_id"],
+                "plan_id": row["plan_id"],
+                "task_index": row["task_index"],
+            },
+        )
+    return inserted
+
+
+@traced("db.materialize_occurrences")
+def materialize_occurrences(
+    conn: sqlite3.Connection,
+    horizon_days: int,
+    tenant_id: Optional[str] = None,
+    today: Optional[date] = None,
+) -> Dict[str, int]:
+    """
+    Roll the materialized horizon forward and prune past pending occurrences.
+
+    Pending occurrences before today carry nothing that lazy expansion would
+    not reproduce, so they are deleted; occurrences whose status was changed
+    are kept as history.
+
+    Args:
+        conn: Database connection
+        horizon_days: Days to materialize, starting today
+        tenant_id: Limit to one tenant, or None for every tenant in the database
+        today: First day of the horizon, defaults to today
+
+    Returns:
+        Counts of inserted and pruned occurrence rows
+    """
+    today = today or date.today()
+    with conn:
+        pruned = conn.execute(
+            """
+            DELETE FROM task_occurrences
+            WHERE occurs_on < ? AND status = ? AND (? IS NULL OR tenant_id = ?)
+            """,
+            (today.isoformat(), TaskStatus.PENDING.value, tenant_id, tenant_id),
+        ).rowcount
+        inserted = materialize_rules(conn, horizon_days, tenant_id=tenant_id, today=today)
+    return {"inserted": inserted, "pruned": pruned}
+
+
+def _window_params(
+    tenant_id: str, start: date, end: date, plan_id: Optional[str]
+) -> Dict[str, Optional[str]]:
+    return {
+        "tenant_id": tenant_id,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "plan_id": plan_id,
+    }
+
+
+def _stored_occurrences(
+    conn: sqlite3.Connection, tenant_id: str, start: date, end: date, plan_id: Optional[str]
+) -> List[TaskOccurrence]:
+    rows = conn.execute(
+        """
+        SELECT o.plan_id, o.task_index, o.occurs_on, o.priority, o.status, o.estimated_hours,
+               t.title
+        FROM task_occurrences o
+        JOIN tasks t
+            ON t.tenant_id = o.tenant_id AND t.plan_id = o.plan_id AND t.task_index = o.task_index
+        WHERE o.tenant_id = :tenant_id AND o.occurs_on BETWEEN :start AND :end
+            AND (:plan_id IS NULL OR o.plan_id = :plan_id)
+        ORDER BY o.occurs_on, o.plan_id, o.task_index
+        """,
+        _window_params(tenant_id, start, end, plan_id),
+    ).fetchall()
+    return [
+        TaskOccurrence(
+            plan_id=row["plan_id"],
+            task_id=row["task_index"],
+            occurs_on=row["occurs_on"],
+            title=row["title"],
+            priority=row["priority"],
+            status=row["status"],
+            estimated_hours=row["estimated_hours"],
+        )
+        for row in rows
+    ]
+
+
+def _expand(
+    row: sqlite3.Row, start: date, end: date, stored: Set[Tuple[str, int, date]]
+) -> Iterator[TaskOccurrence]:
+    rule = RecurrenceRule.model_validate_json(row["rule"])
+    for day in occurrence_dates(rule, start, end, skip=_due_day(row["due_date"])):
+        if (row["plan_id"], row["task_index"], day) in stored:
+            continue
+        yield TaskOccurrence(
+            plan_id=row["plan_id"],
+            task_id=row["task_index"],
+            occurs_on=day,
+            title=row["title"],
+            priority=row["priority"],
+            estimated_hours=row["estimated_hours"],
+        )
+
+
+def _sort_key(occurrence: TaskOccurrence) -> Tuple[date, str, int]:
+    return occurrence.occurs_on, occurrence.plan_id, occurrence.task_id
+
+
+def _occurrence_sources(
+    conn: sqlite3.Connection, tenant_id: str, start: date, end: date, plan_id: Optional[str]
+) -> Tuple[List[TaskOccurrence], List[Iterator[TaskOccurrence]]]:
+    stored = _stored_occurrences(conn, tenant_id, start, end, plan_id)
+    keys = {(occurrence.plan_id, occurrence.task_id, occurrence.occurs_on) for occurrence in stored}
+    rules = conn.execute(
+        f"""
+        SELECT {_RULE_COLUMNS}
+        {_RULE_JOIN}
+        WHERE r.tenant_id = :tenant_id AND r.starts_on <= :end
+            AND (r.until IS NULL OR r.until >= :start)
+            AND (:plan_id IS NULL OR r.plan_id = :plan_id)
+        """,
+        _window_params(tenant_id, start, end, plan_id),
+    ).fetchall()
+    lazy = [_expand(row, start, end, keys) for row in rules if not _covers(row, start, end)]
+    return stored, lazy
+
+
+@traced("db.list_occurrences")
+def list_occurrences(
+    conn: sqlite3.Connection,
+    tenant_id: str,
+    start: date,
+    end: date,
+    plan_id: Optional[str] = None,
+) -> Iterator[TaskOccurrence]:
+    """
+    List occurrences of recurring tasks within a window.
+
+    Stored occurrences are read with one range query; the rest are expanded
+    lazily and merged in, ordered by date, plan and task.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Owning tenant
+        start: First day, inclusive
+        end: Last day, inclusive
+        plan_id: Limit to one plan
+
+    Returns:
+        Iterator of occurrences; consume it before the connection is released
+    """
+    stored, lazy = _occurrence_sources(conn, tenant_id, start, end, plan_id)
+    return heapq.merge(stored, *lazy, key=_sort_key)
+
+
+@traced("db.unmaterialized_occurrences")
+def unmaterialized_occurrences(
+    conn: sqlite3.Connection, tenant_id: str, start: date, end: date
+) -> Iterator[TaskOccurrence]:
+    """
+    Lazily expand the occurrences in a window that have no stored row.
+
+    These are exactly the occurrences the workload summaries do not count.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Owning tenant
+        start: First day, inclusive
+        end: Last day, inclusive
+
+    Returns:
+        Iterator of pending occurrences
+    """
+    _, lazy = _occurrence_sources(conn, tenant_id, start, end, None)
+    return heapq.merge(*lazy, key=_sort_key)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line materialization of the next N days of occurrences."""
+    parser = argparse.ArgumentParser(prog="python -m ai_engine.db.recurrences")
+    parser.add_argument("command", choices=["materialize"])
+    parser.add_argument("--tenant", help="Limit to one tenant")
+    parser.add_argument("--days", type=int, default=settings.RECURRENCE_HORIZON_DAYS)
+    args = parser.parse_args(argv)
+
+    paths = [shard_router.path_for(args.tenant)] if args.tenant else shard_router.database_paths()
+    for path in paths:
+        with shard_router.connect(path) as conn:
+            counts = materialize_occurrences(conn, args.days, tenant_id=args.tenant)
+            print(f"{path}: {counts['inserted']} inserted, {counts['pruned']} pruned")
+
+    shard_router.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,414 @@
+"""Persistence of generated plans and their tasks."""
+
+import logging
+import sqlite3
+from datetime import date, datetime
+from typing import Dict, Optional
+
+from ..core.config import settings
+from ..core.recurrence import occurs_on, resolve_rule
+from ..models.schemas import PlanResponse, RecurrenceRule, Task, TaskOccurrence, TaskStatus
+from ..utils.tracing import traced
+from .recurrences import materialize_rules
+
+logger = logging.getLogger(__name__)
+
+_TASK_COLUMNS = """
+    task_index, title, description, priority, status, estimated_hours,
+    due_date, created_at, updated_at
+"""
+
+
+@traced("db.save_plan")
+def save_plan(
+    conn: sqlite3.Connection,
+    tenant_id: str,
+    plan_type: str,
+    context: str,
+    plan: PlanResponse,
+) -> None:
+    """
+    Insert a plan and its tasks in a single transaction.
+
+    Recurrence rules of recurring tasks are stored and their next
+    RECURRENCE_HORIZON_DAYS days of occurrences materialized.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Owning tenant
+        plan_type: "weekly" or "daily"
+        context: Planning context the plan was generated from
+        plan: Generated plan
+    """
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO plans (
+                plan_id, tenant_id, plan_type, context, summary, source, created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                plan.plan_id,
+                tenant_id,
+                plan_type,
+                context,
+                plan.summary,
+                plan.source.value,
+                plan.created_at.isoformat(),
+                plan.created_at.isoformat(),
+            ),
+        )
+        conn.executemany(
+            """
+            INSERT INTO tasks (
+                plan_id, tenant_id, task_index, title, description, priority, status,
+                estimated_hours, due_date, created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    plan.plan_id,
+                    tenant_id,
+                    task.id,
+                    task.title,
+                    task.description,
+                    task.priority.value,
+                    task.status.value,
+                    task.estimated_hours,
+                    task.due_date.isoformat() if task.due_date else None,
+                    task.created_at.isoformat(),
+                    task.updated_at.isoformat(),
+                )
+                for task in plan.tasks
+            ],
+        )
+        recurring = [task for task in plan.tasks if task.recurrence is not None]
+        for task in recurring:
+            rule = resolve_rule(task.recurrence, task.due_date)
+            _store_rule(conn, tenant_id, plan.plan_id, task.id, rule)
+        if recurring:
+            materialize_rules(
+                conn, settings.RECURRENCE_HORIZON_DAYS, tenant_id=tenant_id, plan_id=plan.plan_id
+            )
+
+
+@traced("db.get_plan")
+def get_plan(conn: sqlite3.Connection, tenant_id: str, plan_id: str) -> Optional[PlanResponse]:
+    """
+    Load a plan and its tasks.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Owning tenant
+        plan_id: Plan identifier
+
+    Returns:
+        The stored plan, or None if the tenant has no such plan
+    """
+    plan_row = conn.execute(
+        "SELECT plan_id, summary, source, created_at FROM plans "
+        "WHERE plan_id = ? AND tenant_id = ?",
+        (plan_id, tenant_id),
+    ).fetchone()
+    if plan_row is None:
+        return None
+
+    task_rows = conn.execute(
+        f"""
+        SELECT {_TASK_COLUMNS}
+        FROM tasks
+        WHERE plan_id = ? AND tenant_id = ?
+        ORDER BY task_index
+        """,
+        (plan_id, tenant_id),
+    ).fetchall()
+    rules = get_rules(conn, tenant_id, plan_id)
+
+    return PlanResponse(
+        plan_id=plan_row["plan_id"],
+        tasks=[_task_from_row(row, rules.get(row["task_index"])) for row in task_rows],
+        summary=plan_row["summary"] or "",
+        source=plan_row["source"],
+        created_at=plan_row["created_at"],
+    )
+
+
+def plan_exists(conn: sqlite3.Connection, tenant_id: str, plan_id: str) -> bool:
+    """
+    Check whether a tenant has a plan, without loading its tasks.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Owning tenant
+        plan_id: Plan identifier
+
+    Returns:
+        True if the tenant has a plan with this id
+    """
+    row = conn.execute(
+        "SELECT 1 FROM plans WHERE plan_id = ? AND tenant_id = ? LIMIT 1",
+        (plan_id, tenant_id),
+    ).fetchone()
+    return row is not None
+
+
+@traced("db.update_task_status")
+def update_task_status(
+    conn: sqlite3.Connection,
+    tenant_id: str,
+    plan_id: str,
+    task_id: int,
+    status: TaskStatus,
+) -> Optional[Task]:
+    """
+    Change the status of a stored task.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Owning tenant
+        plan_id: Plan the task belongs to
+        task_id: Task id within the plan
+        status: New status
+
+    Returns:
+        The updated task, or None if the tenant has no such task
+    """
+    with conn:
+        cursor = conn.execute(
+            """
+            UPDATE tasks SET status = ?, updated_at = ?
+            WHERE tenant_id = ? AND plan_id = ? AND task_index = ?
+            """,
+            (status.value, datetime.utcnow().isoformat(), tenant_id, plan_id, task_id),
+        )
+    if cursor.rowcount == 0:
+        return None
+
+    row = _select_task(conn, tenant_id, plan_id, task_id)
+    return _task_from_row(row, get_rules(conn, tenant_id, plan_id).get(task_id))
+
+
+def get_rules(conn: sqlite3.Connection, tenant_id: str, plan_id: str) -> Dict[int, RecurrenceRule]:
+    """
+    Load the recurrence rules of a plan's tasks.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Owning tenant
+        plan_id: Plan identifier
+
+    Returns:
+        Rules keyed by task id
+    """
+    rows = conn.execute(
+        "SELECT task_index, rule FROM task_recurrences WHERE tenant_id = ? AND plan_id = ?",
+        (tenant_id, plan_id),
+    ).fetchall()
+    return {row["task_index"]: RecurrenceRule.model_validate_json(row["rule"]) for row in rows}
+
+
+def _store_rule(
+    conn: sqlite3.Connection, tenant_id: str, plan_id: str, task_id: int, rule: RecurrenceRule
+) -> None:
+    """Save a resolved rule, dropping occurrences stored for the old rule from today on."""
+    conn.execute(
+        """
+        DELETE FROM task_occurrences
+        WHERE tenant_id = ? AND plan_id = ? AND task_index = ? AND occurs_on >= ?
+        """,
+        (tenant_id, plan_id, task_id, date.today().isoformat()),
+    )
+    conn.execute(
+        """
+        INSERT INTO task_recurrences (tenant_id, plan_id, task_index, rule, starts_on, until)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (tenant_id, plan_id, task_index) DO UPDATE SET
+            rule = excluded.rule,
+            starts_on = excluded.starts_on,
+            until = excluded.until,
+            materialized_from = NULL,
+            materialized_through = NULL
+        """,
+        (
+            tenant_id,
+            plan_id,
+            task_id,
+            rule.model_dump_json(),
+            rule.starts_on.isoformat(),
+            rule.until.isoformat() if rule.until else None,
+        ),
+    )
+
+
+def _select_task(
+    conn: sqlite3.Connection, tenant_id: str, plan_id: str, task_id: int
+) -> Optional[sqlite3.Row]:
+    return conn.execute(
+        f"""
+        SELECT {_TASK_COLUMNS}
+        FROM tasks
+        WHERE tenant_id = ? AND plan_id = ? AND task_index = ?
+        """,
+        (tenant_id, plan_id, task_id),
+    ).fetchone()
+
+
+@traced("db.set_task_recurrence")
+def set_task_recurrence(
+    conn: sqlite3.Connection,
+    tenant_id: str,
+    plan_id: str,
+    task_id: int,
+    rule: RecurrenceRule,
+) -> Optional[Task]:
+    """
+    Make a stored task recurring, replacing any previous rule.
+
+    The task itself stays the occurrence on its due date. Occurrences of the
+    previous rule from today on are discarded, including changed statuses,
+    and the next RECURRENCE_HORIZON_DAYS days are materialized.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Owning tenant
+        plan_id: Plan the task belongs to
+        task_id: Task id within the plan
+        rule: Recurrence rule; starts_on defaults to the task's due date
+
+    Returns:
+        The task with its resolved rule, or None if the tenant has no such task
+    """
+    row = _select_task(conn, tenant_id, plan_id, task_id)
+    if row is None:
+        return None
+    task = _task_from_row(row)
+    task.recurrence = resolve_rule(rule, task.due_date)
+
+    with conn:
+        _store_rule(conn, tenant_id, plan_id, task_id, task.recurrence)
+        materialize_rules(
+            conn,
+            settings.RECURRENCE_HORIZON_DAYS,
+            tenant_id=tenant_id,
+            plan_id=plan_id,
+            task_index=task_id,
+        )
+    return task
+
+
+@traced("db.clear_task_recurrence")
+def clear_task_recurrence(
+    conn: sqlite3.Connection, tenant_id: str, plan_id: str, task_id: int
+) -> bool:
+    """
+    Stop a task recurring.
+
+    Past occurrences with a changed status are kept as history.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Owning tenant
+        plan_id: Plan the task belongs to
+        task_id: Task id within the plan
+
+    Returns:
+        True if the task had a rule
+    """
+    with conn:
+        cursor = conn.execute(
+            "DELETE FROM task_recurrences WHERE tenant_id = ? AND plan_id = ? AND task_index = ?",
+            (tenant_id, plan_id, task_id),
+        )
+        conn.execute(
+            """
+            DELETE FROM task_occurrences
+            WHERE tenant_id = ? AND plan_id = ? AND task_index = ?
+                AND (occurs_on >= ? OR status = ?)
+            """,
+            (tenant_id, plan_id, task_id, date.today().isoformat(), TaskStatus.PENDING.value),
+        )
+    return cursor.rowcount > 0
+
+
+@traced("db.update_occurrence_status")
+def update_occurrence_status(
+    conn: sqlite3.Connection,
+    tenant_id: str,
+    plan_id: str,
+    task_id: int,
+    day: date,
+    status: TaskStatus,
+) -> Optional[TaskOccurrence]:
+    """
+    Change the status of one occurrence of a recurring task.
+
+    Occurrences outside the materialized horizon get a row of their own.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Owning tenant
+        plan_id: Plan the task belongs to
+        task_id: Task id within the plan
+        day: Occurrence date
+        status: New status
+
+    Returns:
+        The updated occurrence, or None if the task does not occur that day
+    """
+    row = _select_task(conn, tenant_id, plan_id, task_id)
+    rule = get_rules(conn, tenant_id, plan_id).get(task_id) if row is not None else None
+    if rule is None:
+        return None
+    task = _task_from_row(row, rule)
+    if not occurs_on(rule, day, skip=task.due_date.date() if task.due_date else None):
+        return None
+
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO task_occurrences (
+                tenant_id, plan_id, task_index, occurs_on, priority, status,
+                estimated_hours, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (tenant_id, plan_id, task_index, occurs_on) DO UPDATE SET
+                status = excluded.status,
+                updated_at = excluded.updated_at
+            """,
+            (
+                tenant_id,
+                plan_id,
+                task_id,
+                day.isoformat(),
+                task.priority.value,
+                status.value,
+                task.estimated_hours,
+                datetime.utcnow().isoformat(),
+            ),
+        )
+    return TaskOccurrence(
+        plan_id=plan_id,
+        task_id=task_id,
+        occurs_on=day,
+        title=task.title,
+        priority=task.priority,
+        status=status,
+        estimated_hours=task.estimated_hours,
+    )
+
+
+def _task_from_row(row: sqlite3.Row, recurrence: Optional[RecurrenceRule] = None) -> Task:
+    return Task(
+        id=row["task_index"],
+        title=row["title"],
+        description=row["description"],
+        priority=row["priority"],
+        status=row["status"],
+        estimated_hours=row["estimated_hours"],
+        due_date=row["due_date"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        recurrence=recurrence,
+    )
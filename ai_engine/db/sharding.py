@@ -0,0 +1,422 @@
+"""Tenant-aware routing of plan storage to sharded SQLite files.
+
+SQLite serializes writers per database file, so a single shared file lets one
+heavy tenant's writes queue every other tenant behind it. The ShardRouter maps
+each tenant to a database file according to SHARD_MODE:
+
+- ``single``: every tenant uses DATABASE_PATH (the original layout)
+- ``tenant``: one file per tenant under SHARD_DIR
+- ``hash``: SHARD_COUNT files under SHARD_DIR, chosen by hashing the tenant id
+  unless a placement override in DATABASE_PATH pins the tenant to a shard
+
+Open files are kept in an LRU of small connection pools; schemas are applied
+lazily the first time a file is opened. Tenants can be moved between hash
+shards with ``python -m ai_engine.db.sharding move <tenant> <shard>``.
+"""
+
+import argparse
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from ..core.config import settings
+from ..utils.error_handler import DatabaseError
+from .database import ensure_schema, get_db_connection
+
+logger = logging.getLogger(__name__)
+
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Tables holding tenant rows. Moving a tenant copies them in this order, parents
+# before children, and deletes them in reverse. Idempotency keys move too, so
+# retries after a move replay the stored response.
+TENANT_TABLES = [
+    "plans",
+    "tasks",
+    "task_recurrences",
+    "task_occurrences",
+    "idempotency_keys",
+]
+
+
+class PoolClosedError(DatabaseError):
+    """Raised to a caller waiting on a pool that was closed or evicted."""
+
+    def __init__(self, path: Path):
+        """Initialize error for the closed pool's file."""
+        super().__init__(f"Connection pool for {path} was closed")
+
+
+class ConnectionPool:
+    """Bounded pool of connections to one SQLite file."""
+
+    def __init__(self, path: Path, size: int, timeout: float = 30.0):
+        """
+        Initialize pool; connections and the schema are created lazily.
+
+        Args:
+            path: Database file
+            size: Maximum number of open connections
+            timeout: Seconds to wait for a free connection when the pool is full
+        """
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.closed = False
+        self._idle: List[sqlite3.Connection] = []
+        self._created = 0
+        self._available = threading.Condition(threading.Lock())
+        self._schema_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        if not self._initialized:
+            with self._schema_lock:
+                if not self._initialized:
+                    ensure_schema(conn)
+                    self._initialized = True
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Borrow a connection, opening one if the pool is not yet full.
+
+        Raises:
+            PoolClosedError: If the pool is closed, including while waiting
+            DatabaseError: If no connection frees up within the timeout
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._available:
+            while True:
+                if self.closed:
+                    raise PoolClosedError(self.path)
+                if self._idle:
+                    return self._idle.pop()
+                if self._created < self.size:
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._available.wait(remaining):
+                    if self.closed:
+                        raise PoolClosedError(self.path)
+                    raise DatabaseError(f"Timed out waiting for a connection to {self.path}")
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a borrowed connection; closes it if the pool was evicted."""
+        with self._available:
+            if self.closed:
+                self._created -= 1
+            else:
+                self._idle.append(conn)
+                self._available.notify()
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Close idle connections and wake waiters; borrowed ones close when released."""
+        with self._available:
+            self.closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._available.notify_all()
+        for conn in idle:
+            conn.close()
+
+
+class ShardRouter:
+    """Maps tenants to database files and manages their connection pools."""
+
+    def __init__(
+        self,
+        mode: str = "single",
+        shard_dir: str = "../data/shards",
+        shard_count: int = 8,
+        max_open: int = 64,
+        pool_size: int = 4,
+        placement_ttl: float = 30.0,
+        pool_timeout: float = 30.0,
+    ):
+        """
+        Initialize router.
+
+        Args:
+            mode: "single", "tenant" or "hash"
+            shard_dir: Directory holding shard files
+            shard_count: Number of hash shards
+            max_open: Maximum number of shard files with open pools
+            pool_size: Connections per shard pool
+            placement_ttl: Seconds before placement overrides are reloaded
+            pool_timeout: Seconds to wait for a free pooled connection
+        """
+        if mode not in ("single", "tenant", "hash"):
+            raise ValueError(f"Unknown shard mode: {mode}")
+
+        self.mode = mode
+        self.shard_dir = Path(shard_dir)
+        self.shard_count = shard_count
+        self.max_open = max_open
+        self.pool_size = pool_size
+        self.placement_ttl = placement_ttl
+        self.pool_timeout = pool_timeout
+
+        self._pools: "OrderedDict[Path, ConnectionPool]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._placements: Dict[str, int] = {}
+        self._placements_loaded_at = float("-inf")
+        self._placements_schema_path: Optional[str] = None
+
+    def _load_placements(self) -> Dict[str, int]:
+        if time.monotonic() - self._placements_loaded_at < self.placement_ttl:
+            return self._placements
+
+        conn = get_db_connection()
+        try:
+            if self._placements_schema_path != settings.DATABASE_PATH:
+                ensure_schema(conn)
+                self._placements_schema_path = settings.DATABASE_PATH
+            rows = conn.execute("SELECT tenant_id, shard FROM tenant_placements").fetchall()
+        finally:
+            conn.close()
+
+        self._placements = {row["tenant_id"]: row["shard"] for row in rows}
+        self._placements_loaded_at = time.monotonic()
+        return self._placements
+
+    def hash_shard(self, tenant_id: str) -> int:
+        """Return the default hash shard for a tenant."""
+        return zlib.crc32(tenant_id.encode()) % self.shard_count
+
+    def shard_for(self, tenant_id: str) -> int:
+        """Return the hash shard a tenant is currently placed on."""
+        return self._load_placements().get(tenant_id, self.hash_shard(tenant_id))
+
+    def shard_path(self, shard: int) -> Path:
+        """Return the database file for a hash shard."""
+        return self.shard_dir / f"shard_{shard:03d}.db"
+
+    def path_for(self, tenant_id: str) -> Path:
+        """
+        Resolve the database file holding a tenant's data.
+
+        Args:
+            tenant_id: Tenant identifier
+
+        Returns:
+            Path of the tenant's database file
+        """
+        if not TENANT_ID_PATTERN.match(tenant_id):
+            raise ValueError(f"Invalid tenant id: {tenant_id!r}")
+        if self.mode == "single":
+            return Path(settings.DATABASE_PATH)
+        if self.mode == "tenant":
+            return self.shard_dir / f"tenant_{tenant_id}.db"
+        return self.shard_path(self.shard_for(tenant_id))
+
+    def database_paths(self) -> List[Path]:
+        """Return every database file holding tenant data."""
+        if self.mode == "single":
+            return [Path(settings.DATABASE_PATH)]
+        return sorted(self.shard_dir.glob("*.db"))
+
+    def _pool(self, path: Path) -> ConnectionPool:
+        with self._lock:
+            pool = self._pools.get(path)
+            if pool is not None:
+                self._pools.move_to_end(path)
+                return pool
+
+            pool = ConnectionPool(path, self.pool_size, self.pool_timeout)
+            self._pools[path] = pool
+            while len(self._pools) > self.max_open:
+                _, evicted = self._pools.popitem(last=False)
+                evicted.close()
+                logger.debug("Evicted shard pool", extra={"path": str(evicted.path)})
+            return pool
+
+    @contextmanager
+    def connect(self, path: Path) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a pooled connection to a specific database file.
+
+        A caller waiting on a pool that gets evicted or closed retries once
+        through a fresh pool.
+
+        Raises:
+            DatabaseError: If no connection frees up within the pool timeout
+        """
+        try:
+            pool = self._pool(path)
+            conn = pool.acquire()
+        except PoolClosedError:
+            pool = self._pool(path)
+            conn = pool.acquire()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.release(conn)
+
+    @contextmanager
+    def connection(self, tenant_id: str) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a pooled connection to a tenant's database file.
+
+        Args:
+            tenant_id: Tenant identifier
+
+        Yields:
+            SQLite connection; uncommitted changes are rolled back on error
+        """
+        with self.connect(self.path_for(tenant_id)) as conn:
+            yield conn
+
+    def open_pools(self) -> List[Path]:
+        """Return the files with open pools, least recently used first."""
+        with self._lock:
+            return list(self._pools)
+
+    def close(self) -> None:
+        """Close all pools."""
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+
+    def move_tenant(self, tenant_id: str, target_shard: int) -> int:
+        """
+        Move a tenant's rows to another hash shard and pin it there.
+
+        Rows are copied into the target in one transaction, the placement is
+        recorded, then the rows are deleted from the source. Writes for the
+        tenant should be paused while this runs; workers pick up the new
+        placement within placement_ttl seconds.
+
+        Args:
+            tenant_id: Tenant identifier
+            target_shard: Destination shard number
+
+        Returns:
+            Number of rows moved
+        """
+        if self.mode != "hash":
+            raise ValueError("Tenants can only be moved between shards in hash mode")
+        if not 0 <= target_shard < self.shard_count:
+            raise ValueError(f"Shard must be between 0 and {self.shard_count - 1}")
+
+        self._placements_loaded_at = float("-inf")
+        source_shard = self.shard_for(tenant_id)
+        if source_shard == target_shard:
+            return 0
+
+        moved = 0
+        try:
+            with (
+                self.connect(self.shard_path(source_shard)) as source,
+                self.connect(self.shard_path(target_shard)) as target,
+            ):
+                for table in TENANT_TABLES:
+                    rows = source.execute(
+                        f"SELECT * FROM {table} WHERE tenant_id = ?", (tenant_id,)
+                    ).fetchall()
+                    if not rows:
+                        continue
+                    columns = [key for key in rows[0].keys() if key != "id"]
+                    target.executemany(
+                        f"INSERT INTO {table} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' for _ in columns)})",
+                        [tuple(row[column] for column in columns) for row in rows],
+                    )
+                    moved += len(rows)
+                target.commit()
+
+                conn = get_db_connection()
+                try:
+                    ensure_schema(conn)
+                    conn.execute(
+                        "INSERT INTO tenant_placements (tenant_id, shard) VALUES (?, ?) "
+                        "ON CONFLICT(tenant_id) DO UPDATE SET shard = excluded.shard, "
+                        "updated_at = CURRENT_TIMESTAMP",
+                        (tenant_id, target_shard),
+                    )
+                    conn.commit()
+                finally:
+                    conn.close()
+
+                for table in reversed(TENANT_TABLES):
+                    source.execute(f"DELETE FROM {table} WHERE tenant_id = ?", (tenant_id,))
+                source.commit()
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to move tenant {tenant_id}: {str(e)}") from e
+        finally:
+            self._placements_loaded_at = float("-inf")
+
+        logger.info(
+            "Tenant moved",
+            extra={
+                "tenant_id": tenant_id,
+                "source_shard": source_shard,
+                "target_shard": target_shard,
+                "rows": moved,
+            },
+        )
+        return moved
+
+
+shard_router = ShardRouter(
+    mode=settings.SHARD_MODE,
+    shard_dir=settings.SHARD_DIR,
+    shard_count=settings.SHARD_COUNT,
+    max_open=settings.MAX_OPEN_SHARDS,
+    pool_size=settings.SHARD_POOL_SIZE,
+    pool_timeout=settings.SHARD_POOL_TIMEOUT,
+)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line tooling for inspecting and moving tenant placements."""
+    parser = argparse.ArgumentParser(prog="python -m ai_engine.db.sharding")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    locate = subparsers.add_parser("locate", help="Show the database file for a tenant")
+    locate.add_argument("tenant_id")
+
+    move = subparsers.add_parser("move", help="Move a tenant to another hash shard")
+    move.add_argument("tenant_id")
+    move.add_argument("shard", type=int)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "locate":
+        print(shard_router.path_for(args.tenant_id))
+    elif args.command == "move":
+        moved = shard_router.move_tenant(args.tenant_id, args.shard)
+        print(f"Moved {moved} rows for {args.tenant_id} to shard {args.shard}")
+
+    shard_router.close()
+
+
+if __name__ == "__main__":
+    main()
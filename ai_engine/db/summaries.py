@@ -0,0 +1,195 @@
+"""Reads, rebuilds and consistency checks for the workload summary tables.
+
+The summaries are kept up to date by triggers on ``tasks`` and
+``task_occurrences`` (see SUMMARY_SCHEMA_STATEMENTS), so reads cost
+O(days x priorities) regardless of how many tasks a tenant has. Rebuild and
+check from the command line with::
+
+    python -m ai_engine.db.summaries check [--tenant TENANT]
+    python -m ai_engine.db.summaries rebuild [--tenant TENANT]
+"""
+
+import argparse
+import logging
+import sqlite3
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.tracing import traced
+from .database import SUMMARY_REBUILD_STATEMENTS
+from .sharding import shard_router
+
+logger = logging.getLogger(__name__)
+
+_EXPECTED_BY_DAY = """
+    SELECT tenant_id, day, priority,
+           COUNT(*) AS task_count, COALESCE(SUM(estimated_hours), 0) AS estimated_hours
+    FROM (
+        SELECT tenant_id, date(due_date) AS day, priority, estimated_hours
+        FROM tasks
+        WHERE due_date IS NOT NULL AND status != 'completed'
+        UNION ALL
+        SELECT tenant_id, occurs_on, priority, estimated_hours
+        FROM task_occurrences
+        WHERE status != 'completed'
+    )
+    WHERE :tenant_id IS NULL OR tenant_id = :tenant_id
+    GROUP BY tenant_id, day, priority
+"""
+
+_EXPECTED_BY_STATUS = """
+    SELECT tenant_id, status,
+           COUNT(*) AS task_count, COALESCE(SUM(estimated_hours), 0) AS estimated_hours
+    FROM tasks
+    WHERE :tenant_id IS NULL OR tenant_id = :tenant_id
+    GROUP BY tenant_id, status
+"""
+
+
+@traced("db.workload_by_day")
+def workload_by_day(
+    conn: sqlite3.Connection, tenant_id: str, start: date, end: date
+) -> List[Dict[str, Any]]:
+    """
+    Read open workload per due day and priority.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Tenant identifier
+        start: First day, inclusive
+        end: Last day, inclusive
+
+    Returns:
+        Rows with day, priority, task_count and estimated_hours
+    """
+    rows = conn.execute(
+        """
+        SELECT day, priority, task_count, estimated_hours
+        FROM workload_by_day
+        WHERE tenant_id = ? AND day BETWEEN ? AND ? AND task_count > 0
+        ORDER BY day, priority
+        """,
+        (tenant_id, start.isoformat(), end.isoformat()),
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+@traced("db.workload_by_status")
+def workload_by_status(conn: sqlite3.Connection, tenant_id: str) -> List[Dict[str, Any]]:
+    """
+    Read task counts and hours per status.
+
+    Args:
+        conn: Connection to the tenant's database
+        tenant_id: Tenant identifier
+
+    Returns:
+        Rows with status, task_count and estimated_hours
+    """
+    rows = conn.execute(
+        """
+        SELECT status, task_count, estimated_hours
+        FROM workload_by_status
+        WHERE tenant_id = ? AND task_count > 0
+        ORDER BY status
+        """,
+        (tenant_id,),
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def rebuild_summaries(conn: sqlite3.Connection, tenant_id: Optional[str] = None) -> None:
+    """
+    Recompute summaries from the raw tasks table.
+
+    Args:
+        conn: Database connection
+        tenant_id: Tenant to rebuild, or None for every tenant in the database
+    """
+    with conn:
+        for statement in SUMMARY_REBUILD_STATEMENTS:
+            conn.execute(statement, {"tenant_id": tenant_id})
+
+
+def _as_map(rows: List[sqlite3.Row], key_columns: Tuple[str, ...]) -> Dict[tuple, tuple]:
+    return {
+        tuple(row[column] for column in key_columns): (
+            row["task_count"],
+            round(row["estimated_hours"], 6),
+        )
+        for row in rows
+        if row["task_count"]
+    }
+
+
+def check_summaries(
+    conn: sqlite3.Connection, tenant_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Compare summaries with aggregates computed from the raw tasks table.
+
+    Args:
+        conn: Database connection
+        tenant_id: Tenant to check, or None for every tenant in the database
+
+    Returns:
+        One entry per mismatching summary row; empty when consistent
+    """
+    params = {"tenant_id": tenant_id}
+    mismatches: List[Dict[str, Any]] = []
+
+    for table, expected_sql, key_columns in (
+        ("workload_by_day", _EXPECTED_BY_DAY, ("tenant_id", "day", "priority")),
+        ("workload_by_status", _EXPECTED_BY_STATUS, ("tenant_id", "status")),
+    ):
+        expected = _as_map(conn.execute(expected_sql, params).fetchall(), key_columns)
+        actual = _as_map(
+            conn.execute(
+                f"SELECT * FROM {table} WHERE :tenant_id IS NULL OR tenant_id = :tenant_id",
+                params,
+            ).fetchall(),
+            key_columns,
+        )
+        for key in sorted(set(expected) | set(actual), key=str):
+            if expected.get(key) != actual.get(key):
+                mismatches.append(
+                    {
+                        "table": table,
+                        "key": dict(zip(key_columns, key, strict=True)),
+                        "expected": expected.get(key),
+                        "actual": actual.get(key),
+                    }
+                )
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line rebuild and consistency check of the summary tables."""
+    parser = argparse.ArgumentParser(prog="python -m ai_engine.db.summaries")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--tenant", help="Limit to one tenant")
+    args = parser.parse_args(argv)
+
+    paths = [shard_router.path_for(args.tenant)] if args.tenant else shard_router.database_paths()
+    exit_code = 0
+
+    for path in paths:
+        with shard_router.connect(path) as conn:
+            if args.command == "rebuild":
+                rebuild_summaries(conn, args.tenant)
+                print(f"{path}: rebuilt")
+                continue
+
+            mismatches = check_summaries(conn, args.tenant)
+            print(f"{path}: {len(mismatches)} mismatches")
+            for mismatch in mismatches:
+                print(f"  {mismatch}")
+            if mismatches:
+                exit_code = 1
+
+    shard_router.close()
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,28 +1,46 @@
 """Main FastAPI application entry point."""
 
 import logging
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from .api import health, planner
+from . import IMPORT_STARTED
+from .api import health, jobs, planner, stats, ws
 from .core.config import settings
+from .core.decomposition import shutdown_process_pool
+from .core.jobs import job_workers
+from .core.planner_service import get_planner_service
+from .core.pubsub import event_hub
+from .core.startup import startup_state
 from .db.database import init_db
+from .db.sharding import shard_router
 from .utils.logging_config import setup_logging
+from .utils.tracing import tracer
 
-setup_logging()
 logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
+    setup_logging()
     logger.info("Starting AegisX AI Engine...")
-    init_db()
-    logger.info("Database initialized")
+    startup_state.begin()
+    await startup_state.run_phases({"database": init_db, "planner_service": get_planner_service})
+    if settings.JOB_WORKERS > 0:
+        await job_workers.start()
+    startup_state.mark_ready()
     yield
     logger.info("Shutting down AegisX AI Engine...")
+    startup_state.mark_stopping()
+    event_hub.close()
+    await job_workers.stop()
+    shutdown_process_pool()
+    shard_router.close()
+    tracer.shutdown()
 
 
 app = FastAPI(
@@ -40,8 +58,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Run each request in a root span and return its trace id."""
+    with tracer.start_trace(
+        f"{request.method} {request.url.path}",
+        traceparent=request.headers.get("traceparent"),
+        http_method=request.method,
+        http_path=request.url.path,
+    ) as root:
+        response = await call_next(request)
+        root.set_attribute("http_status", response.status_code)
+
+    response.headers["X-Trace-Id"] = root.trace_id
+    response.headers["traceparent"] = (
+        f"00-{root.trace_id}-{root.span_id}-{'01' if root.sampled else '00'}"
+    )
+    return response
+
+
 app.include_router(health.router, tags=["health"])
 app.include_router(planner.router, prefix="/plan", tags=["planner"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+app.include_router(stats.router, prefix="/stats", tags=["stats"])
+app.include_router(ws.router, prefix="/ws", tags=["ws"])
+
+if settings.PROFILING_ENABLED:
+    from .api import admin
+    from .utils.profiling import request_profiler
+
+    @app.middleware("http")
+    async def profile_requests(request: Request, call_next):
+        """Capture cProfile data for a sampled fraction of requests."""
+        if not request_profiler.should_profile(request.url.path):
+            return await call_next(request)
+
+        profile = request_profiler.start()
+        if profile is None:
+            return await call_next(request)
+
+        started = time.perf_counter()
+        try:
+            return await call_next(request)
+        finally:
+            request_profiler.stop(
+                profile,
+                request.url.path,
+                (time.perf_counter() - started) * 1000,
+            )
+
+    app.include_router(admin.router, prefix="/admin/profiling", tags=["admin"])
+
+startup_state.record_import(time.perf_counter() - IMPORT_STARTED)
 
 
 if __name__ == "__main__":
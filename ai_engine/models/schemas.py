@@ -1,10 +1,10 @@
 """Pydantic schemas for API requests and responses."""
 
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class PriorityLevel(str, Enum):
@@ -25,18 +25,86 @@ class TaskStatus(str, Enum):
     BLOCKED = "blocked"
 
 
+class PlanSource(str, Enum):
+    """Which generation path produced a plan."""
+
+    MODEL = "model"
+    MODEL_HEDGE = "model_hedge"
+    DETERMINISTIC = "deterministic"
+    FALLBACK = "fallback"
+
+
+class RecurrenceFrequency(str, Enum):
+    """How often a recurring task repeats."""
+
+    DAILY = "daily"
+    WEEKLY = "weekly"
+
+
+class RecurrenceRule(BaseModel):
+    """Repeat rule stored once per task and expanded into occurrences on demand."""
+
+    frequency: RecurrenceFrequency = Field(..., description="Repeat daily or weekly")
+    interval: int = Field(default=1, ge=1, le=365, description="Repeat every N days or weeks")
+    weekdays: Optional[List[int]] = Field(
+        default=None,
+        description="Weekly only: days to repeat on, 0 = Monday to 6 = Sunday; "
+        "defaults to the weekday of starts_on",
+    )
+    starts_on: Optional[date] = Field(
+        default=None, description="First occurrence; defaults to the task's due date, or today"
+    )
+    until: Optional[date] = Field(default=None, description="Last possible occurrence, inclusive")
+
+    @field_validator("weekdays")
+    @classmethod
+    def validate_weekdays(cls, v: Optional[List[int]]) -> Optional[List[int]]:
+        """Validate weekdays are 0-6 and return them sorted without duplicates."""
+        if v is None:
+            return v
+        if not v or any(day < 0 or day > 6 for day in v):
+            raise ValueError("Weekdays must be a non-empty list of numbers from 0 to 6")
+        return sorted(set(v))
+
+    @model_validator(mode="after")
+    def validate_range(self) -> "RecurrenceRule":
+        """Validate until is not before starts_on."""
+        if self.starts_on and self.until and self.until < self.starts_on:
+            raise ValueError("until must be on or after starts_on")
+        return self
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "frequency": "weekly",
+                "interval": 1,
+                "weekdays": [0, 3],
+                "starts_on": "2026-01-12",
+                "until": None,
+            }
+        }
+    }
+
+
 class Task(BaseModel):
     """Task model with strict typing."""
 
     id: Optional[int] = Field(default=None, description="Task ID")
     title: str = Field(..., min_length=1, max_length=200, description="Task title")
-    description: Optional[str] = Field(default=None, max_length=1000, description="Task description")
+    description: Optional[str] = Field(
+        default=None, max_length=1000, description="Task description"
+    )
     priority: PriorityLevel = Field(default=PriorityLevel.MEDIUM, description="Task priority")
     status: TaskStatus = Field(default=TaskStatus.PENDING, description="Task status")
-    estimated_hours: Optional[float] = Field(default=None, ge=0.0, le=168.0, description="Estimated hours")
+    estimated_hours: Optional[float] = Field(
+        default=None, ge=0.0, le=168.0, description="Estimated hours"
+    )
     due_date: Optional[datetime] = Field(default=None, description="Task due date")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
     updated_at: datetime = Field(default_factory=datetime.utcnow, description="Update timestamp")
+    recurrence: Optional[RecurrenceRule] = Field(
+        default=None, description="Repeat rule, if recurring"
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -56,7 +124,9 @@ class PlanRequest(BaseModel):
 
     context: str = Field(..., min_length=1, max_length=5000, description="Planning context")
     goals: List[str] = Field(..., min_items=1, max_items=10, description="List of goals")
-    constraints: Optional[List[str]] = Field(default=None, max_items=10, description="Planning constraints")
+    constraints: Optional[List[str]] = Field(
+        default=None, max_items=10, description="Planning constraints"
+    )
 
     @field_validator("goals")
     @classmethod
@@ -70,7 +140,11 @@ class PlanRequest(BaseModel):
         "json_schema_extra": {
             "example": {
                 "context": "I need to prepare for a product launch",
-                "goals": ["Complete marketing materials", "Setup infrastructure", "Train support team"],
+                "goals": [
+                    "Complete marketing materials",
+                    "Setup infrastructure",
+                    "Train support team",
+                ],
                 "constraints": ["Launch date is next Friday", "Budget is limited"],
             }
         }
@@ -83,7 +157,16 @@ class PlanResponse(BaseModel):
     plan_id: str = Field(..., description="Unique plan identifier")
     tasks: List[Task] = Field(..., description="Generated task list")
     summary: str = Field(..., description="Plan summary")
+    source: PlanSource = Field(
+        default=PlanSource.DETERMINISTIC,
+        description="Generation path: model, model_hedge (hedged request won), "
+        "deterministic (no model configured) or fallback (model unavailable)",
+    )
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Plan creation time")
+    occurrences: List["TaskOccurrence"] = Field(
+        default_factory=list,
+        description="Occurrences of the plan's recurring tasks in the requested window",
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -91,12 +174,134 @@ class PlanResponse(BaseModel):
                 "plan_id": "plan_20260112_abc123",
                 "tasks": [],
                 "summary": "Generated 5 tasks for weekly planning",
+                "source": "deterministic",
                 "created_at": "2026-01-12T10:00:00Z",
             }
         }
     }
 
 
+class TaskOccurrence(BaseModel):
+    """One dated occurrence of a recurring task."""
+
+    plan_id: str = Field(..., description="Plan the recurring task belongs to")
+    task_id: int = Field(..., description="Recurring task id within the plan")
+    occurs_on: date = Field(..., description="Occurrence date")
+    title: str = Field(..., description="Task title")
+    priority: PriorityLevel = Field(..., description="Task priority")
+    status: TaskStatus = Field(default=TaskStatus.PENDING, description="Occurrence status")
+    estimated_hours: Optional[float] = Field(default=None, description="Estimated hours")
+
+
+PlanResponse.model_rebuild()
+
+
+class OccurrenceListResponse(BaseModel):
+    """Response model for listing recurring task occurrences."""
+
+    start: date = Field(..., description="First day of the window, inclusive")
+    end: date = Field(..., description="Last day of the window, inclusive")
+    occurrences: List[TaskOccurrence] = Field(..., description="Occurrences ordered by date")
+
+
+class TaskStatusUpdate(BaseModel):
+    """Request model for changing a stored task's status."""
+
+    status: TaskStatus = Field(..., description="New task status")
+
+
+class WorkloadBucket(BaseModel):
+    """Aggregated task count and hours."""
+
+    task_count: int = Field(default=0, ge=0, description="Number of tasks")
+    estimated_hours: float = Field(default=0.0, ge=0.0, description="Sum of estimated hours")
+
+
+class WorkloadDay(BaseModel):
+    """Open workload due on one day."""
+
+    day: date = Field(..., description="Due date")
+    total: WorkloadBucket = Field(..., description="Workload across all priorities")
+    by_priority: Dict[PriorityLevel, WorkloadBucket] = Field(
+        ..., description="Workload per priority"
+    )
+
+
+class WorkloadStatsResponse(BaseModel):
+    """Response model for workload statistics."""
+
+    start: date = Field(..., description="First day of the window, inclusive")
+    end: date = Field(..., description="Last day of the window, inclusive")
+    days: List[WorkloadDay] = Field(..., description="Open workload per due day")
+    by_status: Dict[TaskStatus, WorkloadBucket] = Field(..., description="All tasks per status")
+
+
+class PlanEventType(str, Enum):
+    """Kinds of events pushed over the WebSocket feeds."""
+
+    TASKS_CREATED = "tasks_created"
+    TASK_UPDATED = "task_updated"
+
+
+class PlanEvent(BaseModel):
+    """Event pushed to plan and tenant feed subscribers."""
+
+    type: PlanEventType = Field(..., description="Event kind")
+    plan_id: str = Field(..., description="Plan the tasks belong to")
+    tasks: List[Task] = Field(..., description="New or changed tasks")
+    timestamp: datetime = Field(default_factory=datetime.utcnow, description="Event time")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "type": "task_updated",
+                "plan_id": "plan_week_20260112_3f2a9c0e",
+                "tasks": [{"id": 1, "title": "Review pull requests", "status": "completed"}],
+                "timestamp": "2026-01-12T10:00:00Z",
+            }
+        }
+    }
+
+
+class JobStatus(str, Enum):
+    """Async job status options."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobAcceptedResponse(BaseModel):
+    """Response model for accepted async planning requests."""
+
+    job_id: str = Field(..., description="Job identifier")
+    status: JobStatus = Field(..., description="Job status")
+    status_url: str = Field(..., description="URL to poll for the job result")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "job_id": "job_3f2a9c0e4b7d4e1f8a6b5c4d3e2f1a0b",
+                "status": "queued",
+                "status_url": "/jobs/job_3f2a9c0e4b7d4e1f8a6b5c4d3e2f1a0b",
+            }
+        }
+    }
+
+
+class JobStatusResponse(BaseModel):
+    """Response model for async job status."""
+
+    job_id: str = Field(..., description="Job identifier")
+    status: JobStatus = Field(..., description="Job status")
+    attempts: int = Field(..., description="Attempts made so far")
+    result: Optional[PlanResponse] = Field(default=None, description="Plan, once succeeded")
+    error: Optional[str] = Field(default=None, description="Last error, if any")
+    created_at: datetime = Field(..., description="Job creation time")
+    updated_at: datetime = Field(..., description="Last status change")
+
+
 class HealthResponse(BaseModel):
     """Health check response model."""
 
@@ -115,3 +320,127 @@ class HealthResponse(BaseModel):
             }
         }
     }
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness check response with startup timings."""
+
+    ready: bool = Field(..., description="Whether the worker should receive traffic")
+    database: str = Field(..., description="Database status")
+    import_ms: Optional[float] = Field(default=None, description="Time to import the application")
+    startup_ms: Optional[float] = Field(
+        default=None, description="Time from lifespan start to ready"
+    )
+    phases_ms: Dict[str, float] = Field(
+        default_factory=dict, description="Duration of each startup phase"
+    )
+    error: Optional[str] = Field(default=None, description="Failed startup phase, if any")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "ready": True,
+                "database": "connected",
+                "import_ms": 412.5,
+                "startup_ms": 6.2,
+                "phases_ms": {"database": 1.1, "planner_service": 0.4},
+                "error": None,
+            }
+        }
+    }
+
+
+class GoalMemoStatsResponse(BaseModel):
+    """Goal memo hit-rate statistics."""
+
+    enabled: bool = Field(..., description="Whether goal memoization is enabled")
+    entries: int = Field(default=0, description="Number of stored goal breakdowns")
+    lookups: int = Field(default=0, description="Total memo lookups")
+    hits: int = Field(default=0, description="Lookups served from the memo")
+    exact_hits: int = Field(default=0, description="Hits on an identical normalized goal")
+    similar_hits: int = Field(default=0, description="Hits on a near-duplicate goal")
+    misses: int = Field(default=0, description="Lookups that required generation")
+    hit_rate: float = Field(default=0.0, description="Fraction of lookups served from the memo")
+    saved_generation_seconds: float = Field(
+        default=0.0, description="Estimated generation time saved by memo hits"
+    )
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "enabled": True,
+                "entries": 1200,
+                "lookups": 5000,
+                "hits": 3800,
+                "exact_hits": 2900,
+                "similar_hits": 900,
+                "misses": 1200,
+                "hit_rate": 0.76,
+                "saved_generation_seconds": 4.2,
+            }
+        }
+    }
+
+
+class ModelStatsResponse(BaseModel):
+    """Response model for model backend resilience statistics."""
+
+    enabled: bool = Field(..., description="Whether a model backend is configured")
+    breaker_state: Optional[str] = Field(default=None, description="closed, open or half_open")
+    calls: int = Field(default=0, description="Calls sent to the backend")
+    hedges: int = Field(default=0, description="Hedged second attempts sent")
+    hedge_wins: int = Field(default=0, description="Calls won by the hedged attempt")
+    rejected: int = Field(default=0, description="Calls refused by the breaker or deadline")
+    failures: int = Field(default=0, description="Calls where no attempt succeeded")
+    hedge_delay_seconds: Optional[float] = Field(default=None, description="Current hedge delay")
+
+
+class ProfilingConfigRequest(BaseModel):
+    """Request model for toggling per-request profiling."""
+
+    sample_rate: float = Field(..., ge=0.0, le=1.0, description="Fraction of requests to profile")
+    path_prefix: Optional[str] = Field(default=None, description="Only profile matching paths")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "sample_rate": 0.01,
+                "path_prefix": "/plan/",
+            }
+        }
+    }
+
+
+class ProfileCaptureSummary(BaseModel):
+    """Summary of a captured request profile."""
+
+    capture_id: str = Field(..., description="Capture identifier")
+    path: str = Field(..., description="Profiled request path")
+    duration_ms: float = Field(..., description="Request duration in milliseconds")
+    captured_at: datetime = Field(..., description="Capture time")
+    top: str = Field(..., description="Top functions by cumulative time")
+
+
+class ProfilingStatusResponse(BaseModel):
+    """Current profiling configuration and captures."""
+
+    sample_rate: float = Field(..., description="Fraction of requests profiled")
+    path_prefix: str = Field(..., description="Profiled path prefix")
+    tracemalloc_active: bool = Field(..., description="Whether allocation tracing is running")
+    captures: List[ProfileCaptureSummary] = Field(..., description="Recent request captures")
+
+
+class AllocationSite(BaseModel):
+    """Allocation site from a tracemalloc snapshot."""
+
+    site: str = Field(..., description="Source location of the allocations")
+    size_bytes: int = Field(..., description="Total size of live allocations")
+    count: int = Field(..., description="Number of live allocations")
+
+
+class TracemallocSnapshotResponse(BaseModel):
+    """Top allocation sites from a tracemalloc snapshot."""
+
+    current_bytes: int = Field(..., description="Currently traced memory")
+    peak_bytes: int = Field(..., description="Peak traced memory")
+    sites: List[AllocationSite] = Field(..., description="Top allocation sites")
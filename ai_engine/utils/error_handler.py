@@ -42,6 +42,22 @@ class PlannerError(AegisXException):
         super().__init__(message, status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class ModelBackendError(AegisXException):
+    """Exception for failed or unavailable model backend calls."""
+
+    def __init__(self, message: str):
+        """Initialize model backend error."""
+        super().__init__(message, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class IdempotencyError(AegisXException):
+    """Exception for Idempotency-Key reuse and conflicts."""
+
+    def __init__(self, message: str, status_code: int = status.HTTP_409_CONFLICT):
+        """Initialize idempotency error."""
+        super().__init__(message, status_code)
+
+
 def handle_service_error(error: Exception, operation: str) -> NoReturn:
     """
     Handle service errors with consistent logging and HTTP responses.
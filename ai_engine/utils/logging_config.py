@@ -2,9 +2,10 @@
 
 import logging
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from ..core.config import settings
+from .tracing import TraceContextFilter
 
 
 class StructuredFormatter(logging.Formatter):
@@ -22,6 +23,11 @@ class StructuredFormatter(logging.Formatter):
         if hasattr(record, "extra"):
             log_data.update(record.extra)
 
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            log_data["trace_id"] = trace_id
+            log_data["span_id"] = record.span_id
+
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
 
@@ -32,8 +38,17 @@ class StructuredFormatter(logging.Formatter):
         return " | ".join(parts)
 
 
+_handler: Optional[logging.Handler] = None
+
+
 def setup_logging() -> None:
-    """Configure structured logging for the application."""
+    """
+    Configure structured logging for the application.
+
+    Called from the application lifespan rather than at import time; calling
+    it again replaces the handler it installed before.
+    """
+    global _handler
     log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
 
     handler = logging.StreamHandler(sys.stdout)
@@ -43,10 +58,14 @@ def setup_logging() -> None:
             datefmt="%Y-%m-%d %H:%M:%S",
         )
     )
+    handler.addFilter(TraceContextFilter())
 
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
+    if _handler is not None:
+        root_logger.removeHandler(_handler)
     root_logger.addHandler(handler)
+    _handler = handler
 
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
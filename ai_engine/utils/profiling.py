@@ -0,0 +1,176 @@
+"""On-demand profiling of live workers.
+
+Three tools are exposed through the admin profiling API when
+PROFILING_ENABLED is set:
+
+- RequestProfiler captures cProfile data for a sampled fraction of requests.
+- StackSampler periodically samples every thread's stack over a time window
+  and renders flamegraph-compatible collapsed stacks.
+- Tracemalloc helpers start allocation tracing and report the top sites.
+
+Nothing here is imported or installed when profiling is disabled.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+from uuid import uuid4
+
+
+class ProfileCapture:
+    """cProfile result for a single request."""
+
+    def __init__(self, path: str, duration_ms: float, profile: cProfile.Profile):
+        """Record a finished request profile."""
+        self.capture_id = uuid4().hex[:12]
+        self.path = path
+        self.duration_ms = duration_ms
+        self.captured_at = datetime.utcnow()
+
+        profile.create_stats()
+        self.raw = marshal.dumps(profile.stats)
+
+        buffer = io.StringIO()
+        pstats.Stats(profile, stream=buffer).sort_stats("cumulative").print_stats(25)
+        self.top = buffer.getvalue()
+
+
+class RequestProfiler:
+    """Samples requests for cProfile capture."""
+
+    def __init__(self, max_captures: int = 50):
+        """Initialize profiler with request capture disabled."""
+        self.sample_rate = 0.0
+        self.path_prefix = "/plan/"
+        self.captures: Deque[ProfileCapture] = deque(maxlen=max_captures)
+        # cProfile hooks the interpreter's profile function, so only one
+        # request can be captured at a time.
+        self._busy = threading.Lock()
+
+    def configure(self, sample_rate: float, path_prefix: Optional[str] = None) -> None:
+        """Set the sampled fraction of matching requests."""
+        self.sample_rate = sample_rate
+        if path_prefix is not None:
+            self.path_prefix = path_prefix
+
+    def should_profile(self, path: str) -> bool:
+        """Decide whether to profile a request for the given path."""
+        return (
+            self.sample_rate > 0.0
+            and path.startswith(self.path_prefix)
+            and random.random() < self.sample_rate
+        )
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Start a capture, or return None if another capture is running."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop(self, profile: cProfile.Profile, path: str, duration_ms: float) -> None:
+        """Finish a capture started with start()."""
+        try:
+            profile.disable()
+        finally:
+            self._busy.release()
+        self.captures.append(ProfileCapture(path, duration_ms, profile))
+
+    def get(self, capture_id: str) -> Optional[ProfileCapture]:
+        """Look up a capture by id."""
+        return next((c for c in self.captures if c.capture_id == capture_id), None)
+
+
+class StackSampler:
+    """Low-overhead statistical sampler producing collapsed stacks."""
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+
+    def run(self, duration: float) -> str:
+        """
+        Sample all threads for the given duration.
+
+        Args:
+            duration: Sampling window in seconds
+
+        Returns:
+            Collapsed stacks, one ``frame;frame;frame count`` line per stack
+        """
+        own_thread = threading.get_ident()
+        counts: Counter = Counter()
+        deadline = time.monotonic() + duration
+
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                    frame = frame.f_back
+                counts[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+        return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+def start_tracemalloc(frames: int = 1) -> None:
+    """Start allocation tracing if it is not already running."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracemalloc() -> None:
+    """Stop allocation tracing and free its memory."""
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def tracemalloc_top(limit: int = 20, group_by: str = "lineno") -> Dict[str, Any]:
+    """
+    Take a snapshot and return the top allocation sites.
+
+    Args:
+        limit: Number of sites to return
+        group_by: "lineno", "filename" or "traceback"
+
+    Returns:
+        Traced memory totals and the top allocation sites
+    """
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        )
+    )
+    current, peak = tracemalloc.get_traced_memory()
+    sites: List[Dict[str, Any]] = [
+        {
+            "site": str(stat.traceback),
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics(group_by)[:limit]
+    ]
+    return {"current_bytes": current, "peak_bytes": peak, "sites": sites}
+
+
+request_profiler = RequestProfiler()
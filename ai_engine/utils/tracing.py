@@ -0,0 +1,392 @@
+"""Lightweight request-scoped tracing with contextvars propagation.
+
+Every request gets a trace id, which is injected into log records and the
+``X-Trace-Id`` response header. Head-based sampling decides once, at the root
+span, whether the trace's spans are recorded; unsampled traces only pay for a
+context variable lookup per span. Finished spans are batched on a background
+thread and written by an exporter, either to a local JSON-lines file or to an
+OTLP/HTTP JSON collector.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import queue
+import random
+import secrets
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "sampled",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        sampled: bool,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        """Start a span."""
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = attributes or {}
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Span duration in milliseconds, once finished."""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the span for export."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("aegisx_current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """Return the active span, if any."""
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    """Return the active trace id, if any."""
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+
+class SpanExporter(ABC):
+    """Base class for span exporters."""
+
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        """Export a batch of finished spans."""
+
+    def shutdown(self) -> None:
+        """Release exporter resources. Exporters holding none keep this default."""
+        return None
+
+
+class FileSpanExporter(SpanExporter):
+    """Append spans as JSON lines to a local file."""
+
+    def __init__(self, path: str):
+        """Initialize exporter writing to the given path."""
+        self.path = Path(path)
+
+    def export(self, spans: List[Span]) -> None:
+        """Append spans to the trace file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class OTLPHttpExporter(SpanExporter):
+    """Post spans as OTLP/HTTP JSON to a local collector."""
+
+    def __init__(self, endpoint: str, timeout: float = 2.0):
+        """Initialize exporter posting to the given collector endpoint."""
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def _encode(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": settings.APP_NAME}}
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "ai_engine"},
+                            "spans": [
+                                {
+                                    "traceId": span.trace_id,
+                                    "spanId": span.span_id,
+                                    "parentSpanId": span.parent_id or "",
+                                    "name": span.name,
+                                    "startTimeUnixNano": str(span.start_ns),
+                                    "endTimeUnixNano": str(span.end_ns),
+                                    "status": {"code": 1 if span.status == "ok" else 2},
+                                    "attributes": [
+                                        {"key": key, "value": {"stringValue": str(value)}}
+                                        for key, value in span.attributes.items()
+                                    ],
+                                }
+                                for span in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self, spans: List[Span]) -> None:
+        """Post spans to the collector."""
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self._encode(spans)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class Tracer:
+    """Creates spans, applies head-based sampling and batches exports."""
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter],
+        sample_rate: float = 1.0,
+        max_queue_size: int = 2048,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Initialize tracer.
+
+        Args:
+            exporter: Destination for finished spans; None disables recording
+            sample_rate: Fraction of new traces whose spans are recorded
+            max_queue_size: Finished spans buffered before new ones are dropped
+            batch_size: Maximum spans per export call
+            flush_interval: Seconds between background flushes
+        """
+        self.exporter = exporter
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def _should_sample(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    @contextmanager
+    def start_trace(
+        self,
+        name: str,
+        traceparent: Optional[str] = None,
+        **attributes: Any,
+    ) -> Iterator[Span]:
+        """
+        Start a root span, continuing an incoming W3C trace context if given.
+
+        Args:
+            name: Root span name
+            traceparent: Incoming ``traceparent`` header value
+            **attributes: Span attributes
+
+        Yields:
+            The root span
+        """
+        trace_id, parent_id, sampled = None, None, None
+        if traceparent:
+            parts = traceparent.split("-")
+            if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+                trace_id, parent_id = parts[1], parts[2]
+                sampled = parts[3] == "01" and self.exporter is not None
+
+        root = Span(
+            name,
+            trace_id or secrets.token_hex(16),
+            parent_id,
+            self._should_sample() if sampled is None else sampled,
+            attributes,
+        )
+        with self._activate(root):
+            yield root
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Start a child span of the active span.
+
+        Yields None, without allocating a span, when the active trace is not
+        sampled or there is no active trace.
+        """
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            yield None
+            return
+
+        child = Span(name, parent.trace_id, parent.span_id, True, attributes)
+        with self._activate(child):
+            yield child
+
+    @contextmanager
+    def _activate(self, span: Span) -> Iterator[None]:
+        token = _current_span.set(span)
+        try:
+            yield
+        except BaseException as e:
+            span.status = "error"
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            if span.sampled:
+                self._enqueue(span)
+
+    def _enqueue(self, span: Span) -> None:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="aegisx-span-exporter", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._stop.wait(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Export all queued spans."""
+        if self.exporter is None:
+            return
+        while True:
+            batch: List[Span] = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                logger.warning(f"Span export failed: {str(e)}", extra={"spans": len(batch)})
+                return
+
+    def shutdown(self) -> None:
+        """Stop the background worker and flush remaining spans."""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.flush_interval + 1)
+        self.flush()
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Decorate a sync or async function so each call runs in a child span.
+
+    Args:
+        name: Span name; defaults to the function's qualified name
+    """
+
+    def decorator(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with tracer.span(span_name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class TraceContextFilter(logging.Filter):
+    """Inject the active trace and span ids into log records."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Attach trace context attributes to the record."""
+        span = _current_span.get()
+        if span is not None:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+
+def _build_exporter() -> Optional[SpanExporter]:
+    if not settings.TRACING_ENABLED or settings.TRACE_EXPORTER == "none":
+        return None
+    if settings.TRACE_EXPORTER == "otlp":
+        return OTLPHttpExporter(settings.TRACE_OTLP_ENDPOINT)
+    return FileSpanExporter(settings.TRACE_FILE_PATH)
+
+
+tracer = Tracer(_build_exporter(), sample_rate=settings.TRACE_SAMPLE_RATE)
@@ -0,0 +1,134 @@
+"""Benchmark goal memo lookups with the memo filled to production size.
+
+Fills a ``GoalMemo`` with ``--entries`` synthetic goals, then times
+``--lookups`` lookups split evenly between:
+
+* reworded: a stored goal with words dropped or abbreviated, which should hit
+  through LSH rather than the exact index
+* unseen: goals built from the same vocabulary that were never stored; most
+  are near-duplicates of stored goals and hit too
+
+Goals are drawn from a small vocabulary plus a numeric suffix, so many stored
+goals share most of their wording and LSH buckets are crowded, the worst case
+for lookup cost. Reports fill rate, lookup latency percentiles, hit rate and
+the process's peak RSS.
+
+Usage:
+    python -m benchmarks.bench_goal_memo [--entries 1000000] [--lookups 20000]
+"""
+
+import argparse
+import random
+import resource
+import time
+from typing import Dict, List
+
+from ai_engine.core.goal_memo import GoalMemo
+
+VERBS = ["prepare", "review", "ship", "write", "plan", "set up", "migrate", "train", "audit"]
+OBJECTS = [
+    "quarterly report",
+    "marketing materials",
+    "infrastructure",
+    "onboarding docs",
+    "release notes",
+    "support team",
+    "database backups",
+    "pricing page",
+]
+AUDIENCES = ["sales", "engineering", "finance", "the board", "partners", "customers"]
+ABBREVIATIONS = {"set up": "setup", "infrastructure": "infra", "docs": "documentation"}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the q-quantile of values, or 0 for an empty list."""
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def make_goal(rng: random.Random, n: int) -> str:
+    """Build a goal that shares most of its wording with many others."""
+    return (
+        f"{rng.choice(VERBS)} the {rng.choice(OBJECTS)} for {rng.choice(AUDIENCES)} " f"batch {n}"
+    )
+
+
+def reword(rng: random.Random, goal: str) -> str:
+    """Abbreviate or drop a word the way users rephrase a goal."""
+    for long, short in ABBREVIATIONS.items():
+        if long in goal:
+            return goal.replace(long, short)
+    words = goal.split()
+    del words[rng.randrange(len(words) - 1)]
+    return " ".join(words)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(args: argparse.Namespace) -> Dict[str, float]:
+    """Fill the memo and time lookups."""
+    rng = random.Random(args.seed)
+    memo = GoalMemo(max_entries=args.entries, bucket_size=args.bucket_size)
+
+    rss_before = peak_rss_mb()
+    stored: List[str] = []
+    started = time.perf_counter()
+    for n in range(args.entries):
+        goal = make_goal(rng, n)
+        memo.store(goal, n, namespace="weekly")
+        if n % max(args.entries // args.lookups, 1) == 0:
+            stored.append(goal)
+    fill_s = time.perf_counter() - started
+    rss_after = peak_rss_mb()
+
+    queries = [reword(rng, rng.choice(stored)) for _ in range(args.lookups // 2)]
+    queries += [make_goal(rng, args.entries + n) for n in range(args.lookups - len(queries))]
+    rng.shuffle(queries)
+
+    latencies: List[float] = []
+    hits = 0
+    for query in queries:
+        before = time.perf_counter()
+        hit = memo.lookup(query, namespace="weekly")
+        latencies.append(time.perf_counter() - before)
+        hits += hit is not None
+
+    return {
+        "entries": memo.stats()["entries"],
+        "fill_s": fill_s,
+        "lookup_p50_ms": percentile(latencies, 0.5) * 1000,
+        "lookup_p99_ms": percentile(latencies, 0.99) * 1000,
+        "lookup_max_ms": max(latencies) * 1000,
+        "hit_rate": hits / len(queries),
+        "memo_rss_mb": rss_after - rss_before,
+    }
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--bucket-size", type=int, default=16, help="Entries kept per LSH bucket")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run(args)
+    print(f"{result['entries']:,} stored goals, {args.lookups:,} lookups")
+    print(
+        f"  fill            {result['fill_s']:8.1f} s  "
+        f"({result['entries'] / result['fill_s']:,.0f} goals/s)"
+    )
+    print(
+        f"  lookup          {result['lookup_p50_ms']:8.3f} ms p50  "
+        f"{result['lookup_p99_ms']:8.3f} ms p99  {result['lookup_max_ms']:8.3f} ms max"
+    )
+    print(f"  hit rate        {result['hit_rate']:8.1%}")
+    print(f"  memory          {result['memo_rss_mb']:8.0f} MB peak RSS growth")
+
+
+if __name__ == "__main__":
+    main()
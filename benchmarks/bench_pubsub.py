@@ -0,0 +1,146 @@
+"""Benchmark the pub/sub hub behind the WebSocket feeds at one worker's load.
+
+Runs in a single event loop, as one worker would:
+
+* ``--idle`` subscribers each follow a plan nobody updates and sit blocked
+  in ``Subscription.get`` like an open, quiet connection
+* ``--active`` subscribers follow ``--plans`` busy plans; each message costs
+  the consumer one event-loop yield, standing in for the socket write
+* ``--slow`` of the active subscribers never read, so their buffers fill and
+  the hub drops them
+
+``--events`` task updates are published in bursts with ``publish_event``,
+which includes serializing each event once. Reports memory per idle
+subscriber, publish cost, publish-to-consumer latency and drop counts. Socket
+I/O is not included, so latencies are a lower bound on what clients see.
+
+Usage:
+    python -m benchmarks.bench_pubsub [--idle 10000] [--active 1000] [--events 50000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+from ai_engine.core.pubsub import PubSubHub, Subscription, plan_topic
+from ai_engine.models.schemas import PlanEvent, PlanEventType, Task, TaskStatus
+
+TENANT = "bench"
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+async def consume(subscription: Subscription, received: List[Tuple[float, str]]) -> None:
+    while True:
+        message = await subscription.get()
+        if message is None:
+            return
+        received.append((time.perf_counter(), message))
+        await asyncio.sleep(0)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, float]:
+    hub = PubSubHub(buffer_size=args.buffer, max_subscribers=0)
+
+    tracemalloc.start()
+    idle = [hub.subscribe(plan_topic(TENANT, f"idle-{n}")) for n in range(args.idle)]
+    waiting = [asyncio.ensure_future(subscription.get()) for subscription in idle]
+    await asyncio.sleep(0)
+    idle_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    received: List[Tuple[float, str]] = []
+    slow_count = int(args.active * args.slow)
+    reading: List[Subscription] = []
+    consumers = []
+    for n in range(args.active):
+        subscription = hub.subscribe(plan_topic(TENANT, f"plan-{n % args.plans}"))
+        if n >= slow_count:
+            reading.append(subscription)
+            consumers.append(asyncio.ensure_future(consume(subscription, received)))
+    await asyncio.sleep(0)
+
+    task = Task(id=1, title="Benchmark task", status=TaskStatus.IN_PROGRESS)
+    sent: Dict[int, float] = {}
+    publish_times: List[float] = []
+    started = time.perf_counter()
+    for seq in range(args.events):
+        event = PlanEvent(
+            type=PlanEventType.TASK_UPDATED,
+            plan_id=f"plan-{seq % args.plans}",
+            tasks=[task.model_copy(update={"id": seq})],
+        )
+        before = time.perf_counter()
+        sent[seq] = before
+        hub.publish_event(TENANT, event)
+        publish_times.append(time.perf_counter() - before)
+        if seq % args.burst == args.burst - 1:
+            await asyncio.sleep(0)
+    while any(subscription.pending for subscription in reading):
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+
+    latencies = [at - sent[json.loads(message)["tasks"][0]["id"]] for at, message in received]
+    stats = hub.stats()
+    hub.close()
+    await asyncio.gather(*waiting, *consumers)
+
+    return {
+        "idle_bytes_per_subscriber": idle_bytes / max(args.idle, 1),
+        "elapsed_s": elapsed,
+        "publish_mean_us": sum(publish_times) / len(publish_times) * 1e6,
+        "publish_p99_us": percentile(publish_times, 0.99) * 1e6,
+        "latency_p50_ms": percentile(latencies, 0.5) * 1000,
+        "latency_p99_ms": percentile(latencies, 0.99) * 1000,
+        "delivered": stats["delivered"],
+        "dropped": stats["dropped"],
+        "slow": slow_count,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--idle", type=int, default=10_000)
+    parser.add_argument("--active", type=int, default=1_000)
+    parser.add_argument(
+        "--plans", type=int, default=100, help="Busy plans the active subscribers follow"
+    )
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument(
+        "--burst", type=int, default=10, help="Events published between loop yields"
+    )
+    parser.add_argument("--buffer", type=int, default=256, help="Per-subscriber buffer size")
+    parser.add_argument(
+        "--slow", type=float, default=0.01, help="Fraction of active subscribers that never read"
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(
+        f"{args.idle} idle + {args.active} active subscribers on {args.plans} plans, "
+        f"{args.events} events in bursts of {args.burst}"
+    )
+    print(f"  idle memory     {result['idle_bytes_per_subscriber']:8.0f} B/subscriber")
+    print(
+        f"  publish         {result['publish_mean_us']:8.1f} us mean  "
+        f"{result['publish_p99_us']:8.1f} us p99  "
+        f"({args.events / result['elapsed_s']:,.0f} events/s)"
+    )
+    print(
+        f"  delivery        {result['latency_p50_ms']:8.3f} ms p50  "
+        f"{result['latency_p99_ms']:8.3f} ms p99"
+    )
+    print(
+        f"  delivered {result['delivered']}  dropped {result['dropped']} "
+        f"(of {result['slow']} stalled subscribers)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark streaming task parsing against parse-after-complete.
+
+Generates a synthetic model response with N tasks, splits it into
+token-sized chunks and compares:
+
+* buffered: join all chunks, ``json.loads``, validate every task
+* streaming: ``TaskStreamParser`` fed chunk by chunk
+
+Reports total time, time until the first task is available and peak
+traced memory for both. Both paths keep the validated tasks, so the memory
+difference is the raw body and decoded JSON tree the buffered path holds.
+
+Usage:
+    python -m benchmarks.bench_task_stream [--tasks 20000] [--chunk 16]
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from ai_engine.core.task_stream import TaskStreamParser
+from ai_engine.models.schemas import Task
+
+
+def synthetic_output(count: int, seed: int = 0) -> str:
+    """Build a model-like response with ``count`` tasks and a few defects."""
+    rng = random.Random(seed)
+    priorities = ["low", "medium", "high", "critical"]
+    verbs = ["plan", "ship", "review", "fix"]
+    tasks = []
+    for i in range(count):
+        task = {
+            "title": f"Task {i}: {' '.join(rng.choice(verbs) for _ in range(4))}",
+            "description": 'Step "quoted" details ' * rng.randint(1, 6),
+            "priority": rng.choice(priorities),
+            "estimated_hours": round(rng.uniform(0.5, 8.0), 1),
+        }
+        text = json.dumps(task)
+        if i % 500 == 499:
+            text = text[:-1] + ",}"  # trailing comma the buffered path cannot handle
+        tasks.append(text)
+    return 'Here is your plan:\n```json\n{"tasks": [' + ", ".join(tasks) + "]}\n```"
+
+
+def chunked(text: str, size: int) -> List[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def run_buffered(chunks: List[str]) -> Tuple[int, float]:
+    started = time.perf_counter()
+    body = "".join(chunks)
+    body = body[body.index("{") : body.rindex("}") + 1]
+    data = json.loads(body.replace(",}", "}"))
+    tasks = [Task.model_validate(item) for item in data["tasks"]]
+    return len(tasks), time.perf_counter() - started
+
+
+def run_streaming(chunks: List[str]) -> Tuple[int, float]:
+    parser = TaskStreamParser()
+    started = time.perf_counter()
+    first = None
+    tasks: List[Task] = []
+    for chunk in chunks:
+        tasks += parser.feed(chunk)
+        if tasks and first is None:
+            first = time.perf_counter() - started
+    tasks += parser.close()
+    return len(tasks), first or 0.0
+
+
+def measure(fn: Callable[[List[str]], Tuple[int, float]], chunks: List[str]) -> dict:
+    """Time one run, then repeat it under tracemalloc for peak memory."""
+    started = time.perf_counter()
+    count, first = fn(chunks)
+    total = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn(chunks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"tasks": count, "total_s": total, "first_task_s": first, "peak_mib": peak / 2**20}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--chunk", type=int, default=16, help="Characters per streamed chunk")
+    args = parser.parse_args()
+
+    chunks = chunked(synthetic_output(args.tasks), args.chunk)
+    print(f"{args.tasks} tasks, {sum(map(len, chunks)) / 2**20:.1f} MiB in {len(chunks)} chunks")
+
+    # Buffered first-task latency equals its total: nothing is usable until the end.
+    for name, fn in (("buffered", run_buffered), ("streaming", run_streaming)):
+        result = measure(fn, chunks)
+        first = result["total_s"] if name == "buffered" else result["first_task_s"]
+        print(
+            f"{name:>10}: {result['tasks']} tasks  total {result['total_s'] * 1000:8.1f} ms  "
+            f"first task {first * 1000:8.3f} ms  peak {result['peak_mib']:7.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Timing, baseline storage and regression detection for the microbenchmarks.
+
+Each benchmark is timed as ``repeat`` samples. A sample runs the benchmark in
+a loop, sized during calibration to take at least ``min_time`` seconds, and
+records the mean time per call. Keeping every sample, and not only a summary,
+lets two runs be compared with a rank test.
+
+A benchmark counts as regressed when both of these hold:
+
+* a one-sided Mann-Whitney U test finds the current samples slower than the
+  baseline at ``alpha``
+* the median slowed down by more than ``threshold``
+
+Requiring a minimum effect size stops tiny shifts, like a change of CPU
+frequency, from failing the gate. The rank test stops one noisy sample from
+failing it.
+"""
+
+import gc
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+@dataclass
+class Comparison:
+    """How one benchmark's current samples compare with its baseline."""
+
+    name: str
+    baseline_median: float
+    current_median: float
+    change: float
+    p_value: float
+    verdict: str
+
+
+def _time_loops(fn: Callable[[], Any], loops: int) -> float:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        return time.perf_counter() - started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def calibrate(fn: Callable[[], Any], min_time: float) -> int:
+    """Return how many calls of ``fn`` take at least ``min_time`` seconds."""
+    fn()  # warm caches and lazy imports outside the samples
+    loops = 1
+    while True:
+        elapsed = _time_loops(fn, loops)
+        if elapsed >= min_time:
+            return loops
+        loops *= 2 if elapsed == 0 else max(2, min(10, math.ceil(min_time / elapsed)))
+
+
+def measure(
+    benchmarks: Dict[str, Callable[[], Any]], repeat: int, min_time: float
+) -> Dict[str, List[float]]:
+    """
+    Time zero-argument callables.
+
+    Samples are taken round-robin across the benchmarks, so a slow period on
+    the machine spreads over all of them, not over one benchmark's samples.
+    The garbage collector is paused while a sample runs, as in ``timeit``.
+
+    Args:
+        benchmarks: Callables to time, by name
+        repeat: Number of samples to record per benchmark
+        min_time: Minimum duration of one sample in seconds
+
+    Returns:
+        Mean seconds per call for each sample, by name
+    """
+    loops = {name: calibrate(fn, min_time) for name, fn in benchmarks.items()}
+    samples: Dict[str, List[float]] = {name: [] for name in benchmarks}
+    for _ in range(repeat):
+        for name, fn in benchmarks.items():
+            samples[name].append(_time_loops(fn, loops[name]) / loops[name])
+    return samples
+
+
+def mann_whitney_greater(current: List[float], baseline: List[float]) -> float:
+    """
+    One-sided Mann-Whitney U test that ``current`` tends to be larger.
+
+    Uses the normal approximation with tie correction, which is accurate
+    enough from about eight samples per side.
+
+    Args:
+        current: Samples from the run being checked
+        baseline: Samples from the baseline run
+
+    Returns:
+        p-value; small values mean current is significantly larger
+    """
+    n1, n2 = len(current), len(baseline)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+
+    pooled = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tied = j - i + 1
+        tie_term += tied**3 - tied
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, pooled, strict=True) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)  # continuity correction
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(
+    current: Dict[str, List[float]],
+    baseline: Dict[str, List[float]],
+    alpha: float = 0.01,
+    threshold: float = 0.10,
+) -> List[Comparison]:
+    """
+    Compare current samples with a baseline, benchmark by benchmark.
+
+    Args:
+        current: Samples per benchmark from this run
+        baseline: Samples per benchmark from the baseline
+        alpha: Significance level of the rank test
+        threshold: Minimum relative change of the median to report
+
+    Returns:
+        One comparison per benchmark present in both runs, with verdict
+        "regression", "improvement" or "unchanged"
+    """
+    results = []
+    for name in sorted(current.keys() & baseline.keys()):
+        old, new = statistics.median(baseline[name]), statistics.median(current[name])
+        change = (new - old) / old if old else 0.0
+        slower = mann_whitney_greater(current[name], baseline[name])
+        faster = mann_whitney_greater(baseline[name], current[name])
+
+        if slower < alpha and change > threshold:
+            verdict, p_value = "regression", slower
+        elif faster < alpha and change < -threshold:
+            verdict, p_value = "improvement", faster
+        else:
+            verdict, p_value = "unchanged", min(slower, faster)
+        results.append(Comparison(name, old, new, change, p_value, verdict))
+    return results
+
+
+def git_revision() -> Dict[str, Any]:
+    """Return the current commit and whether the working tree has changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": "unknown", "dirty": True}
+    return {"commit": commit, "dirty": dirty}
+
+
+def save_baseline(
+    samples: Dict[str, List[float]], directory: Path = BASELINE_DIR, label: Optional[str] = None
+) -> Path:
+    """
+    Write a run's samples to ``<directory>/<commit>.json``.
+
+    Args:
+        samples: Samples per benchmark
+        directory: Where baselines are kept
+        label: File name to use instead of the commit, e.g. "main"
+
+    Returns:
+        Path of the written file
+    """
+    revision = git_revision()
+    name = label or revision["commit"] + ("-dirty" if revision["dirty"] else "")
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.json"
+    path.write_text(
+        json.dumps(
+            {
+                **revision,
+                "created_at": datetime.utcnow().isoformat(),
+                "python": platform.python_version(),
+                "machine": f"{platform.system()} {platform.machine()}",
+                "benchmarks": samples,
+            },
+            indent=2,
+        )
+    )
+    return path
+
+
+def load_baseline(ref: str, directory: Path = BASELINE_DIR) -> Dict[str, Any]:
+    """
+    Load a baseline by file path, label or commit.
+
+    Commits are resolved with ``git rev-parse`` first, so refs like ``HEAD~1``
+    or a branch name find the baseline saved for that commit.
+
+    Args:
+        ref: Path to a JSON file, a label, or a git ref
+        directory: Where baselines are kept
+
+    Returns:
+        The stored baseline document
+
+    Raises:
+        FileNotFoundError: If no baseline matches
+    """
+    candidates = [Path(ref), directory / f"{ref}.json"]
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", ref], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        candidates.append(directory / f"{commit}.json")
+    except (OSError, subprocess.CalledProcessError):
+        pass
+
+    for path in candidates:
+        if path.is_file():
+            return json.loads(path.read_text())
+    raise FileNotFoundError(f"No baseline found for {ref!r} in {directory}")
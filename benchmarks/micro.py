@@ -0,0 +1,243 @@
+"""Microbenchmarks for the planner, schemas, log formatting and database setup.
+
+Covers the code every request passes through:
+
+* ``planner.weekly`` / ``planner.daily``: ``PlannerService`` deterministic
+  plans at 1, 10 and 50 goals, with the goal memo off so every run
+  decomposes every goal
+* ``schemas.*``: ``PlanRequest`` and ``Task`` validation, and ``Task`` and
+  ``PlanResponse`` JSON serialization
+* ``logging.format``: ``StructuredFormatter.format`` with and without extras
+* ``db.*``: ``init_db`` on an existing database (the boot path),
+  ``apply_schema`` on an empty one, and ``check_db_connection``
+
+Each run can be saved as a JSON baseline named after the current commit and
+compared against an earlier one. The comparison exits non-zero when any
+benchmark is significantly slower, so it can gate a merge.
+
+Usage:
+    python -m benchmarks.micro [--filter planner] [--save] [--compare HEAD~1]
+"""
+
+import argparse
+import asyncio
+import logging
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ai_engine.core.config import settings
+from ai_engine.core.planner_service import PlannerService
+from ai_engine.db.database import apply_schema, check_db_connection, init_db
+from ai_engine.models.schemas import PlanRequest, PlanResponse, PriorityLevel, Task
+from ai_engine.utils.logging_config import StructuredFormatter
+
+from .harness import BASELINE_DIR, compare, load_baseline, measure, save_baseline
+
+GOAL_COUNTS = (1, 10, 50)
+
+Benchmarks = Dict[str, Callable[[], Any]]
+
+
+def _goals(count: int) -> List[str]:
+    """Distinct goals that do not merge into each other."""
+    return [f"Ship feature {n} for the launch" for n in range(count)]
+
+
+def planner_benchmarks(loop: asyncio.AbstractEventLoop) -> Benchmarks:
+    """Weekly and daily plans from the deterministic planner at each goal count."""
+    service = PlannerService()
+    # Measure the deterministic planner itself: no model, no memoized breakdowns.
+    service.backend = None
+    service.memo = None
+
+    cases: Benchmarks = {}
+    for count in GOAL_COUNTS:
+        goals = _goals(count)
+        cases[f"planner.weekly[goals={count}]"] = lambda goals=goals: loop.run_until_complete(
+            service.generate_weekly_plan("Quarterly launch", goals, ["Budget is limited"])
+        )
+        cases[f"planner.daily[goals={count}]"] = lambda goals=goals: loop.run_until_complete(
+            service.generate_daily_plan("Sprint work", goals, [])
+        )
+    return cases
+
+
+def schema_benchmarks() -> Benchmarks:
+    """Request validation and task and plan serialization."""
+    request = {
+        "context": "I need to prepare for a product launch",
+        "goals": _goals(10),
+        "constraints": ["Launch date is next Friday", "Budget is limited"],
+    }
+    now = datetime(2026, 1, 12, 9)
+    task_data = {
+        "id": 1,
+        "title": "Complete project documentation",
+        "description": "Write comprehensive docs for the API",
+        "priority": "high",
+        "status": "pending",
+        "estimated_hours": 4.0,
+        "due_date": (now + timedelta(days=2)).isoformat(),
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat(),
+    }
+    task = Task.model_validate(task_data)
+    plan = PlanResponse(
+        plan_id="plan_bench",
+        tasks=[
+            task.model_copy(update={"id": n, "priority": PriorityLevel.MEDIUM})
+            for n in range(1, 31)
+        ],
+        summary="Generated 30 tasks for weekly planning",
+        created_at=now,
+    )
+    return {
+        "schemas.plan_request.validate": lambda: PlanRequest.model_validate(request),
+        "schemas.task.validate": lambda: Task.model_validate(task_data),
+        "schemas.task.dump_json": task.model_dump_json,
+        "schemas.plan_response[tasks=30].dump_json": plan.model_dump_json,
+    }
+
+
+def logging_benchmarks() -> Benchmarks:
+    """Structured log formatting with and without extra fields and trace ids."""
+    formatter = StructuredFormatter(fmt="%(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+    plain = logging.LogRecord(
+        "ai_engine.api.planner", logging.INFO, __file__, 1, "Weekly plan requested", None, None
+    )
+    extra = logging.LogRecord(
+        "ai_engine.api.planner", logging.INFO, __file__, 1, "Plan %s stored", ("plan_1",), None
+    )
+    extra.extra = {"goals_count": 3, "tenant_id": "acme", "source": "deterministic"}
+    extra.trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    extra.span_id = "00f067aa0ba902b7"
+    return {
+        "logging.format": lambda: formatter.format(plain),
+        "logging.format[extra+trace]": lambda: formatter.format(extra),
+    }
+
+
+def db_benchmarks(directory: Path) -> Benchmarks:
+    """
+    Schema setup and health checks against a database in ``directory``.
+
+    Points DATABASE_PATH at the directory; ``run`` restores it afterwards.
+    """
+    settings.DATABASE_PATH = str(directory / "bench.db")
+    init_db()
+
+    def apply_to_empty() -> None:
+        conn = sqlite3.connect(":memory:")
+        apply_schema(conn)
+        conn.close()
+
+    return {
+        "db.init_db[existing]": init_db,
+        "db.apply_schema[empty]": apply_to_empty,
+        "db.check_db_connection": check_db_connection,
+    }
+
+
+def run(names: str, repeat: int, min_time: float) -> Dict[str, List[float]]:
+    """
+    Run every benchmark whose name contains ``names``.
+
+    Args:
+        names: Substring filter; empty runs everything
+        repeat: Samples per benchmark
+        min_time: Minimum seconds per sample
+
+    Returns:
+        Seconds per call for each sample, by benchmark name
+    """
+    logging.disable(logging.CRITICAL)  # time the code, not the log handlers
+    database_path = settings.DATABASE_PATH
+    loop = asyncio.new_event_loop()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cases = {
+                **planner_benchmarks(loop),
+                **schema_benchmarks(),
+                **logging_benchmarks(),
+                **db_benchmarks(Path(directory)),
+            }
+            selected = {name: fn for name, fn in cases.items() if names in name}
+            return measure(selected, repeat, min_time)
+    finally:
+        loop.close()
+        settings.DATABASE_PATH = database_path
+        logging.disable(logging.NOTSET)
+
+
+def _format_time(seconds: float) -> str:
+    """Format a duration with the largest unit that keeps it at least 1."""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.0f} ns"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmarks and optionally save or compare a baseline.
+
+    Args:
+        argv: Command-line arguments; defaults to sys.argv
+
+    Returns:
+        Exit status: 1 if a regression was found, else 0
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=20, help="Samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per sample")
+    parser.add_argument(
+        "--save", action="store_true", help="Save a baseline for the current commit"
+    )
+    parser.add_argument("--label", help="Save the baseline under this name instead of the commit")
+    parser.add_argument(
+        "--compare", metavar="REF", help="Baseline to compare with: path, label or git ref"
+    )
+    parser.add_argument("--alpha", type=float, default=0.01, help="Significance level")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10, help="Minimum median change to flag"
+    )
+    parser.add_argument("--dir", type=Path, default=BASELINE_DIR, help="Baseline directory")
+    args = parser.parse_args(argv)
+
+    samples = run(args.filter, args.repeat, args.min_time)
+    width = max(map(len, samples), default=0)
+    for name, values in samples.items():
+        ordered = sorted(values)
+        print(
+            f"{name:<{width}}  {_format_time(ordered[len(ordered) // 2])} median  "
+            f"{_format_time(ordered[0])} min"
+        )
+
+    if args.save or args.label:
+        print(f"\nSaved {save_baseline(samples, args.dir, args.label)}")
+
+    if not args.compare:
+        return 0
+
+    baseline = load_baseline(args.compare, args.dir)
+    print(f"\nCompared with {baseline['commit']} ({baseline['created_at']}):")
+    results = compare(samples, baseline["benchmarks"], args.alpha, args.threshold)
+    for result in results:
+        print(
+            f"{result.name:<{width}}  {result.change:+7.1%}  "
+            f"p={result.p_value:.4f}  {result.verdict}"
+        )
+    regressions = [result.name for result in results if result.verdict == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,11 +11,26 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "ai-engine"))
 
 from main import app
 
+from ai_engine.core.config import settings
+from ai_engine.core.goal_memo import goal_memo
+from ai_engine.db.sharding import shard_router
+
+
+@pytest.fixture(autouse=True)
+def empty_goal_memo():
+    """Start every test with an empty shared goal memo."""
+    goal_memo.clear()
+    yield
+    goal_memo.clear()
+
 
 @pytest.fixture
-def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+def client(tmp_path, monkeypatch):
+    """Create a test client for the FastAPI app backed by a temporary database."""
+    monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "client.db"))
+    shard_router.close()
+    yield TestClient(app)
+    shard_router.close()
 
 
 @pytest.fixture
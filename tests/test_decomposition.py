@@ -0,0 +1,159 @@
+"""Tests for per-goal decomposition, bounded fan-out and merge."""
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from ai_engine.core.config import settings
+from ai_engine.core.decomposition import fan_out, merge_subtasks, shutdown_process_pool
+from ai_engine.core.model_backend import ModelBackend
+from ai_engine.core.planner_service import PlannerService
+from ai_engine.core.resilience import CircuitBreaker, ResilientCaller
+from ai_engine.models.schemas import PlanSource, PriorityLevel, Task
+
+
+class TestFanOut:
+    """Tests for bounded concurrent expansion."""
+
+    def test_results_in_input_order_with_bounded_concurrency(self):
+        """Test at most `limit` calls run at once and results keep input order."""
+        running = 0
+        peak = 0
+
+        async def work(n):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01 * (5 - n % 5))
+            running -= 1
+            return n * 2
+
+        results = asyncio.run(fan_out(list(range(10)), work, limit=3))
+        assert results == [n * 2 for n in range(10)]
+        assert peak == 3
+
+    def test_failure_cancels_remaining(self):
+        """Test the first failure is raised and slower calls are cancelled."""
+        finished = []
+
+        async def work(n):
+            if n == 0:
+                raise ValueError("boom")
+            await asyncio.sleep(1)
+            finished.append(n)
+
+        with pytest.raises(ValueError):
+            asyncio.run(fan_out([0, 1, 2], work, limit=3))
+        assert finished == []
+
+
+class TestMergeSubtasks:
+    """Tests for deterministic merging."""
+
+    def test_duplicates_folded_and_ids_stable(self):
+        """Test overlapping subtasks merge into the first with combined attributes."""
+        now = datetime.utcnow()
+        per_goal = [
+            [
+                Task(
+                    title="Write the docs",
+                    priority=PriorityLevel.LOW,
+                    estimated_hours=1,
+                    due_date=now + timedelta(days=2),
+                ),
+                Task(title="Ship", estimated_hours=2),
+            ],
+            [
+                Task(
+                    title="write docs!",
+                    priority=PriorityLevel.HIGH,
+                    estimated_hours=3,
+                    due_date=now,
+                )
+            ],
+        ]
+
+        merged = merge_subtasks(per_goal)
+        assert [(task.id, task.title) for task in merged] == [(1, "Write the docs"), (2, "Ship")]
+        assert merged[0].priority == PriorityLevel.HIGH
+        assert merged[0].estimated_hours == 3
+        assert merged[0].due_date == now
+
+    def test_inputs_not_modified(self):
+        """Test merging copies tasks instead of mutating the inputs."""
+        task = Task(title="A", priority=PriorityLevel.LOW)
+        merge_subtasks([[task], [Task(title="A", priority=PriorityLevel.HIGH)]])
+        assert task.priority == PriorityLevel.LOW
+        assert task.id is None
+
+
+class TestParallelPlanning:
+    """Tests for concurrent per-goal planning in PlannerService."""
+
+    def test_weekly_goals_expand_into_subtasks(self):
+        """Test each weekly goal becomes plan, work and review subtasks."""
+        tasks = asyncio.run(PlannerService().generate_weekly_plan("ctx", ["Ship", "Hire"], []))
+        assert [task.title for task in tasks] == [
+            "Plan: Ship",
+            "Ship",
+            "Review: Ship",
+            "Plan: Hire",
+            "Hire",
+            "Review: Hire",
+        ]
+        assert [task.id for task in tasks] == [1, 2, 3, 4, 5, 6]
+        assert sum(task.estimated_hours for task in tasks[:3]) == 8.0
+
+    def test_weekly_due_dates_follow_subtask_order(self):
+        """Test each goal's subtasks stay in order and inside the week for more than 5 goals."""
+        goals = ["Ship", "Hire", "Audit", "Budget", "Launch", "Recruit", "Migrate", "Train"]
+        tasks = asyncio.run(PlannerService(memo=None).generate_weekly_plan("ctx", goals, []))
+        assert len(tasks) == 3 * len(goals)
+
+        start = tasks[0].due_date
+        for offset in range(0, len(tasks), 3):
+            plan, work, review = tasks[offset : offset + 3]
+            assert plan.due_date <= work.due_date <= review.due_date
+            assert review.due_date - start <= timedelta(days=6)
+
+    def test_duplicate_goals_merged(self):
+        """Test near-identical goals in one plan do not produce duplicate tasks."""
+        tasks = asyncio.run(
+            PlannerService().generate_weekly_plan("ctx", ["Write docs", "Write the docs"], [])
+        )
+        assert len(tasks) == 3
+
+    def test_model_calls_run_per_goal_in_parallel(self):
+        """Test a 10-goal plan takes about as long as one goal's model call."""
+
+        class SlowBackend(ModelBackend):
+            async def stream(self, prompt):
+                await asyncio.sleep(0.2)
+                goal = prompt.split("- ", 1)[1].split("\n", 1)[0]
+                yield json.dumps([{"title": goal}, {"title": "Sync with team"}])
+
+        service = PlannerService(
+            backend=SlowBackend(),
+            caller=ResilientCaller(CircuitBreaker(), deadline=5, hedge_enabled=False),
+        )
+        goals = [f"Goal {n}" for n in range(10)]
+
+        started = time.perf_counter()
+        plan = asyncio.run(service.plan("weekly", "ctx", goals, []))
+        elapsed = time.perf_counter() - started
+
+        assert plan.source == PlanSource.MODEL
+        assert elapsed < 1.0
+        assert [task.title for task in plan.tasks] == ["Goal 0", "Sync with team"] + goals[1:]
+
+    def test_process_pool_decomposition(self, monkeypatch):
+        """Test the scheduler pass gives the same plan when run in worker processes."""
+        monkeypatch.setattr(settings, "DECOMPOSE_PROCESSES", 2)
+        try:
+            tasks = asyncio.run(PlannerService(memo=None).generate_weekly_plan("ctx", ["Ship"], []))
+        finally:
+            shutdown_process_pool()
+        assert [task.title for task in tasks] == ["Plan: Ship", "Ship", "Review: Ship"]
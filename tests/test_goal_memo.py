@@ -0,0 +1,150 @@
+"""Tests for similarity-based goal memoization."""
+
+import asyncio
+import json
+
+import pytest
+
+from ai_engine.core.goal_memo import GoalMemo, normalize_goal
+from ai_engine.core.model_backend import ModelBackend
+from ai_engine.core.planner_service import PlannerService
+from ai_engine.core.resilience import CircuitBreaker, ResilientCaller
+from ai_engine.models.schemas import PlanSource
+
+
+class TestNormalizeGoal:
+    """Tests for goal normalization."""
+
+    def test_variants_fold_to_same_text(self):
+        """Test that common abbreviations normalize identically."""
+        assert normalize_goal("Setup infrastructure") == normalize_goal("Set up infra")
+
+    def test_punctuation_and_stopwords_removed(self):
+        """Test that punctuation and stopwords are dropped."""
+        assert normalize_goal("Write the docs!") == "write documentation"
+
+
+class TestGoalMemo:
+    """Tests for the MinHash/LSH goal memo."""
+
+    @pytest.fixture
+    def memo(self):
+        """Fresh memo instance."""
+        return GoalMemo(threshold=0.6)
+
+    def test_exact_hit_after_normalization(self, memo):
+        """Test reworded goals hit the stored breakdown exactly."""
+        memo.store("Setup infrastructure", "breakdown", namespace="weekly")
+        hit = memo.lookup("Set up infra", namespace="weekly")
+        assert hit is not None
+        assert hit.exact
+        assert hit.value == "breakdown"
+
+    def test_near_duplicate_hit(self, memo):
+        """Test near-duplicate goals are found through LSH."""
+        memo.store("Complete marketing materials", "breakdown", namespace="weekly")
+        hit = memo.lookup("Complete the marketing material", namespace="weekly")
+        assert hit is not None
+        assert not hit.exact
+        assert hit.similarity >= 0.6
+
+    def test_unrelated_goal_misses(self, memo):
+        """Test unrelated goals do not match."""
+        memo.store("Complete marketing materials", "breakdown", namespace="weekly")
+        assert memo.lookup("Train support team", namespace="weekly") is None
+
+    def test_namespaces_are_isolated(self, memo):
+        """Test weekly breakdowns are not reused for daily plans."""
+        memo.store("Train support team", "weekly", namespace="weekly")
+        assert memo.lookup("Train support team", namespace="daily") is None
+
+    def test_lru_eviction(self):
+        """Test that the oldest entry is evicted past max_entries."""
+        memo = GoalMemo(max_entries=2)
+        memo.store("Goal alpha", 1)
+        memo.store("Goal beta", 2)
+        memo.store("Goal gamma", 3)
+        assert memo.stats()["entries"] == 2
+        assert memo.lookup("Goal alpha") is None
+
+    def test_buckets_are_capped(self):
+        """Test crowded LSH buckets keep only their newest entries."""
+        memo = GoalMemo(bucket_size=4)
+        for n in range(50):
+            memo.store(f"Prepare the quarterly report batch {n}", n)
+        sizes = [
+            1 if isinstance(bucket, int) else len(bucket)
+            for buckets in memo._buckets
+            for bucket in buckets.values()
+        ]
+        assert max(sizes) <= 4
+
+        hit = memo.lookup("Prepare quarterly report batch 49")
+        assert hit is not None
+        assert hit.value == 49
+        assert memo.lookup("Prepare the quarterly report batch 3").exact
+
+        memo.max_entries = 10
+        memo.store("Prepare the quarterly report batch 50", 50)
+        assert memo.stats()["entries"] == 10
+        assert all(
+            entry_id in memo._entries
+            for buckets in memo._buckets
+            for bucket in buckets.values()
+            for entry_id in ([bucket] if isinstance(bucket, int) else bucket)
+        )
+
+    def test_stats_report_hit_rate(self, memo):
+        """Test hit-rate and savings accounting."""
+        memo.store("Train support team", "breakdown", cost_seconds=0.5)
+        memo.lookup("Train support team")
+        memo.lookup("Unrelated goal entirely")
+        stats = memo.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["saved_generation_seconds"] == 0.5
+
+
+class TestPlannerServiceMemo:
+    """Tests for memo reuse in PlannerService."""
+
+    def test_reused_breakdown_uses_new_goal_text(self):
+        """Test memo hits keep the caller's wording."""
+        service = PlannerService(memo=GoalMemo())
+        asyncio.run(service.generate_weekly_plan("ctx", ["Setup infrastructure"], []))
+        tasks = asyncio.run(service.generate_weekly_plan("ctx", ["Set up infra"], []))
+
+        assert [task.title for task in tasks] == [
+            "Plan: Set up infra",
+            "Set up infra",
+            "Review: Set up infra",
+        ]
+        assert service.memo.stats()["hits"] == 1
+
+    def test_model_breakdown_reused(self):
+        """Test a near-duplicate goal reuses the model's tasks without calling the model."""
+
+        class CountingBackend(ModelBackend):
+            calls = 0
+
+            async def stream(self, prompt):
+                self.calls += 1
+                await asyncio.sleep(0.01)
+                yield json.dumps([{"title": "Draft launch checklist", "estimated_hours": 2}])
+
+        backend = CountingBackend()
+        service = PlannerService(
+            memo=GoalMemo(),
+            backend=backend,
+            caller=ResilientCaller(CircuitBreaker(), deadline=5, hedge_enabled=False),
+        )
+        first = asyncio.run(service.plan("weekly", "ctx", ["Prepare the product launch"], []))
+        second = asyncio.run(service.plan("weekly", "ctx", ["Prepare product launch"], []))
+
+        assert backend.calls == 1
+        assert second.source == PlanSource.MODEL
+        assert [task.title for task in second.tasks] == [task.title for task in first.tasks]
+        stats = service.memo.stats()
+        assert stats["hits"] == 1
+        assert stats["saved_generation_seconds"] >= 0.01
@@ -0,0 +1,180 @@
+"""Tests for Idempotency-Key handling on plan creation."""
+
+import asyncio
+
+import pytest
+from fastapi import Response, status
+
+from ai_engine.core.config import settings
+from ai_engine.core.idempotency import IdempotencyStore, idempotency_store
+from ai_engine.db.sharding import ShardRouter
+from ai_engine.utils.error_handler import IdempotencyError
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Idempotency store backed by a temporary database."""
+    monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "main.db"))
+    router = ShardRouter(mode="single")
+    yield IdempotencyStore(router)
+    router.close()
+
+
+class TestIdempotencyStore:
+    """Tests for the idempotent execution coordinator."""
+
+    def test_retry_replays_without_running_handler(self, store):
+        """Test a retry returns the stored response."""
+        calls = []
+
+        async def handler():
+            calls.append(1)
+            return Response(content=b'{"n": 1}', status_code=status.HTTP_201_CREATED)
+
+        async def scenario():
+            first = await store.run("acme", "key-1", "fp", handler)
+            store.clear_cache()
+            second = await store.run("acme", "key-1", "fp", handler)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert len(calls) == 1
+        assert second.body == first.body
+        assert second.status_code == status.HTTP_201_CREATED
+        assert second.headers["Idempotent-Replayed"] == "true"
+
+    def test_concurrent_duplicates_wait_for_first(self, store):
+        """Test concurrent requests with one key run the handler once."""
+        calls = []
+
+        async def handler():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return Response(content=b"{}", status_code=status.HTTP_201_CREATED)
+
+        async def scenario():
+            return await asyncio.gather(
+                *(store.run("acme", "key-1", "fp", handler) for _ in range(5))
+            )
+
+        responses = asyncio.run(scenario())
+        assert len(calls) == 1
+        assert all(response.body == b"{}" for response in responses)
+
+    def test_key_reuse_with_different_request_rejected(self, store):
+        """Test a different request body cannot reuse a key."""
+
+        async def handler():
+            return Response(content=b"{}", status_code=status.HTTP_201_CREATED)
+
+        async def scenario():
+            await store.run("acme", "key-1", "fp-1", handler)
+            await store.run("acme", "key-1", "fp-2", handler)
+
+        with pytest.raises(IdempotencyError) as exc_info:
+            asyncio.run(scenario())
+        assert exc_info.value.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_failed_request_releases_key(self, store):
+        """Test a failed first attempt lets the retry run."""
+        attempts = []
+
+        async def handler():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("backend down")
+            return Response(content=b"{}", status_code=status.HTTP_201_CREATED)
+
+        async def scenario():
+            with pytest.raises(RuntimeError):
+                await store.run("acme", "key-1", "fp", handler)
+            return await store.run("acme", "key-1", "fp", handler)
+
+        response = asyncio.run(scenario())
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(attempts) == 2
+
+    def test_expired_key_runs_again(self, store):
+        """Test keys past their TTL no longer replay."""
+        store.ttl_seconds = 0
+        calls = []
+
+        async def handler():
+            calls.append(1)
+            return Response(content=b"{}", status_code=status.HTTP_201_CREATED)
+
+        async def scenario():
+            await store.run("acme", "key-1", "fp", handler)
+            await store.run("acme", "key-1", "fp", handler)
+
+        asyncio.run(scenario())
+        assert len(calls) == 2
+
+    def test_stale_claim_taken_over(self, store):
+        """Test a key left in progress by a crashed worker is retried once its lease ends."""
+        crashed = IdempotencyStore(store.router, lease_seconds=0.2)
+        assert crashed._claim("acme", "key-1", "fp") is None  # owner dies before finishing
+        store.wait_timeout = 0.05
+        calls = []
+
+        async def handler():
+            calls.append(1)
+            return Response(content=b"{}", status_code=status.HTTP_201_CREATED)
+
+        with pytest.raises(IdempotencyError) as exc_info:
+            asyncio.run(store.run("acme", "key-1", "fp", handler))
+        assert exc_info.value.status_code == status.HTTP_409_CONFLICT
+
+        store.wait_timeout = 1.0
+        response = asyncio.run(store.run("acme", "key-1", "fp", handler))
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(calls) == 1
+
+    def test_running_owner_keeps_its_lease(self, store):
+        """Test a handler running past the lease is not taken over by another worker."""
+        owner = IdempotencyStore(store.router, lease_seconds=0.15)
+        other = IdempotencyStore(store.router, lease_seconds=0.15, wait_timeout=2.0)
+        calls = []
+
+        async def handler():
+            calls.append(1)
+            await asyncio.sleep(0.5)
+            return Response(content=b'{"n": 1}', status_code=status.HTTP_201_CREATED)
+
+        async def scenario():
+            first = asyncio.create_task(owner.run("acme", "key-1", "fp", handler))
+            await asyncio.sleep(0.05)
+            second = await other.run("acme", "key-1", "fp", handler)
+            return await first, second
+
+        first, second = asyncio.run(scenario())
+        assert len(calls) == 1
+        assert second.body == first.body
+
+
+class TestIdempotentPlanEndpoints:
+    """Tests for Idempotency-Key on the planning endpoints."""
+
+    def test_retry_returns_same_plan(self, client, tmp_path, monkeypatch):
+        """Test retries with the same key return the original plan id."""
+        monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "main.db"))
+        idempotency_store.clear_cache()
+        payload = {"context": "Launch", "goals": ["Write docs"]}
+        headers = {"Idempotency-Key": "retry-1"}
+
+        first = client.post("/plan/week", json=payload, headers=headers)
+        second = client.post("/plan/week", json=payload, headers=headers)
+
+        assert second.status_code == status.HTTP_201_CREATED
+        assert second.json()["plan_id"] == first.json()["plan_id"]
+
+    def test_key_reuse_across_endpoints_rejected(self, client, tmp_path, monkeypatch):
+        """Test a key used for a weekly plan cannot create a daily plan."""
+        monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "main.db"))
+        payload = {"context": "Launch", "goals": ["Write docs"]}
+        headers = {"Idempotency-Key": "retry-2"}
+
+        client.post("/plan/week", json=payload, headers=headers)
+        response = client.post("/plan/today", json=payload, headers=headers)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
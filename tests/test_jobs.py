@@ -0,0 +1,197 @@
+"""Tests for the durable job queue and async planning."""
+
+import asyncio
+
+import pytest
+from fastapi import status
+
+from ai_engine.core.config import settings
+from ai_engine.core.jobs import JobWorkerPool, job_queue, job_workers
+from ai_engine.db.job_queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+from ai_engine.db.sharding import ShardRouter
+from ai_engine.utils.error_handler import DatabaseError
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    """Job queue backed by a temporary database."""
+    monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "main.db"))
+    router = ShardRouter(mode="single")
+    yield JobQueue(router, lease_seconds=60, max_attempts=2, retry_backoff=0)
+    router.close()
+
+
+class TestJobQueue:
+    """Tests for enqueueing, leasing and retries."""
+
+    def test_lease_and_complete(self, queue):
+        """Test a leased job can be completed with a result."""
+        job_id = queue.enqueue("acme", "plan", {"n": 1})
+        [job] = queue.lease("worker", 10)
+        assert job.job_id == job_id
+        assert job.payload == {"n": 1}
+        assert queue.lease("worker", 10) == []
+
+        queue.complete(job, "worker", {"ok": True})
+        stored = queue.get(job_id)
+        assert stored["status"] == SUCCEEDED
+        assert stored["result"] == {"ok": True}
+
+    def test_failed_job_retried_then_failed(self, queue):
+        """Test failures are retried until max_attempts."""
+        job_id = queue.enqueue("acme", "plan", {})
+
+        [job] = queue.lease("worker", 1)
+        assert queue.fail(job, "worker", "boom")
+        assert queue.get(job_id)["status"] == QUEUED
+
+        [job] = queue.lease("worker", 1)
+        assert not queue.fail(job, "worker", "boom again")
+        stored = queue.get(job_id)
+        assert stored["status"] == FAILED
+        assert stored["error"] == "boom again"
+
+    def test_expired_lease_requeued(self, queue):
+        """Test jobs leased by a dead worker return to the queue."""
+        queue.lease_seconds = 0
+        job_id = queue.enqueue("acme", "plan", {})
+        queue.lease("dead-worker", 1)
+
+        assert queue.requeue_expired() == 1
+        assert queue.get(job_id)["status"] == QUEUED
+
+    def test_jobs_survive_new_queue_instance(self, queue):
+        """Test queued jobs are durable across queue instances."""
+        job_id = queue.enqueue("acme", "plan", {})
+        restarted = JobQueue(ShardRouter(mode="single"))
+        [job] = restarted.lease("worker", 1)
+        assert job.job_id == job_id
+
+
+class TestJobWorkerPool:
+    """Tests for the in-process worker pool."""
+
+    def test_workers_run_queued_jobs(self, queue):
+        """Test workers execute jobs and store their results."""
+        pool = JobWorkerPool(queue, workers=2, poll_interval=0.01)
+
+        async def double(tenant_id, payload):
+            return {"value": payload["value"] * 2}
+
+        pool.register("double", double)
+
+        async def scenario():
+            job_ids = [queue.enqueue("acme", "double", {"value": i}) for i in range(5)]
+            await pool.start()
+            for _ in range(200):
+                if all(queue.get(job_id)["status"] == SUCCEEDED for job_id in job_ids):
+                    break
+                await asyncio.sleep(0.01)
+            await pool.stop()
+            return job_ids
+
+        job_ids = asyncio.run(scenario())
+        assert [queue.get(job_id)["result"]["value"] for job_id in job_ids] == [0, 2, 4, 6, 8]
+
+    def test_long_jobs_run_once(self, queue):
+        """Test jobs outliving their lease are renewed and waiting jobs stay queued."""
+        queue.lease_seconds = 0.3
+        pool = JobWorkerPool(queue, workers=1, poll_interval=0.01)
+        runs = []
+        queued_while_running = []
+
+        async def slow(tenant_id, payload):
+            runs.append(payload["n"])
+            await asyncio.sleep(0.05)
+            queued_while_running.append(
+                sum(queue.get(job_id)["status"] == QUEUED for job_id in job_ids)
+            )
+            await asyncio.sleep(0.55)
+            return {}
+
+        pool.register("slow", slow)
+        job_ids = [queue.enqueue("acme", "slow", {"n": n}) for n in range(2)]
+
+        async def scenario():
+            await pool.start()
+            for _ in range(300):
+                if all(queue.get(job_id)["status"] == SUCCEEDED for job_id in job_ids):
+                    break
+                await asyncio.sleep(0.01)
+            await pool.stop()
+
+        asyncio.run(scenario())
+        assert runs == [0, 1]
+        assert queued_while_running == [1, 0]
+        assert [queue.get(job_id)["attempts"] for job_id in job_ids] == [1, 1]
+
+    def test_worker_survives_failed_complete(self, queue, monkeypatch):
+        """Test a database error while recording a result does not stop the worker."""
+        pool = JobWorkerPool(queue, workers=1, poll_interval=0.01)
+        complete = queue.complete
+        failures = [DatabaseError("database is locked")]
+
+        def flaky_complete(job, owner, result):
+            if failures:
+                raise failures.pop()
+            return complete(job, owner, result)
+
+        async def echo(tenant_id, payload):
+            return payload
+
+        monkeypatch.setattr(queue, "complete", flaky_complete)
+        pool.register("echo", echo)
+        first, second = (queue.enqueue("acme", "echo", {"n": n}) for n in range(2))
+
+        async def scenario():
+            await pool.start()
+            for _ in range(200):
+                if queue.get(second)["status"] == SUCCEEDED:
+                    break
+                await asyncio.sleep(0.01)
+            await pool.stop()
+
+        asyncio.run(scenario())
+        assert queue.get(first)["status"] == RUNNING
+        assert queue.get(second)["status"] == SUCCEEDED
+
+
+class TestAsyncPlanEndpoints:
+    """Tests for ?async=true planning and job status."""
+
+    def test_async_plan_returns_job(self, client, tmp_path, monkeypatch):
+        """Test async planning returns 202 and a pollable job."""
+        monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "main.db"))
+        response = client.post(
+            "/plan/week?async=true",
+            json={"context": "Launch", "goals": ["Write docs"]},
+            headers={"X-Tenant-ID": "acme"},
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job_id = response.json()["job_id"]
+
+        job = client.get(f"/jobs/{job_id}", headers={"X-Tenant-ID": "acme"})
+        assert job.status_code == status.HTTP_200_OK
+        assert job.json()["status"] == "queued"
+
+        other = client.get(f"/jobs/{job_id}", headers={"X-Tenant-ID": "other"})
+        assert other.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_async_job_produces_plan(self, client, tmp_path, monkeypatch):
+        """Test a worker turns the queued request into a stored plan."""
+        monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "main.db"))
+        job_id = client.post(
+            "/plan/today?async=true",
+            json={"context": "Sprint", "goals": ["Fix bugs"]},
+        ).json()["job_id"]
+
+        async def run_one():
+            [job] = job_queue.lease(job_workers.owner, 1)
+            await job_workers.run_job(job)
+
+        asyncio.run(run_one())
+
+        job = client.get(f"/jobs/{job_id}").json()
+        assert job["status"] == "succeeded"
+        plan_id = job["result"]["plan_id"]
+        assert client.get(f"/plan/{plan_id}").status_code == status.HTTP_200_OK
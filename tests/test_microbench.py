@@ -0,0 +1,72 @@
+"""Tests for the microbenchmark runner and regression detection."""
+
+import json
+import random
+
+from benchmarks.harness import compare, load_baseline, mann_whitney_greater, save_baseline
+from benchmarks.micro import main, run
+
+
+def _samples(center: float, seed: int, count: int = 20):
+    rng = random.Random(seed)
+    return [center * rng.uniform(0.97, 1.03) for _ in range(count)]
+
+
+class TestRegressionDetection:
+    """Tests for the rank test and verdicts."""
+
+    def test_rank_test(self):
+        """Test a clear shift is significant and identical samples are not."""
+        low, high = _samples(1.0, 1), _samples(1.2, 2)
+        assert mann_whitney_greater(high, low) < 0.001
+        assert mann_whitney_greater(low, high) > 0.99
+        assert mann_whitney_greater(low, low) > 0.4
+
+    def test_verdicts(self):
+        """Test slowdowns past the threshold are regressions and noise is not."""
+        baseline = {"slow": _samples(1.0, 1), "fast": _samples(1.0, 2), "noise": _samples(1.0, 3)}
+        current = {
+            "slow": _samples(1.25, 4),
+            "fast": _samples(0.7, 5),
+            "noise": _samples(1.01, 6),
+            "new": _samples(1.0, 7),
+        }
+        verdicts = {result.name: result.verdict for result in compare(current, baseline)}
+        assert verdicts == {"fast": "improvement", "noise": "unchanged", "slow": "regression"}
+
+    def test_small_significant_change_is_not_flagged(self):
+        """Test a consistent shift below the threshold is reported as unchanged."""
+        baseline = {"a": [1.0 + n * 1e-4 for n in range(20)]}
+        current = {"a": [1.03 + n * 1e-4 for n in range(20)]}
+        assert compare(current, baseline)[0].verdict == "unchanged"
+        assert compare(current, baseline, threshold=0.01)[0].verdict == "regression"
+
+
+class TestRunner:
+    """Tests for running, saving and comparing baselines."""
+
+    def test_run_selects_benchmarks(self):
+        """Test the filter limits the run and every sample is a positive time."""
+        samples = run("schemas.task", repeat=3, min_time=0.001)
+        assert set(samples) == {"schemas.task.validate", "schemas.task.dump_json"}
+        assert all(len(values) == 3 and min(values) > 0 for values in samples.values())
+
+    def test_save_and_load(self, tmp_path):
+        """Test a saved baseline can be loaded by label and by path."""
+        path = save_baseline({"a": [1.0, 2.0]}, tmp_path, label="main")
+        assert load_baseline("main", tmp_path)["benchmarks"] == {"a": [1.0, 2.0]}
+        assert load_baseline(str(path), tmp_path)["commit"]
+
+    def test_compare_exit_code(self, tmp_path):
+        """Test the CLI fails when the baseline was much faster."""
+        args = ["--filter", "logging.format[", "--repeat", "8", "--min-time", "0.001"]
+        args += ["--dir", str(tmp_path)]
+        assert main(args + ["--label", "current"]) == 0
+
+        stored = json.loads((tmp_path / "current.json").read_text())
+        stored["benchmarks"] = {
+            name: [value / 10 for value in values] for name, values in stored["benchmarks"].items()
+        }
+        (tmp_path / "fast.json").write_text(json.dumps(stored))
+        assert main(args + ["--compare", "fast"]) == 1
+        assert main(args + ["--compare", "current", "--threshold", "10"]) == 0
@@ -0,0 +1,91 @@
+"""Tests for on-demand profiling hooks."""
+
+import threading
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+
+from ai_engine.api import admin
+from ai_engine.core.config import settings
+from ai_engine.utils.profiling import RequestProfiler, StackSampler, stop_tracemalloc
+
+
+class TestRequestProfiler:
+    """Tests for sampled per-request cProfile capture."""
+
+    def test_disabled_by_default(self):
+        """Test no requests are profiled until configured."""
+        profiler = RequestProfiler()
+        assert not profiler.should_profile("/plan/week")
+
+    def test_capture_round_trip(self):
+        """Test a capture is recorded and retrievable."""
+        profiler = RequestProfiler()
+        profiler.configure(1.0)
+        assert profiler.should_profile("/plan/week")
+        assert not profiler.should_profile("/health")
+
+        profile = profiler.start()
+        sum(range(1000))
+        profiler.stop(profile, "/plan/week", 1.0)
+
+        capture = profiler.captures[0]
+        assert profiler.get(capture.capture_id) is capture
+        assert capture.raw
+
+    def test_one_capture_at_a_time(self):
+        """Test a second concurrent capture is refused."""
+        profiler = RequestProfiler()
+        profile = profiler.start()
+        assert profiler.start() is None
+        profiler.stop(profile, "/plan/week", 1.0)
+
+
+class TestStackSampler:
+    """Tests for the statistical stack sampler."""
+
+    def test_collapsed_output(self):
+        """Test sampled stacks are rendered in collapsed format."""
+        stop = threading.Event()
+        worker = threading.Thread(target=stop.wait)
+        worker.start()
+        try:
+            collapsed = StackSampler(interval=0.001).run(0.05)
+        finally:
+            stop.set()
+            worker.join()
+
+        line = collapsed.splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert ";" in stack
+
+
+class TestAdminProfilingApi:
+    """Tests for the admin profiling endpoints."""
+
+    @pytest.fixture
+    def admin_client(self, monkeypatch):
+        """Client for an app with the admin router mounted."""
+        monkeypatch.setattr(settings, "PROFILING_ADMIN_TOKEN", "secret")
+        app = FastAPI()
+        app.include_router(admin.router, prefix="/admin/profiling")
+        yield TestClient(app)
+        stop_tracemalloc()
+
+    def test_requires_admin_token(self, admin_client):
+        """Test requests without the token are rejected."""
+        response = admin_client.get("/admin/profiling")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_tracemalloc_snapshot(self, admin_client):
+        """Test tracemalloc can be started and queried."""
+        headers = {"X-Admin-Token": "secret"}
+        admin_client.post("/admin/profiling/tracemalloc/start", headers=headers)
+        data = [bytearray(1024) for _ in range(10)]
+
+        response = admin_client.get("/admin/profiling/tracemalloc/snapshot", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["sites"]
+        assert data
@@ -0,0 +1,161 @@
+"""Tests for the pub/sub hub and the WebSocket feeds."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from ai_engine.core.config import settings
+from ai_engine.core.pubsub import SLOW_CONSUMER, PubSubHub, plan_topic, tenant_topic
+from ai_engine.db.sharding import shard_router
+from ai_engine.main import app
+from ai_engine.models.schemas import PlanEvent, PlanEventType, Task
+
+
+class TestPubSubHub:
+    """Tests for in-process fan-out."""
+
+    def test_messages_delivered_in_order(self):
+        """Test every subscriber of a topic gets its messages in publish order."""
+
+        async def scenario():
+            hub = PubSubHub(buffer_size=10)
+            first, second = hub.subscribe("t"), hub.subscribe("t")
+            other = hub.subscribe("u")
+            assert hub.publish("t", "a") == 2
+            hub.publish("t", "b")
+            return [await first.get(), await first.get(), await second.get()], other.pending
+
+        received, other_pending = asyncio.run(scenario())
+        assert received == ["a", "b", "a"]
+        assert other_pending == 0
+
+    def test_waiting_reader_woken_by_publish(self):
+        """Test a reader blocked in get() receives a later publish."""
+
+        async def scenario():
+            hub = PubSubHub()
+            subscription = hub.subscribe("t")
+            reader = asyncio.ensure_future(subscription.get())
+            await asyncio.sleep(0)
+            hub.publish("t", "hello")
+            return await asyncio.wait_for(reader, 1)
+
+        assert asyncio.run(scenario()) == "hello"
+
+    def test_slow_consumer_dropped(self):
+        """Test a full buffer drops only that subscriber."""
+
+        async def scenario():
+            hub = PubSubHub(buffer_size=2)
+            slow, fast = hub.subscribe("t"), hub.subscribe("t")
+            for n in range(3):
+                hub.publish("t", str(n))
+                await fast.get()
+            return hub, slow, fast
+
+        hub, slow, fast = asyncio.run(scenario())
+        assert slow.reason == SLOW_CONSUMER
+        assert not fast.closed
+        assert hub.subscribers == 1
+        assert hub.stats()["dropped"] == 1
+
+    def test_closed_subscription_returns_none(self):
+        """Test readers see None once the hub closes."""
+
+        async def scenario():
+            hub = PubSubHub()
+            subscription = hub.subscribe("t")
+            reader = asyncio.ensure_future(subscription.get())
+            await asyncio.sleep(0)
+            hub.close()
+            return await asyncio.wait_for(reader, 1), hub.subscribers
+
+        assert asyncio.run(scenario()) == (None, 0)
+
+    def test_subscriber_limit(self):
+        """Test subscribe refuses once max_subscribers are open."""
+        hub = PubSubHub(max_subscribers=1)
+        first = hub.subscribe("t")
+        assert hub.subscribe("t") is None
+        hub.unsubscribe(first)
+        assert hub.subscribe("t") is not None
+
+    def test_event_published_to_plan_and_tenant_topics(self):
+        """Test plan events reach both the plan topic and the tenant feed."""
+        hub = PubSubHub()
+        by_plan = hub.subscribe(plan_topic("acme", "p1"))
+        by_tenant = hub.subscribe(tenant_topic("acme"))
+        other_tenant = hub.subscribe(tenant_topic("globex"))
+
+        event = PlanEvent(type=PlanEventType.TASK_UPDATED, plan_id="p1", tasks=[Task(title="A")])
+        assert hub.publish_event("acme", event) == 2
+        assert (by_plan.pending, by_tenant.pending, other_tenant.pending) == (1, 1, 0)
+        assert hub.publish_event("initech", event) == 0
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "ws.db"))
+    monkeypatch.setattr(settings, "JOB_WORKERS", 0)
+    shard_router.close()
+    with TestClient(app) as client:
+        yield client
+    shard_router.close()
+
+
+class TestWebSocketFeeds:
+    """Tests for /ws/plans/{plan_id} and /ws/tenant."""
+
+    def test_plan_feed_pushes_status_changes(self, client):
+        """Test a task PATCH is pushed to the plan's subscribers."""
+        plan = client.post("/plan/today", json={"context": "ctx", "goals": ["Ship"]}).json()
+
+        with client.websocket_connect(f"/ws/plans/{plan['plan_id']}") as websocket:
+            response = client.patch(
+                f"/plan/{plan['plan_id']}/tasks/1", json={"status": "completed"}
+            )
+            assert response.status_code == 200
+            event = websocket.receive_json()
+
+        assert event["type"] == "task_updated"
+        assert event["plan_id"] == plan["plan_id"]
+        assert [(task["id"], task["status"]) for task in event["tasks"]] == [(1, "completed")]
+
+    def test_tenant_feed_pushes_new_tasks(self, client):
+        """Test generated plans reach the tenant feed and not other tenants."""
+        with client.websocket_connect("/ws/tenant", headers={"X-Tenant-ID": "acme"}) as acme:
+            with client.websocket_connect(
+                "/ws/tenant", headers={"X-Tenant-ID": "globex"}
+            ) as globex:
+                client.post(
+                    "/plan/today",
+                    json={"context": "ctx", "goals": ["Ship"]},
+                    headers={"X-Tenant-ID": "globex"},
+                )
+                created = client.post(
+                    "/plan/today",
+                    json={"context": "ctx", "goals": ["Hire"]},
+                    headers={"X-Tenant-ID": "acme"},
+                ).json()
+                event = acme.receive_json()
+                assert globex.receive_json()["tasks"][0]["title"] == "Ship"
+
+        assert event["type"] == "tasks_created"
+        assert event["plan_id"] == created["plan_id"]
+        assert [task["title"] for task in event["tasks"]] == ["Hire"]
+
+    def test_unknown_plan_rejected(self, client):
+        """Test subscribing to a missing plan closes with a policy violation."""
+        with pytest.raises(WebSocketDisconnect) as excinfo:
+            with client.websocket_connect("/ws/plans/missing"):
+                pass
+        assert excinfo.value.code == 1008
+
+    def test_invalid_api_key_rejected(self, client):
+        """Test unknown API keys are refused during the handshake."""
+        with pytest.raises(WebSocketDisconnect) as excinfo:
+            with client.websocket_connect("/ws/tenant", headers={"X-API-Key": "nope"}):
+                pass
+        assert excinfo.value.code == 1008
@@ -0,0 +1,277 @@
+"""Tests for recurrence expansion, windowed materialization and recurring task APIs."""
+
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from ai_engine.core.config import settings
+from ai_engine.core.recurrence import occurrence_dates, resolve_rule
+from ai_engine.db.recurrences import list_occurrences, materialize_occurrences
+from ai_engine.db.repository import (
+    clear_task_recurrence,
+    get_plan,
+    save_plan,
+    set_task_recurrence,
+    update_occurrence_status,
+)
+from ai_engine.db.sharding import ShardRouter, shard_router
+from ai_engine.db.summaries import check_summaries, workload_by_day
+from ai_engine.main import app
+from ai_engine.models.schemas import (
+    PlanResponse,
+    PriorityLevel,
+    RecurrenceFrequency,
+    RecurrenceRule,
+    Task,
+    TaskStatus,
+)
+
+TODAY = date.today()
+DAILY = RecurrenceRule(frequency=RecurrenceFrequency.DAILY)
+
+
+def _brute_force(rule: RecurrenceRule, start: date, end: date):
+    """Expand a rule day by day from its start, as a reference."""
+    day, dates = rule.starts_on, []
+    while day <= end and (rule.until is None or day <= rule.until):
+        if rule.frequency == RecurrenceFrequency.DAILY:
+            hit = (day - rule.starts_on).days % rule.interval == 0
+        else:
+            week = (day - rule.starts_on + timedelta(days=rule.starts_on.weekday())).days // 7
+            hit = week % rule.interval == 0 and day.weekday() in rule.weekdays
+        if hit and day >= start:
+            dates.append(day)
+        day += timedelta(days=1)
+    return dates
+
+
+class TestOccurrenceDates:
+    """Tests for lazy rule expansion."""
+
+    def test_matches_day_by_day_expansion(self):
+        """Test windowed expansion agrees with expanding every day from the start."""
+        rng = random.Random(7)
+        for _ in range(300):
+            frequency = rng.choice(list(RecurrenceFrequency))
+            starts_on = date(2024, 1, 1) + timedelta(days=rng.randint(0, 400))
+            rule = RecurrenceRule(
+                frequency=frequency,
+                interval=rng.randint(1, 4),
+                weekdays=rng.sample(range(7), rng.randint(1, 3)) if frequency == "weekly" else None,
+                starts_on=starts_on,
+                until=(
+                    starts_on + timedelta(days=rng.randint(0, 500)) if rng.random() < 0.3 else None
+                ),
+            )
+            start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 700))
+            end = start + timedelta(days=rng.randint(0, 40))
+            assert list(occurrence_dates(rule, start, end)) == _brute_force(rule, start, end)
+
+    def test_old_rule_expands_only_the_window(self):
+        """Test a rule started a century ago yields just the window's dates."""
+        rule = RecurrenceRule(frequency="daily", interval=2, starts_on=date(1926, 1, 1))
+        start = date(2026, 3, 1)
+        dates = list(occurrence_dates(rule, start, start + timedelta(days=5)))
+        assert len(dates) == 3
+        assert all((day - date(1926, 1, 1)).days % 2 == 0 for day in dates)
+
+    def test_skip_and_defaults(self):
+        """Test weekly rules default to the start weekday and skip leaves out a date."""
+        due = datetime(2026, 1, 14, 9)  # Wednesday
+        rule = resolve_rule(RecurrenceRule(frequency="weekly"), due)
+        assert rule.starts_on == due.date()
+        assert rule.weekdays == [2]
+
+        dates = list(
+            occurrence_dates(rule, due.date(), due.date() + timedelta(days=14), skip=due.date())
+        )
+        assert dates == [date(2026, 1, 21), date(2026, 1, 28)]
+
+    def test_invalid_rules_rejected(self):
+        """Test weekdays and date range are validated."""
+        with pytest.raises(ValueError):
+            RecurrenceRule(frequency="weekly", weekdays=[7])
+        with pytest.raises(ValueError):
+            RecurrenceRule(frequency="daily", starts_on=TODAY, until=TODAY - timedelta(days=1))
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    """Single-file router backed by a temporary database."""
+    monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "main.db"))
+    monkeypatch.setattr(settings, "RECURRENCE_HORIZON_DAYS", 7)
+    router = ShardRouter(mode="single")
+    yield router
+    router.close()
+
+
+def _plan(recurrence=None) -> PlanResponse:
+    due = datetime.combine(TODAY, datetime.min.time())
+    return PlanResponse(
+        plan_id="plan_1",
+        tasks=[
+            Task(
+                id=1,
+                title="Inbox zero",
+                priority=PriorityLevel.HIGH,
+                estimated_hours=0.5,
+                due_date=due,
+                recurrence=recurrence,
+            )
+        ],
+        summary="One task",
+    )
+
+
+def _stored_days(conn):
+    rows = conn.execute("SELECT occurs_on FROM task_occurrences ORDER BY occurs_on").fetchall()
+    return [date.fromisoformat(row["occurs_on"]) for row in rows]
+
+
+class TestMaterialization:
+    """Tests for stored occurrences and their summaries."""
+
+    def test_save_plan_materializes_horizon(self, router):
+        """Test a recurring task stores occurrences for the horizon after its due date."""
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "daily", "ctx", _plan(DAILY))
+            assert _stored_days(conn) == [TODAY + timedelta(days=n) for n in range(1, 7)]
+
+            plan = get_plan(conn, "acme", "plan_1")
+            assert plan.tasks[0].recurrence.starts_on == TODAY
+
+            days = workload_by_day(conn, "acme", TODAY, TODAY + timedelta(days=6))
+            assert [row["task_count"] for row in days] == [1] * 7
+            assert check_summaries(conn) == []
+
+    def test_listing_merges_stored_and_lazy(self, router):
+        """Test listing past the horizon expands the remaining days lazily."""
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "daily", "ctx", _plan(DAILY))
+            end = TODAY + timedelta(days=30)
+            occurrences = list(list_occurrences(conn, "acme", TODAY, end))
+
+        assert [o.occurs_on for o in occurrences] == [
+            TODAY + timedelta(days=n) for n in range(1, 31)
+        ]
+        assert {o.title for o in occurrences} == {"Inbox zero"}
+
+    def test_rolling_forward_prunes_and_extends(self, router):
+        """Test the materialization job keeps only the current horizon."""
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "daily", "ctx", _plan(DAILY))
+            later = TODAY + timedelta(days=3)
+            update_occurrence_status(
+                conn, "acme", "plan_1", 1, TODAY + timedelta(days=1), TaskStatus.COMPLETED
+            )
+
+            counts = materialize_occurrences(conn, 7, tenant_id="acme", today=later)
+            assert counts == {"inserted": 3, "pruned": 1}
+            assert _stored_days(conn) == [TODAY + timedelta(days=1)] + [
+                later + timedelta(days=n) for n in range(7)
+            ]
+            assert check_summaries(conn) == []
+
+    def test_occurrence_status_changes(self, router):
+        """Test completed occurrences leave the workload, including beyond the horizon."""
+        far = TODAY + timedelta(days=40)
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "daily", "ctx", _plan(DAILY))
+            tomorrow = TODAY + timedelta(days=1)
+            update_occurrence_status(conn, "acme", "plan_1", 1, tomorrow, TaskStatus.COMPLETED)
+            update_occurrence_status(conn, "acme", "plan_1", 1, far, TaskStatus.IN_PROGRESS)
+            assert (
+                update_occurrence_status(conn, "acme", "plan_1", 1, TODAY, TaskStatus.BLOCKED)
+                is None
+            )
+
+            assert workload_by_day(conn, "acme", tomorrow, tomorrow) == []
+            listed = list(list_occurrences(conn, "acme", far, far))
+            assert [(o.occurs_on, o.status) for o in listed] == [(far, TaskStatus.IN_PROGRESS)]
+            assert check_summaries(conn) == []
+
+    def test_replacing_and_clearing_rules(self, router):
+        """Test a new rule replaces stored occurrences and clearing removes them."""
+        weekly = RecurrenceRule(frequency="weekly", weekdays=[TODAY.weekday()])
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "daily", "ctx", _plan(DAILY))
+            task = set_task_recurrence(conn, "acme", "plan_1", 1, weekly)
+            assert task.recurrence.frequency == RecurrenceFrequency.WEEKLY
+            assert _stored_days(conn) == []  # next weekly occurrence is past the 7-day horizon
+
+            assert clear_task_recurrence(conn, "acme", "plan_1", 1)
+            assert not clear_task_recurrence(conn, "acme", "plan_1", 1)
+            assert list(list_occurrences(conn, "acme", TODAY, TODAY + timedelta(days=60))) == []
+            assert set_task_recurrence(conn, "acme", "plan_1", 99, DAILY) is None
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "api.db"))
+    monkeypatch.setattr(settings, "JOB_WORKERS", 0)
+    shard_router.close()
+    with TestClient(app) as client:
+        yield client
+    shard_router.close()
+
+
+class TestRecurrenceApi:
+    """Tests for the recurrence endpoints."""
+
+    def test_recurring_task_flow(self, client):
+        """Test setting a rule, listing, retrieving, stats and per-occurrence updates."""
+        plan = client.post("/plan/today", json={"context": "ctx", "goals": ["Inbox zero"]}).json()
+        plan_id = plan["plan_id"]
+        due = datetime.fromisoformat(plan["tasks"][0]["due_date"]).date()
+
+        response = client.put(f"/plan/{plan_id}/tasks/1/recurrence", json={"frequency": "daily"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["recurrence"]["starts_on"] == due.isoformat()
+
+        window = {"start": due.isoformat(), "end": (due + timedelta(days=59)).isoformat()}
+        listed = client.get("/plan/occurrences", params=window).json()["occurrences"]
+        assert len(listed) == 59
+        assert listed[0]["occurs_on"] == (due + timedelta(days=1)).isoformat()
+
+        stored = client.get(f"/plan/{plan_id}", params=window).json()
+        assert stored["tasks"][0]["recurrence"]["frequency"] == "daily"
+        assert len(stored["occurrences"]) == 59
+
+        stats = client.get("/stats/workload", params=window).json()
+        assert len(stats["days"]) == 60
+        assert all(day["total"]["task_count"] == 1 for day in stats["days"])
+
+        day = (due + timedelta(days=45)).isoformat()
+        response = client.patch(
+            f"/plan/{plan_id}/tasks/1/occurrences/{day}", json={"status": "completed"}
+        )
+        assert response.json()["status"] == "completed"
+        stats = client.get("/stats/workload", params=window).json()
+        assert day not in {entry["day"] for entry in stats["days"]}
+
+        assert client.delete(f"/plan/{plan_id}/tasks/1/recurrence").status_code == 204
+        assert client.get(f"/plan/{plan_id}").json()["occurrences"] == []
+
+    def test_not_found(self, client):
+        """Test missing tasks, rules and occurrences return 404."""
+        plan_id = client.post("/plan/today", json={"context": "ctx", "goals": ["A"]}).json()[
+            "plan_id"
+        ]
+
+        assert (
+            client.put("/plan/missing/tasks/1/recurrence", json={"frequency": "daily"}).status_code
+            == 404
+        )
+        assert client.delete(f"/plan/{plan_id}/tasks/1/recurrence").status_code == 404
+        response = client.patch(
+            f"/plan/{plan_id}/tasks/1/occurrences/{TODAY.isoformat()}", json={"status": "completed"}
+        )
+        assert response.status_code == 404
+
+    def test_invalid_window(self, client):
+        """Test reversed windows are rejected."""
+        params = {"start": TODAY.isoformat(), "end": (TODAY - timedelta(days=1)).isoformat()}
+        assert client.get("/plan/occurrences", params=params).status_code == 400
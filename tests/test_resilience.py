@@ -0,0 +1,248 @@
+"""Tests for hedged model calls, circuit breaking and deterministic fallback."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_engine.core.config import settings
+from ai_engine.core.model_backend import ModelBackend
+from ai_engine.core.planner_service import PlannerService
+from ai_engine.core.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    LatencyTracker,
+    ResilientCaller,
+)
+from ai_engine.db.sharding import shard_router
+from ai_engine.main import app
+from ai_engine.models.schemas import PlanSource
+from ai_engine.utils.error_handler import ModelBackendError
+
+MODEL_OUTPUT = json.dumps({"tasks": [{"title": "Model task", "priority": "high"}]})
+
+
+class FakeBackend(ModelBackend):
+    """Backend whose per-call delays and failures are scripted."""
+
+    def __init__(self, delays=(0.0,), fail=False):
+        self.delays = list(delays)
+        self.fail = fail
+        self.calls = 0
+
+    async def stream(self, prompt):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        if self.fail:
+            raise ModelBackendError("backend down")
+        for i in range(0, len(MODEL_OUTPUT), 8):
+            yield MODEL_OUTPUT[i : i + 8]
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _caller(**kwargs) -> ResilientCaller:
+    breaker = kwargs.pop("breaker", CircuitBreaker(window=4, min_calls=2, open_seconds=30))
+    return ResilientCaller(breaker, **kwargs)
+
+
+class TestCircuitBreaker:
+    """Tests for breaker state transitions."""
+
+    def test_opens_on_failures_and_probes_after_timeout(self):
+        """Test the breaker opens, half-opens after open_seconds and closes on success."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(window=4, min_calls=2, open_seconds=10, clock=clock)
+
+        breaker.allow()
+        breaker.record(False)
+        breaker.allow()
+        breaker.record(False)
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+        clock.now = 11
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()  # only one probe at a time
+
+        breaker.record(True, 0.1)
+        assert breaker.state == CLOSED
+
+    def test_slow_calls_count_as_failures(self):
+        """Test calls over the latency threshold trip the breaker."""
+        breaker = CircuitBreaker(latency_threshold=1.0, window=4, min_calls=2)
+        breaker.record(True, 5.0)
+        breaker.record(True, 5.0)
+        assert breaker.state == OPEN
+
+    def test_failed_probe_reopens(self):
+        """Test a failed half-open probe opens the breaker again."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(window=2, min_calls=1, open_seconds=1, clock=clock)
+        breaker.record(False)
+        clock.now = 2
+        assert breaker.allow()
+        breaker.record(False)
+        assert breaker.state == OPEN
+
+
+class TestResilientCaller:
+    """Tests for hedging and deadlines."""
+
+    def test_hedge_wins_when_primary_is_slow(self):
+        """Test a hedged attempt is sent after the delay and its result used."""
+        caller = _caller(hedge_initial_delay=0.02, hedge_min_delay=0.0, deadline=5)
+        delays = iter([1.0, 0.0])
+
+        async def attempt():
+            await asyncio.sleep(next(delays))
+            return "value"
+
+        result = asyncio.run(caller.call(attempt))
+        assert result.value == "value"
+        assert result.hedged
+        assert caller.hedges == 1
+
+    def test_no_hedge_when_primary_is_fast(self):
+        """Test fast calls do not send a second attempt."""
+        caller = _caller(hedge_initial_delay=1.0, deadline=5)
+
+        async def attempt():
+            return "value"
+
+        result = asyncio.run(caller.call(attempt))
+        assert not result.hedged
+        assert caller.hedges == 0
+
+    def test_hedge_delay_tracks_p95(self):
+        """Test the hedge delay follows recent latencies once known."""
+        latency = LatencyTracker(min_samples=10)
+        for i in range(100):
+            latency.record(i / 100)
+        caller = _caller(latency=latency, hedge_initial_delay=5.0)
+        assert caller.hedge_delay() == pytest.approx(0.95)
+
+    def test_deadline_raises(self):
+        """Test calls that outlive the deadline fail and count against the breaker."""
+        caller = _caller(hedge_enabled=False, deadline=0.05)
+
+        async def attempt():
+            await asyncio.sleep(1.0)
+
+        with pytest.raises(ModelBackendError):
+            asyncio.run(caller.call(attempt))
+        assert caller.failures == 1
+
+    def test_open_breaker_rejects_without_calling(self):
+        """Test calls are refused while the breaker is open."""
+        caller = _caller()
+        caller.breaker.record(False)
+        caller.breaker.record(False)
+        called = []
+
+        async def attempt():
+            called.append(True)
+
+        with pytest.raises(ModelBackendError):
+            asyncio.run(caller.call(attempt))
+        assert called == []
+        assert caller.rejected == 1
+
+
+class TestPlannerFallback:
+    """Tests for PlannerService.plan path selection."""
+
+    def _plan(self, service):
+        return asyncio.run(service.plan("weekly", "ctx", ["Ship it"], []))
+
+    def test_model_path(self):
+        """Test model output is used when the backend answers in time."""
+        service = PlannerService(backend=FakeBackend(), caller=_caller(deadline=5))
+        plan = self._plan(service)
+        assert plan.source == PlanSource.MODEL
+        assert [task.title for task in plan.tasks] == ["Model task"]
+
+    def test_hedged_model_path(self):
+        """Test the response reports when the hedged request served it."""
+        service = PlannerService(
+            backend=FakeBackend(delays=[1.0, 0.0]),
+            caller=_caller(deadline=5, hedge_initial_delay=0.02, hedge_min_delay=0.0),
+        )
+        assert self._plan(service).source == PlanSource.MODEL_HEDGE
+
+    def test_fallback_on_failure_and_open_breaker(self):
+        """Test failures fall back to the deterministic planner and open the breaker."""
+        backend = FakeBackend(fail=True)
+        service = PlannerService(backend=backend, caller=_caller(hedge_enabled=False, deadline=5))
+
+        for _ in range(3):
+            plan = self._plan(service)
+            assert plan.source == PlanSource.FALLBACK
+            assert "Ship it" in [task.title for task in plan.tasks]
+        assert service.caller.breaker.state == OPEN
+        assert backend.calls == 2
+
+    def test_fallback_on_deadline(self):
+        """Test a backend slower than the deadline falls back."""
+        service = PlannerService(
+            backend=FakeBackend(delays=[1.0]),
+            caller=_caller(hedge_enabled=False, deadline=0.05),
+        )
+        assert self._plan(service).source == PlanSource.FALLBACK
+
+    def test_backend_without_stream_rejected(self):
+        """Test a backend missing stream() fails when it is created."""
+
+        class IncompleteBackend(ModelBackend):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteBackend()
+
+    def test_no_backend_is_deterministic(self):
+        """Test the deterministic planner serves plans when no model is configured."""
+        service = PlannerService()
+        assert service.backend is None
+        assert self._plan(service).source == PlanSource.DETERMINISTIC
+
+
+class TestPlanSourceApi:
+    """Tests for reporting the serving path over the API."""
+
+    def test_response_reports_source(self, tmp_path, monkeypatch):
+        """Test plans report their source in the body, header and stored copy."""
+        monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "api.db"))
+        monkeypatch.setattr(settings, "JOB_WORKERS", 0)
+        shard_router.close()
+        with TestClient(app) as client:
+            response = client.post("/plan/week", json={"context": "ctx", "goals": ["Ship it"]})
+            assert response.headers["X-Plan-Source"] == "deterministic"
+            assert response.json()["source"] == "deterministic"
+
+            stored = client.get(f"/plan/{response.json()['plan_id']}").json()
+            assert stored["source"] == "deterministic"
+
+            assert client.get("/plan/model/stats").json() == {
+                "enabled": False,
+                "breaker_state": None,
+                "calls": 0,
+                "hedges": 0,
+                "hedge_wins": 0,
+                "rejected": 0,
+                "failures": 0,
+                "hedge_delay_seconds": None,
+            }
+        shard_router.close()
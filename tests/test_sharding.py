@@ -0,0 +1,218 @@
+"""Tests for tenant-aware sharded storage."""
+
+import asyncio
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response, status
+
+from ai_engine.api.dependencies import get_tenant_id
+from ai_engine.core.config import settings
+from ai_engine.core.idempotency import IdempotencyStore
+from ai_engine.db.repository import get_plan, save_plan, update_occurrence_status
+from ai_engine.db.sharding import TENANT_TABLES, ConnectionPool, PoolClosedError, ShardRouter
+from ai_engine.db.summaries import check_summaries
+from ai_engine.models.schemas import (
+    PlanResponse,
+    RecurrenceFrequency,
+    RecurrenceRule,
+    Task,
+    TaskStatus,
+)
+from ai_engine.utils.error_handler import DatabaseError
+
+
+@pytest.fixture
+def main_db(tmp_path, monkeypatch):
+    """Point the main database at a temporary file."""
+    monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "main.db"))
+    return tmp_path
+
+
+def _plan(plan_id: str) -> PlanResponse:
+    return PlanResponse(
+        plan_id=plan_id,
+        tasks=[Task(id=1, title="First"), Task(id=2, title="Second")],
+        summary="Two tasks",
+        created_at=datetime.utcnow(),
+    )
+
+
+class TestShardRouter:
+    """Tests for tenant-to-file routing and pooling."""
+
+    def test_single_mode_uses_database_path(self, main_db):
+        """Test single mode keeps every tenant in DATABASE_PATH."""
+        router = ShardRouter(mode="single")
+        assert str(router.path_for("a")) == settings.DATABASE_PATH
+        assert router.path_for("a") == router.path_for("b")
+
+    def test_tenant_mode_uses_file_per_tenant(self, main_db):
+        """Test tenant mode gives each tenant its own file."""
+        router = ShardRouter(mode="tenant", shard_dir=str(main_db / "shards"))
+        assert router.path_for("a") != router.path_for("b")
+
+    def test_invalid_tenant_rejected(self, main_db):
+        """Test tenant ids cannot escape the shard directory."""
+        router = ShardRouter(mode="tenant", shard_dir=str(main_db / "shards"))
+        with pytest.raises(ValueError):
+            router.path_for("../etc")
+
+    def test_schema_created_lazily(self, main_db):
+        """Test plans can be stored in a brand new shard file."""
+        router = ShardRouter(mode="tenant", shard_dir=str(main_db / "shards"))
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "weekly", "ctx", _plan("plan_1"))
+        with router.connection("acme") as conn:
+            plan = get_plan(conn, "acme", "plan_1")
+        assert [task.title for task in plan.tasks] == ["First", "Second"]
+        router.close()
+
+    def test_lru_evicts_least_recently_used_pool(self, main_db):
+        """Test the number of open pools is bounded."""
+        router = ShardRouter(mode="tenant", shard_dir=str(main_db / "shards"), max_open=2)
+        for tenant in ("a", "b", "a", "c"):
+            with router.connection(tenant):
+                pass
+        assert router.open_pools() == [router.path_for("a"), router.path_for("c")]
+        router.close()
+
+    def test_waiter_on_evicted_pool_retries(self, main_db):
+        """Test a caller blocked on a full pool is woken by eviction and gets a connection."""
+        shard_dir = str(main_db / "shards")
+        router = ShardRouter(mode="tenant", shard_dir=shard_dir, max_open=1, pool_size=1)
+        borrowed = router.connect(router.path_for("a"))
+        borrowed.__enter__()
+
+        acquired = threading.Event()
+
+        def wait_for_a():
+            with router.connection("a"):
+                acquired.set()
+
+        waiter = threading.Thread(target=wait_for_a)
+        waiter.start()
+        assert not acquired.wait(0.2)
+
+        with router.connection("b"):  # evicts a's pool
+            pass
+        waiter.join(timeout=5)
+        assert acquired.is_set()
+        borrowed.__exit__(None, None, None)
+        router.close()
+
+    def test_full_pool_times_out(self, main_db):
+        """Test acquire gives up after the timeout and closed pools refuse callers."""
+        pool = ConnectionPool(main_db / "pool.db", size=1, timeout=0.1)
+        conn = pool.acquire()
+        with pytest.raises(DatabaseError):
+            pool.acquire()
+        pool.release(conn)
+        assert pool.acquire() is conn
+
+        pool.close()
+        pool.release(conn)
+        with pytest.raises(PoolClosedError):
+            pool.acquire()
+
+    def test_move_tenant_between_hash_shards(self, main_db, monkeypatch):
+        """Test moving a tenant copies its rows, recurring tasks included, and pins it."""
+        monkeypatch.setattr(settings, "RECURRENCE_HORIZON_DAYS", 7)
+        router = ShardRouter(mode="hash", shard_dir=str(main_db / "shards"), shard_count=4)
+        today = date.today()
+        plan = _plan("plan_1")
+        plan.tasks.append(
+            Task(
+                id=3,
+                title="Standup",
+                due_date=datetime.combine(today, datetime.min.time()),
+                recurrence=RecurrenceRule(frequency=RecurrenceFrequency.DAILY),
+            )
+        )
+        tomorrow = today + timedelta(days=1)
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "weekly", "ctx", plan)
+            update_occurrence_status(conn, "acme", "plan_1", 3, tomorrow, TaskStatus.COMPLETED)
+
+        source = router.shard_for("acme")
+        target = (source + 1) % 4
+        # plan, 3 tasks, 1 rule and 6 stored occurrences
+        assert router.move_tenant("acme", target) == 11
+        assert router.shard_for("acme") == target
+
+        with router.connection("acme") as conn:
+            assert get_plan(conn, "acme", "plan_1") is not None
+            assert conn.execute("SELECT COUNT(*) FROM task_recurrences").fetchone()[0] == 1
+            statuses = conn.execute(
+                "SELECT occurs_on, status FROM task_occurrences WHERE status = 'completed'"
+            ).fetchall()
+            assert [tuple(row) for row in statuses] == [(tomorrow.isoformat(), "completed")]
+            assert check_summaries(conn, "acme") == []
+        with router.connect(router.shard_path(source)) as conn:
+            assert get_plan(conn, "acme", "plan_1") is None
+            for table in TENANT_TABLES:
+                assert conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
+            assert check_summaries(conn, "acme") == []
+        router.close()
+
+    def test_move_tenant_keeps_idempotency_keys(self, main_db):
+        """Test a retry after a move replays the stored response instead of running again."""
+        router = ShardRouter(mode="hash", shard_dir=str(main_db / "shards"), shard_count=4)
+        store = IdempotencyStore(router)
+        calls = []
+
+        async def handler():
+            calls.append(1)
+            return Response(content=b'{"plan_id": "plan_1"}', status_code=status.HTTP_201_CREATED)
+
+        first = asyncio.run(store.run("acme", "key-1", "fp", handler))
+        assert router.move_tenant("acme", (router.shard_for("acme") + 1) % 4) == 1
+
+        store.clear_cache()
+        retry = asyncio.run(store.run("acme", "key-1", "fp", handler))
+        assert len(calls) == 1
+        assert retry.body == first.body
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        router.close()
+
+
+class TestTenantResolution:
+    """Tests for resolving the tenant of a request."""
+
+    def test_default_tenant(self):
+        """Test requests without tenant headers use the default tenant."""
+        assert asyncio.run(get_tenant_id(None, None)) == settings.DEFAULT_TENANT
+
+    def test_api_key_maps_to_tenant(self, monkeypatch):
+        """Test API keys take precedence over the tenant header."""
+        monkeypatch.setattr(settings, "TENANT_API_KEYS", {"key-1": "acme"})
+        assert asyncio.run(get_tenant_id("other", "key-1")) == "acme"
+
+    def test_unknown_api_key_rejected(self):
+        """Test unknown API keys are rejected."""
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(get_tenant_id(None, "nope"))
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class TestStoredPlans:
+    """Tests for plan persistence through the API."""
+
+    def test_generated_plan_can_be_retrieved(self, client, main_db):
+        """Test a generated plan is stored for the requesting tenant only."""
+        headers = {"X-Tenant-ID": "acme"}
+        created = client.post(
+            "/plan/week",
+            json={"context": "Launch", "goals": ["Write docs"]},
+            headers=headers,
+        ).json()
+
+        response = client.get(f"/plan/{created['plan_id']}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert [task["title"] for task in response.json()["tasks"]] == [
+            task["title"] for task in created["tasks"]
+        ]
+
+        other = client.get(f"/plan/{created['plan_id']}", headers={"X-Tenant-ID": "other"})
+        assert other.status_code == status.HTTP_404_NOT_FOUND
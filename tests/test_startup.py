@@ -0,0 +1,135 @@
+"""Tests for the startup pipeline, schema versioning and readiness endpoint."""
+
+import asyncio
+import logging
+import sqlite3
+import time
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from ai_engine.core import planner_service as planner_module
+from ai_engine.core.config import settings
+from ai_engine.core.startup import StartupState, startup_state
+from ai_engine.db.database import SCHEMA_VERSION, ensure_schema, init_db
+from ai_engine.db.sharding import shard_router
+from ai_engine.main import app
+from ai_engine.utils.logging_config import setup_logging
+
+
+def _user_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+class TestSchemaVersion:
+    """Tests for skipping DDL on databases at the current schema version."""
+
+    def test_applies_once(self, tmp_path, monkeypatch):
+        """Test the first boot applies the schema and later boots skip it."""
+        monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "boot.db"))
+        assert init_db() is True
+        assert init_db() is False
+
+        conn = sqlite3.connect(settings.DATABASE_PATH)
+        assert _user_version(conn) == SCHEMA_VERSION
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        assert {"plans", "tasks", "idempotency_keys", "jobs"} <= tables
+        conn.close()
+
+    def test_upgrades_unversioned_database(self, tmp_path):
+        """Test a database from before versioning gets missing columns and the version."""
+        conn = sqlite3.connect(str(tmp_path / "old.db"))
+        conn.execute(
+            "CREATE TABLE plans (id INTEGER PRIMARY KEY, plan_id TEXT, plan_type TEXT, "
+            "context TEXT, summary TEXT, created_at TIMESTAMP, updated_at TIMESTAMP)"
+        )
+        assert ensure_schema(conn) is True
+
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(plans)")}
+        assert {"tenant_id", "source"} <= columns
+        assert _user_version(conn) == SCHEMA_VERSION
+        conn.close()
+
+    def test_newer_database_left_alone(self, tmp_path):
+        """Test a database stamped by a newer release is not touched."""
+        conn = sqlite3.connect(str(tmp_path / "new.db"))
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        assert ensure_schema(conn) is False
+        assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+        conn.close()
+
+
+class TestStartupState:
+    """Tests for timed, parallel startup phases."""
+
+    def test_phases_run_in_parallel(self):
+        """Test blocking phases overlap and are each timed."""
+        state = StartupState()
+        state.begin()
+        started = time.perf_counter()
+        asyncio.run(state.run_phases({"a": lambda: time.sleep(0.2), "b": lambda: time.sleep(0.2)}))
+        assert time.perf_counter() - started < 0.35
+        state.mark_ready()
+
+        stats = state.stats()
+        assert stats["ready"] is True
+        assert set(stats["phases_ms"]) == {"a", "b"}
+        assert all(ms >= 150 for ms in stats["phases_ms"].values())
+        assert stats["startup_ms"] >= stats["phases_ms"]["a"]
+
+    def test_failed_phase(self):
+        """Test a failing phase is reported and keeps the gate closed."""
+
+        def broken():
+            raise RuntimeError("disk full")
+
+        state = StartupState()
+        state.begin()
+        with pytest.raises(RuntimeError):
+            asyncio.run(state.run_phases({"ok": lambda: None, "database": broken}))
+        assert state.ready is False
+        assert state.error == "database: disk full"
+        assert "ok" in state.phases
+
+    def test_planner_service_built_once(self, monkeypatch):
+        """Test the planner service is built lazily and shared."""
+        monkeypatch.setattr(planner_module, "_planner_service", None)
+        service = planner_module.get_planner_service()
+        assert planner_module.get_planner_service() is service
+
+    def test_setup_logging_is_idempotent(self):
+        """Test repeated setup replaces its handler instead of adding another."""
+        root = logging.getLogger()
+        setup_logging()
+        count = len(root.handlers)
+        setup_logging()
+        assert len(root.handlers) == count
+
+
+class TestReadiness:
+    """Tests for the readiness endpoint."""
+
+    def test_ready_only_while_running(self, tmp_path, monkeypatch):
+        """Test /ready is 503 before startup and after shutdown, 200 in between."""
+        monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "ready.db"))
+        monkeypatch.setattr(settings, "JOB_WORKERS", 0)
+        shard_router.close()
+
+        startup_state.mark_stopping()
+        response = TestClient(app).get("/ready")  # no lifespan: startup never ran
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.json()["ready"] is False
+
+        with TestClient(app) as client:
+            response = client.get("/ready")
+            assert response.status_code == status.HTTP_200_OK
+            body = response.json()
+            assert body["ready"] is True
+            assert body["database"] == "connected"
+            assert body["import_ms"] > 0
+            assert set(body["phases_ms"]) == {"database", "planner_service"}
+            assert client.get("/health").status_code == status.HTTP_200_OK
+
+        assert startup_state.ready is False
+        shard_router.close()
@@ -0,0 +1,156 @@
+"""Tests for incrementally maintained workload summaries."""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from ai_engine.core.config import settings
+from ai_engine.db.repository import save_plan, update_task_status
+from ai_engine.db.sharding import ShardRouter, shard_router
+from ai_engine.db.summaries import (
+    check_summaries,
+    rebuild_summaries,
+    workload_by_day,
+    workload_by_status,
+)
+from ai_engine.main import app
+from ai_engine.models.schemas import PlanResponse, PriorityLevel, Task, TaskStatus
+
+TODAY = date.today()
+
+
+@pytest.fixture
+def router(tmp_path, monkeypatch):
+    """Single-file router backed by a temporary database."""
+    monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "main.db"))
+    router = ShardRouter(mode="single")
+    yield router
+    router.close()
+
+
+def _plan(plan_id: str) -> PlanResponse:
+    due = datetime.combine(TODAY, datetime.min.time())
+    return PlanResponse(
+        plan_id=plan_id,
+        tasks=[
+            Task(id=1, title="A", priority=PriorityLevel.HIGH, estimated_hours=2.0, due_date=due),
+            Task(id=2, title="B", priority=PriorityLevel.HIGH, estimated_hours=3.0, due_date=due),
+            Task(id=3, title="C", estimated_hours=1.0, due_date=due + timedelta(days=1)),
+            Task(id=4, title="D", estimated_hours=5.0),
+        ],
+        summary="Four tasks",
+    )
+
+
+class TestSummaryTriggers:
+    """Tests for trigger maintenance of the summary tables."""
+
+    def test_insert_updates_summaries(self, router):
+        """Test saving a plan aggregates its tasks by day and status."""
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "weekly", "ctx", _plan("plan_1"))
+            days = workload_by_day(conn, "acme", TODAY, TODAY + timedelta(days=6))
+            statuses = workload_by_status(conn, "acme")
+
+        assert days == [
+            {"day": TODAY.isoformat(), "priority": "high", "task_count": 2, "estimated_hours": 5.0},
+            {
+                "day": (TODAY + timedelta(days=1)).isoformat(),
+                "priority": "medium",
+                "task_count": 1,
+                "estimated_hours": 1.0,
+            },
+        ]
+        assert statuses == [{"status": "pending", "task_count": 4, "estimated_hours": 11.0}]
+
+    def test_completing_task_removes_it_from_open_workload(self, router):
+        """Test status changes move counts between summary rows."""
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "weekly", "ctx", _plan("plan_1"))
+            task = update_task_status(conn, "acme", "plan_1", 1, TaskStatus.COMPLETED)
+            days = workload_by_day(conn, "acme", TODAY, TODAY)
+            statuses = {
+                row["status"]: row["task_count"] for row in workload_by_status(conn, "acme")
+            }
+
+            assert task.status == TaskStatus.COMPLETED
+            assert days[0]["task_count"] == 1
+            assert days[0]["estimated_hours"] == 3.0
+            assert statuses == {"completed": 1, "pending": 3}
+            assert check_summaries(conn) == []
+
+    def test_unknown_task_returns_none(self, router):
+        """Test updating a missing task reports None."""
+        with router.connection("acme") as conn:
+            assert update_task_status(conn, "acme", "missing", 1, TaskStatus.BLOCKED) is None
+
+    def test_tenants_are_separate(self, router):
+        """Test summaries are kept per tenant."""
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "weekly", "ctx", _plan("plan_1"))
+            assert workload_by_status(conn, "other") == []
+
+
+class TestSummaryMaintenance:
+    """Tests for rebuild and consistency checks."""
+
+    def test_check_detects_drift_and_rebuild_fixes_it(self, router):
+        """Test drifted summaries are reported and repaired."""
+        with router.connection("acme") as conn:
+            save_plan(conn, "acme", "weekly", "ctx", _plan("plan_1"))
+            conn.execute("UPDATE workload_by_status SET task_count = 99")
+            conn.commit()
+
+            mismatches = check_summaries(conn, "acme")
+            assert len(mismatches) == 1
+            assert mismatches[0]["table"] == "workload_by_status"
+
+            rebuild_summaries(conn, "acme")
+            assert check_summaries(conn) == []
+
+
+class TestWorkloadEndpoint:
+    """Tests for GET /stats/workload."""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "DATABASE_PATH", str(tmp_path / "api.db"))
+        monkeypatch.setattr(settings, "JOB_WORKERS", 0)
+        shard_router.close()
+        with TestClient(app) as client:
+            yield client
+        shard_router.close()
+
+    def test_workload_reflects_created_and_updated_tasks(self, client):
+        """Test created plans and status changes show up in the stats."""
+        response = client.post(
+            "/plan/today", json={"context": "Launch", "goals": ["Ship docs", "Fix bugs"]}
+        )
+        plan = response.json()
+
+        stats = client.get("/stats/workload").json()
+        assert stats["by_status"]["pending"]["task_count"] == len(plan["tasks"])
+
+        task_id = plan["tasks"][0]["id"]
+        response = client.patch(
+            f"/plan/{plan['plan_id']}/tasks/{task_id}", json={"status": "completed"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["status"] == "completed"
+
+        stats = client.get("/stats/workload").json()
+        assert stats["by_status"]["completed"]["task_count"] == 1
+
+    def test_invalid_window_rejected(self, client):
+        """Test end before start is a bad request."""
+        response = client.get(
+            "/stats/workload", params={"start": "2026-02-02", "end": "2026-02-01"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_missing_task_is_404(self, client):
+        """Test patching an unknown task returns 404."""
+        response = client.patch("/plan/nope/tasks/1", json={"status": "completed"})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
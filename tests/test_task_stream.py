@@ -0,0 +1,97 @@
+"""Tests for incremental parsing of streamed model output."""
+
+import asyncio
+import json
+
+import pytest
+
+from ai_engine.core.planner_service import PlannerService
+from ai_engine.core.task_stream import TaskStreamParser, parse_tasks
+from ai_engine.models.schemas import PriorityLevel
+
+OUTPUT = (
+    "Sure, here is the plan:\n```json\n"
+    '{"tasks": ['
+    '{"title": "Write \\"launch\\" post {draft}", "priority": "high", "estimated_hours": 2},'
+    '{"title": "Review", "meta": {"tags": ["a", "b"]}}'
+    "]}\n```"
+)
+
+
+def _chunks(text: str, size: int):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestTaskStreamParser:
+    """Tests for TaskStreamParser."""
+
+    @pytest.mark.parametrize("size", [1, 2, 5, 64, len(OUTPUT)])
+    def test_chunk_boundaries_do_not_matter(self, size):
+        """Test any chunking yields the same tasks, including escapes and braces in strings."""
+        tasks = list(parse_tasks(_chunks(OUTPUT, size)))
+        assert [task.title for task in tasks] == ['Write "launch" post {draft}', "Review"]
+        assert tasks[0].priority == PriorityLevel.HIGH
+
+    def test_tasks_emitted_when_object_closes(self):
+        """Test a task is available before the rest of the stream arrives."""
+        parser = TaskStreamParser()
+        assert parser.feed('[{"title": "First"}, {"title": "Sec') != []
+        assert [task.title for task in parser.feed('ond"}]')] == ["Second"]
+
+    def test_top_level_array(self):
+        """Test a bare JSON array of tasks is accepted."""
+        tasks = list(parse_tasks([json.dumps([{"title": "A"}, {"title": "B"}])]))
+        assert len(tasks) == 2
+
+    def test_repairs_malformed_entries(self):
+        """Test common defects are repaired instead of dropping the task."""
+        parser = TaskStreamParser()
+        tasks = parser.feed(
+            '[{"title": "A", "done": False,},'
+            ' {"title": "B", "priority": "High", "estimated_hours": 500},'
+            ' {"title": "C", "status": "unknown", "description": "x"}]'
+        )
+        assert [task.title for task in tasks] == ["A", "B", "C"]
+        assert tasks[1].priority == PriorityLevel.HIGH
+        assert tasks[1].estimated_hours == 168.0
+        assert tasks[2].description == "x"
+        assert parser.repaired == 3
+
+    def test_skips_unrepairable_entries(self):
+        """Test entries without a usable title are skipped and counted."""
+        parser = TaskStreamParser()
+        tasks = parser.feed('[{"title": ""}, {"no_title": 1}, {"title": "ok"}, {"title": "x" "y"}]')
+        assert [task.title for task in tasks] == ["ok"]
+        assert parser.skipped == 3
+
+    def test_truncated_final_task_salvaged(self):
+        """Test a stream cut off mid-task keeps the complete fields."""
+        parser = TaskStreamParser()
+        parser.feed('[{"title": "Done"}, {"title": "Cut off", "description": "half')
+        [task] = parser.close()
+        assert task.title == "Cut off"
+
+    def test_buffer_holds_only_current_object(self):
+        """Test completed tasks are not retained in the buffer."""
+        parser = TaskStreamParser()
+        for _ in range(1000):
+            parser.feed('{"title": "Task"}, ')
+        parser.feed('{"title": "Partial')
+        assert len(parser._buffer) < 50
+
+
+class TestPlannerServiceStream:
+    """Tests for PlannerService.stream_tasks."""
+
+    def test_stream_tasks_numbers_tasks(self):
+        """Test streamed tasks get sequential ids in arrival order."""
+
+        async def model_output():
+            for chunk in _chunks(OUTPUT, 7):
+                yield chunk
+
+        async def collect():
+            return [task async for task in PlannerService().stream_tasks(model_output())]
+
+        tasks = asyncio.run(collect())
+        assert [task.id for task in tasks] == [1, 2]
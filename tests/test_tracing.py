@@ -0,0 +1,96 @@
+"""Tests for request-scoped tracing."""
+
+import json
+
+import pytest
+
+from ai_engine.utils.tracing import (
+    FileSpanExporter,
+    SpanExporter,
+    Tracer,
+    current_trace_id,
+    traced,
+)
+
+
+class TestTracer:
+    """Tests for span creation, sampling and export."""
+
+    def test_child_spans_share_trace_and_parent(self, tmp_path):
+        """Test nested spans propagate trace id and parent id."""
+        path = tmp_path / "spans.jsonl"
+        tracer = Tracer(FileSpanExporter(str(path)), sample_rate=1.0)
+
+        with tracer.start_trace("root") as root:
+            with tracer.span("child") as child:
+                assert current_trace_id() == root.trace_id
+            assert child.parent_id == root.span_id
+
+        tracer.shutdown()
+        spans = [json.loads(line) for line in path.read_text().splitlines()]
+        assert {span["name"] for span in spans} == {"root", "child"}
+        assert all(span["trace_id"] == root.trace_id for span in spans)
+
+    def test_unsampled_trace_records_nothing(self, tmp_path):
+        """Test unsampled traces keep a trace id but export no spans."""
+        path = tmp_path / "spans.jsonl"
+        tracer = Tracer(FileSpanExporter(str(path)), sample_rate=0.0)
+
+        with tracer.start_trace("root") as root:
+            with tracer.span("child") as child:
+                assert child is None
+                assert current_trace_id() == root.trace_id
+
+        tracer.shutdown()
+        assert not path.exists()
+
+    def test_incoming_traceparent_is_continued(self):
+        """Test W3C traceparent headers set the trace id and sampling."""
+        tracer = Tracer(None)
+        header = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+
+        with tracer.start_trace("root", traceparent=header) as root:
+            assert root.trace_id == "a" * 32
+            assert root.parent_id == "b" * 16
+            assert not root.sampled
+
+    def test_error_status_recorded(self, tmp_path):
+        """Test spans record exceptions raised inside them."""
+        tracer = Tracer(FileSpanExporter(str(tmp_path / "spans.jsonl")), sample_rate=1.0)
+
+        try:
+            with tracer.start_trace("root") as root:
+                raise ValueError("boom")
+        except ValueError:
+            pass
+
+        assert root.status == "error"
+        assert root.attributes["error"] == "ValueError"
+
+    def test_traced_decorator_preserves_return_value(self):
+        """Test the decorator is transparent to callers."""
+
+        @traced("add")
+        def add(a, b):
+            return a + b
+
+        assert add(1, 2) == 3
+
+    def test_exporter_without_export_rejected(self):
+        """Test an exporter missing export() fails when it is created."""
+
+        class IncompleteExporter(SpanExporter):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteExporter()
+
+
+class TestTraceHeaders:
+    """Tests for trace id propagation to HTTP responses."""
+
+    def test_response_has_trace_id(self, client):
+        """Test every response carries a trace id header."""
+        response = client.get("/health")
+        assert len(response.headers["X-Trace-Id"]) == 32
+        assert response.headers["traceparent"].startswith("00-" + response.headers["X-Trace-Id"])